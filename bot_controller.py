@@ -1,14 +1,44 @@
 import discord
 import os
+import json
+import time
+import asyncio
+import hashlib
 from dotenv import load_dotenv
+from discord import app_commands
 from discord.ext import commands
+from utils import async_ops, metrics, loop_watchdog, sheets_worker
+from utils.guild_registry import get_guild_registry, sheet_scope, use_guild
 
 load_dotenv()
 TOKEN = os.getenv("BOT_TOKEN")
-SPREADSHEET_ID = os.getenv("SPREADSHEET_ID")
+# File holding the hash of the last synced slash command tree
+COMMAND_HASH_FILE = os.getenv("COMMAND_HASH_FILE", ".command_tree_hash")
+
+class GuildCommandTree(app_commands.CommandTree):
+    """
+    Command tree that makes the interaction's guild current before any
+    slash command or autocomplete callback runs, so its Sheets calls go to
+    that guild's spreadsheet.
+    """
+
+    async def interaction_check(self, interaction):
+        use_guild(interaction.guild_id)
+        return True
+
+class ASBot(commands.AutoShardedBot):
+    """
+    Bot that stops the event-loop watchdog while its loop is still running,
+    before bot.run closes it.
+    """
+
+    async def close(self):
+        loop_watchdog.stop_watchdog()
+        await super().close()
 
 intents = discord.Intents.default()
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Sharded so one process can serve many guilds; Discord picks the shard count
+bot = ASBot(command_prefix="!", intents=intents, tree_cls=GuildCommandTree)
 
 print("Loading commands...")
 import commands.ping
@@ -19,19 +49,133 @@ import commands.sheet
 commands.sheet.setup(bot)
 print("✅ Loaded sheet commands")
 
+import commands.bulk
+commands.bulk.setup(bot)
+print("✅ Loaded bulk commands")
+
+import commands.player
+commands.player.setup(bot)
+print("✅ Loaded player commands")
+
+import commands.stats
+commands.stats.setup(bot)
+print("✅ Loaded stats commands")
+
+import commands.quota
+commands.quota.setup(bot)
+print("✅ Loaded quota commands")
+
+def command_tree_hash(tree):
+    """
+    Hashes the signatures of every registered slash command.
+
+    Args:
+        tree: The bot's command tree
+
+    Returns:
+        str: SHA-256 hex digest of the command payloads Discord would receive
+    """
+    payload = [command.to_dict(tree) for command in sorted(tree.get_commands(), key=lambda command: command.name)]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+async def sync_command_tree():
+    """
+    Syncs the slash commands with Discord only if they changed since the last sync.
+
+    The hash of the last synced tree is kept in COMMAND_HASH_FILE, so a plain
+    restart makes no sync request and cannot hit the sync rate limit.
+    """
+    current_hash = command_tree_hash(bot.tree)
+    try:
+        with open(COMMAND_HASH_FILE) as f:
+            synced_hash = f.read().strip()
+    except FileNotFoundError:
+        synced_hash = None
+
+    if current_hash == synced_hash:
+        print("✅ Slash commands unchanged, skipping sync")
+        return
+
+    synced = await bot.tree.sync()
+    with open(COMMAND_HASH_FILE, "w") as f:
+        f.write(current_hash)
+    print(f"✅ Synced {len(synced)} slash commands")
+
+def sheet_label(config):
+    """
+    Returns:
+        str: The spreadsheet's name from the guild registry, or its ID
+    """
+    return config.name or config.spreadsheet_id
+
+async def warm_up_sheets():
+    """
+    Runs the Sheets warm-up for every spreadsheet in the guild registry and
+    prints how long each step took.
+    A failure is logged and the bot starts anyway, loading data on first use.
+    """
+    registry = get_guild_registry()
+    for config in registry.configs() or [registry.get()]:
+        start = time.perf_counter()
+        try:
+            with sheet_scope(config):
+                timings = await async_ops.warm_up()
+        except Exception as e:
+            print(f"❌ Sheets warm-up of {sheet_label(config)} failed, data will load on first use: {e}")
+            continue
+        for step, seconds in timings:
+            print(f"  - {step}: {seconds * 1000:.0f} ms")
+        print(f"✅ Sheets warm-up of {sheet_label(config)} finished in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+@bot.event
+async def setup_hook():
+    """
+    Runs once before the bot connects to Discord.
+    Re-registers the persistent sheet menu view so buttons on existing menus keep
+    working after a restart, starts the event-loop watchdog if LOOP_WATCHDOG is set
+    and the metrics endpoint if METRICS_PORT is set, starts the Sheets worker processes if SHEETS_WORKER_PROCESSES is set,
+    warms up the Sheets connection and data before any interaction arrives,
+    and syncs the slash commands if they changed.
+    """
+    bot.add_view(commands.sheet.PersistentActionView())
+    if loop_watchdog.LOOP_WATCHDOG:
+        loop_watchdog.start_watchdog()
+        print(f"✅ Event loop watchdog started ({loop_watchdog.LOOP_STALL_THRESHOLD_MS:.0f} ms stall threshold)")
+    if metrics.METRICS_PORT:
+        try:
+            await metrics.start_metrics_server(int(metrics.METRICS_PORT))
+            print(f"✅ Metrics served on http://127.0.0.1:{metrics.METRICS_PORT}/metrics")
+        except Exception as e:
+            print(f"❌ Error starting metrics server: {e}")
+    if sheets_worker.SHEETS_WORKER_PROCESSES:
+        try:
+            await asyncio.to_thread(sheets_worker.start_worker_pool)
+            print(f"✅ Started {sheets_worker.SHEETS_WORKER_PROCESSES} Sheets worker process(es)")
+        except Exception as e:
+            print(f"❌ Error starting Sheets workers, running Sheets calls in the bot process: {e}")
+    await warm_up_sheets()
+    try:
+        await sync_command_tree()
+    except Exception as e:
+        print(f"❌ Error syncing slash commands: {e}")
+
 @bot.event
 async def on_ready():
     """
     Event handler for when the bot is ready and connected to Discord.
-    Displays bot information, guild details, and permission status.
+    Displays bot information, guild details with each guild's spreadsheet, and permission status.
     """
-    print(f'Logged in as {bot.user} (ID: {bot.user.id})')
-    print(f'Using Spreadsheet ID: {SPREADSHEET_ID}')
+    print(f'Logged in as {bot.user} (ID: {bot.user.id}, {bot.shard_count} shard(s))')
+    registry = get_guild_registry()
         
     if bot.guilds:
         print(f"Bot is in {len(bot.guilds)} guild(s):")
         for guild in bot.guilds:
-            print(f"  - {guild.name} (ID: {guild.id})")
+            try:
+                spreadsheet = sheet_label(registry.get(guild.id))
+            except ValueError:
+                spreadsheet = "no spreadsheet configured"
+            print(f"  - {guild.name} (ID: {guild.id}), spreadsheet: {spreadsheet}")
             bot_member = guild.get_member(bot.user.id)
             if bot_member:
                 print(f"    Permissions: {bot_member.guild_permissions}")
@@ -59,3 +203,14 @@ async def on_app_command_error(interaction, error):
         pass
 
 bot.run(TOKEN)
+
+# Let queued Sheets calls finish, then let the storage backend finish
+# its export; the Sheets workers do
+# the same for their spreadsheets before they exit. The watchdog already
+# stopped in ASBot.close; this only matters if the loop died without it
+from utils import storage
+loop_watchdog.stop_watchdog()
+sheets_worker.stop_worker_pool()
+async_ops.shutdown()
+storage.shutdown_backend()
+
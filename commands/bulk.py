@@ -0,0 +1,355 @@
+import discord
+import re
+import io
+import csv
+from datetime import datetime
+from discord import app_commands
+from utils.async_ops import run_blocking, bulk_add_players_to_guild, bulk_add_players_to_banlist
+from utils.async_ops import bulk_remove_players_from_guild, bulk_remove_players_from_banlist
+from utils.async_ops import bulk_edit_players_in_guild, bulk_edit_players_in_banlist
+from utils.watchlist_ops import is_admin
+from commands.sheet import STATUS_OPTIONS, RANK_OPTIONS, BAN_STATUS_OPTIONS, BAN_REASON_OPTIONS
+
+# Largest CSV attachment accepted by /import_players
+MAX_IMPORT_BYTES = 2_000_000
+
+MASTERLIST_COLUMNS = ["IGN", "Join Date", "Rank", "Status", "Known Alts", "House", "Discord ID", "Notes", "Suspicious Alert"]
+WATCHLIST_COLUMNS = ["IGN", "Status", "Guild", "Date", "Reason", "Action By", "Notes", "Screenshot", "Known Alts", "Discord ID", "House"]
+
+def _choices(options):
+    """
+    Maps the lower-cased label and value of each (label, value) option to its value.
+    """
+    choices = {}
+    for label, value in options:
+        choices[label.lower()] = value
+        choices[value.lower()] = value
+    return choices
+
+STATUS_CHOICES = _choices([(label, value) for label, _, value in STATUS_OPTIONS])
+RANK_CHOICES = _choices([(rank, rank) for rank, _ in RANK_OPTIONS])
+BAN_STATUS_CHOICES = _choices([(label, value) for label, value, _ in BAN_STATUS_OPTIONS])
+BAN_REASON_CHOICES = _choices(BAN_REASON_OPTIONS)
+
+async def require_admin(interaction):
+    """
+    Refuses a sheet-changing command to users who are not admins.
+
+    Args:
+        interaction: The Discord interaction object
+
+    Returns:
+        bool: True if the user is an admin; otherwise an ephemeral refusal has been sent
+    """
+    if is_admin(interaction.user.name):
+        return True
+    await interaction.response.send_message("❌ Only admins can change the sheets", ephemeral=True)
+    return False
+
+def _column_key(name):
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+def _read_csv(text, columns):
+    """
+    Streams CSV records as dicts keyed by the expected column names.
+
+    Header names are matched ignoring case, spaces and punctuation; unknown
+    columns are ignored and missing ones read as empty.
+
+    Yields:
+        tuple: (line_number (int), record (dict))
+
+    Raises:
+        ValueError: If the header row has no IGN column
+    """
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("The CSV file is empty")
+    positions = {_column_key(name): i for i, name in enumerate(header)}
+    if _column_key("IGN") not in positions:
+        raise ValueError("The CSV header must include an IGN column")
+    lookup = {column: positions.get(_column_key(column)) for column in columns}
+
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue
+        record = {}
+        for column, position in lookup.items():
+            value = values[position] if position is not None and position < len(values) else ""
+            record[column] = value.strip()
+        yield reader.line_num, record
+
+def _parse_date(value):
+    if not value:
+        return datetime.now().strftime("%m/%d/%Y")
+    if not re.match(r'^\d{1,2}/\d{1,2}/\d{4}$', value):
+        raise ValueError(f"invalid date '{value}', use MM/DD/YYYY")
+    return value
+
+def _parse_choice(value, choices, column):
+    choice = choices.get(value.lower())
+    if choice is None:
+        raise ValueError(f"unknown {column} '{value}'")
+    return choice
+
+def _parse_sus_alert(value):
+    value = value.lower()
+    if value in ("", "no", "false"):
+        return False
+    if value in ("yes", "true"):
+        return True
+    raise ValueError(f"Suspicious Alert must be 'Yes' or 'No', got '{value}'")
+
+def parse_masterlist_csv(text):
+    """
+    Parses and validates a Masterlist CSV import.
+
+    Rank and Status must match the options of the rank and status menus.
+    An empty Join Date defaults to today.
+
+    Args:
+        text (str): CSV content with a header row
+
+    Returns:
+        tuple: (rows (list), errors (list of str))
+    """
+    rows = []
+    errors = []
+    for line, record in _read_csv(text, MASTERLIST_COLUMNS):
+        try:
+            if not record["IGN"]:
+                raise ValueError("missing IGN")
+            rows.append([
+                record["IGN"],
+                _parse_date(record["Join Date"]),
+                _parse_choice(record["Rank"], RANK_CHOICES, "rank"),
+                _parse_choice(record["Status"], STATUS_CHOICES, "status"),
+                record["Known Alts"],
+                record["House"],
+                record["Discord ID"],
+                record["Notes"],
+                _parse_sus_alert(record["Suspicious Alert"]),
+            ])
+        except ValueError as e:
+            errors.append(f"Line {line}: {e}")
+    return rows, errors
+
+def parse_watchlist_csv(text):
+    """
+    Parses and validates a Watchlist CSV import.
+
+    Status and Reason must match the options of the punishment menus.
+    An empty Date defaults to today.
+
+    Args:
+        text (str): CSV content with a header row
+
+    Returns:
+        tuple: (rows (list), errors (list of str))
+    """
+    rows = []
+    errors = []
+    for line, record in _read_csv(text, WATCHLIST_COLUMNS):
+        try:
+            if not record["IGN"]:
+                raise ValueError("missing IGN")
+            rows.append([
+                record["IGN"],
+                _parse_choice(record["Status"], BAN_STATUS_CHOICES, "status"),
+                record["Guild"],
+                _parse_date(record["Date"]),
+                _parse_choice(record["Reason"], BAN_REASON_CHOICES, "reason"),
+                record["Action By"],
+                record["Notes"],
+                record["Screenshot"],
+                record["Known Alts"],
+                record["Discord ID"],
+                record["House"],
+            ])
+        except ValueError as e:
+            errors.append(f"Line {line}: {e}")
+    return rows, errors
+
+def parse_ign_list(text):
+    """
+    Splits a comma, semicolon or newline separated list of IGNs.
+
+    Args:
+        text (str): The IGN list as typed by the moderator
+
+    Returns:
+        list: Unique IGNs in the order given
+    """
+    igns = []
+    for ign in re.split(r'[,;\n]', text):
+        ign = ign.strip()
+        if ign and ign not in igns:
+            igns.append(ign)
+    return igns
+
+def _summarize(items, limit=15):
+    shown = ", ".join(items[:limit])
+    return shown + (f" and {len(items) - limit} more" if len(items) > limit else "")
+
+def setup(bot):
+    """
+    Setup function for bulk sheet commands.
+    Registers the CSV import, bulk remove and bulk edit slash commands with the bot.
+
+    Args:
+        bot: The Discord bot instance
+    """
+    @bot.tree.command(name="import_players", description="Bulk import players into the Masterlist or Watchlist from a CSV file")
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.describe(target="Sheet to import into", file="CSV file with a header row matching the sheet columns")
+    @app_commands.choices(target=[
+        app_commands.Choice(name="Masterlist", value="Masterlist"),
+        app_commands.Choice(name="Watchlist", value="Watchlist"),
+    ])
+    async def import_players(interaction: discord.Interaction, target: app_commands.Choice[str], file: discord.Attachment):
+        """
+        Slash command to import players from a CSV attachment.
+        Valid rows are written in bulk; already-listed IGNs and invalid rows are reported.
+
+        Args:
+            interaction: The Discord interaction object
+            target: Masterlist or Watchlist
+            file: The CSV attachment
+        """
+        if not await require_admin(interaction):
+            return
+        await interaction.response.defer(ephemeral=True)
+        try:
+            if file.size > MAX_IMPORT_BYTES:
+                await interaction.followup.send(f"❌ CSV file is too large (max {MAX_IMPORT_BYTES // 1_000_000} MB)", ephemeral=True)
+                return
+
+            text = (await file.read()).decode("utf-8-sig")
+            if target.value == "Masterlist":
+                rows, errors = await run_blocking(parse_masterlist_csv, text)
+                bulk_add = bulk_add_players_to_guild
+            else:
+                rows, errors = await run_blocking(parse_watchlist_csv, text)
+                bulk_add = bulk_add_players_to_banlist
+
+            if rows:
+                success, message, skipped = await bulk_add(rows, interaction.user.name)
+            else:
+                message, skipped = f"❌ No valid rows to import into {target.value}.", []
+
+            lines = [message]
+            if skipped:
+                lines.append(f"⏭️ Skipped {len(skipped)} already listed: {_summarize(skipped)}")
+            if errors:
+                lines.append(f"⚠️ Rejected {len(errors)} invalid row(s):")
+                lines.extend(errors[:15])
+                if len(errors) > 15:
+                    lines.append(f"... and {len(errors) - 15} more")
+            await interaction.followup.send("\n".join(lines)[:2000], ephemeral=True)
+        except UnicodeDecodeError:
+            await interaction.followup.send("❌ The CSV file must be UTF-8 encoded", ephemeral=True)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
+
+    async def _send_bulk_result(interaction, result):
+        success, message, not_found = result
+        if not_found:
+            message += f"\n⚠️ Not found ({len(not_found)}): {_summarize(not_found)}"
+        await interaction.followup.send(message[:2000], ephemeral=True)
+
+    @bot.tree.command(name="bulk_remove", description="Remove many players from the Masterlist or Watchlist at once")
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.describe(target="Sheet to remove from", igns="Player IGNs separated by commas")
+    @app_commands.choices(target=[
+        app_commands.Choice(name="Masterlist", value="Masterlist"),
+        app_commands.Choice(name="Watchlist", value="Watchlist"),
+    ])
+    async def bulk_remove(interaction: discord.Interaction, target: app_commands.Choice[str], igns: str):
+        """
+        Slash command to remove a list of players with a single batched delete.
+
+        Args:
+            interaction: The Discord interaction object
+            target: Masterlist or Watchlist
+            igns: Comma-separated player IGNs
+        """
+        if not await require_admin(interaction):
+            return
+        await interaction.response.defer(ephemeral=True)
+        try:
+            player_ids = parse_ign_list(igns)
+            if not player_ids:
+                await interaction.followup.send("❌ No IGNs given", ephemeral=True)
+                return
+            if target.value == "Masterlist":
+                result = await bulk_remove_players_from_guild(player_ids, interaction.user.name)
+            else:
+                result = await bulk_remove_players_from_banlist(player_ids, interaction.user.name)
+            await _send_bulk_result(interaction, result)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="bulk_edit_masterlist", description="Set the rank and/or status of many Masterlist players at once")
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.describe(igns="Player IGNs separated by commas", status="New status", rank="New rank")
+    @app_commands.choices(
+        status=[app_commands.Choice(name=label, value=value) for label, _, value in STATUS_OPTIONS],
+        rank=[app_commands.Choice(name=rank, value=rank) for rank, _ in RANK_OPTIONS],
+    )
+    async def bulk_edit_masterlist(interaction: discord.Interaction, igns: str,
+                                   status: app_commands.Choice[str] = None, rank: app_commands.Choice[str] = None):
+        """
+        Slash command to change the rank and/or status of a list of Masterlist players in one write.
+
+        Args:
+            interaction: The Discord interaction object
+            igns: Comma-separated player IGNs
+            status: New status (optional)
+            rank: New rank (optional)
+        """
+        if not await require_admin(interaction):
+            return
+        await interaction.response.defer(ephemeral=True)
+        try:
+            player_ids = parse_ign_list(igns)
+            if not player_ids or (status is None and rank is None):
+                await interaction.followup.send("❌ Give at least one IGN and a new status or rank", ephemeral=True)
+                return
+            result = await bulk_edit_players_in_guild(
+                player_ids,
+                interaction.user.name,
+                rank=rank.value if rank else None,
+                status=status.value if status else None
+            )
+            await _send_bulk_result(interaction, result)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="bulk_edit_watchlist", description="Set the status of many Watchlist players at once")
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.describe(igns="Player IGNs separated by commas", status="New punishment status")
+    @app_commands.choices(
+        status=[app_commands.Choice(name=label, value=value) for label, value, _ in BAN_STATUS_OPTIONS],
+    )
+    async def bulk_edit_watchlist(interaction: discord.Interaction, igns: str, status: app_commands.Choice[str]):
+        """
+        Slash command to change the status of a list of Watchlist players in one write.
+
+        Args:
+            interaction: The Discord interaction object
+            igns: Comma-separated player IGNs
+            status: New punishment status
+        """
+        if not await require_admin(interaction):
+            return
+        await interaction.response.defer(ephemeral=True)
+        try:
+            player_ids = parse_ign_list(igns)
+            if not player_ids:
+                await interaction.followup.send("❌ No IGNs given", ephemeral=True)
+                return
+            result = await bulk_edit_players_in_banlist(player_ids, interaction.user.name, status=status.value)
+            await _send_bulk_result(interaction, result)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
@@ -0,0 +1,169 @@
+import discord
+from discord import app_commands
+from utils.async_ops import remove_player_from_guild, remove_player_from_banlist
+from utils.async_ops import find_player, find_banned_player, find_player_by_alt, find_banned_player_by_alt
+from utils.async_ops import suggest, lookup
+from commands.sheet import EditPlayerModal
+from commands.bulk import MASTERLIST_COLUMNS, WATCHLIST_COLUMNS, require_admin
+
+async def _choices(current, sheets=None):
+    """
+    Builds autocomplete choices for the IGN typed so far from the in-memory prefix index.
+    """
+    return [
+        app_commands.Choice(name=f"{name} ({label})"[:100], value=name[:100])
+        for name, label in await suggest(current, sheets)
+    ]
+
+async def masterlist_ign_autocomplete(interaction: discord.Interaction, current: str):
+    """
+    Suggests Masterlist IGNs and alts.
+    """
+    return await _choices(current, ['Masterlist'])
+
+async def any_ign_autocomplete(interaction: discord.Interaction, current: str):
+    """
+    Suggests IGNs and alts from the sheet chosen in the target option, or from both sheets.
+    """
+    target = getattr(interaction.namespace, "target", None)
+    return await _choices(current, [target] if target in ("Masterlist", "Watchlist") else None)
+
+def _row_summary(columns, row):
+    """
+    Formats the non-empty cells of a row as 'Column: value' lines, skipping the IGN.
+    """
+    lines = [f"**{column}:** {value}" for column, value in zip(columns[1:], row[1:]) if str(value).strip()]
+    return "\n".join(lines)[:1024] or "No details"
+
+def _lookup_summary(label, name, rows):
+    """
+    Formats the key columns of each row matched by a /lookup result.
+    """
+    lines = []
+    for row in rows[:3]:
+        row = row + [""] * (5 - len(row))
+        prefix = f"Alt of **{row[0]}** - " if label.endswith(" alt") else ""
+        if label.startswith("Masterlist"):
+            lines.append(f"{prefix}{row[2] or 'No rank'} | {row[3] or 'No status'}")
+        else:
+            lines.append(f"{prefix}{row[1] or 'No status'} | {row[4] or 'No reason'}")
+    return "\n".join(lines)[:1024] or "No details"
+
+def setup(bot):
+    """
+    Setup function for player slash commands.
+    Registers the remove, edit and find commands with IGN autocomplete, and /lookup.
+
+    Args:
+        bot: The Discord bot instance
+    """
+    @bot.tree.command(name="remove_player", description="Remove a player from the Masterlist or Watchlist")
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.describe(target="Sheet to remove from", ign="Player IGN")
+    @app_commands.choices(target=[
+        app_commands.Choice(name="Masterlist", value="Masterlist"),
+        app_commands.Choice(name="Watchlist", value="Watchlist"),
+    ])
+    @app_commands.autocomplete(ign=any_ign_autocomplete)
+    async def remove_player(interaction: discord.Interaction, target: app_commands.Choice[str], ign: str):
+        """
+        Slash command to remove a player, with the IGN suggested as it is typed.
+
+        Args:
+            interaction: The Discord interaction object
+            target: Masterlist or Watchlist
+            ign: The player IGN
+        """
+        if not await require_admin(interaction):
+            return
+        await interaction.response.defer(ephemeral=True)
+        try:
+            if target.value == "Masterlist":
+                success, message = await remove_player_from_guild(ign, interaction.user.name)
+            else:
+                success, message = await remove_player_from_banlist(ign, interaction.user.name)
+            await interaction.followup.send(message, ephemeral=True)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="edit_player", description="Edit a player in the Masterlist")
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.describe(ign="Player IGN")
+    @app_commands.autocomplete(ign=masterlist_ign_autocomplete)
+    async def edit_player(interaction: discord.Interaction, ign: str):
+        """
+        Slash command that opens the Masterlist edit form with the IGN filled in.
+
+        Args:
+            interaction: The Discord interaction object
+            ign: The player IGN
+        """
+        if not await require_admin(interaction):
+            return
+        try:
+            modal = EditPlayerModal()
+            modal.player_ign.default = ign
+            await interaction.response.send_modal(modal)
+        except Exception as e:
+            await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="find_player", description="Show a player's Masterlist and Watchlist entries")
+    @app_commands.describe(ign="Player IGN or known alt")
+    @app_commands.autocomplete(ign=any_ign_autocomplete)
+    async def find_player_command(interaction: discord.Interaction, ign: str):
+        """
+        Slash command to look a player up by IGN or known alt in both sheets.
+
+        Args:
+            interaction: The Discord interaction object
+            ign: The player IGN or alt
+        """
+        await interaction.response.defer(ephemeral=True)
+        try:
+            masterlist_row = await find_player(ign)
+            watchlist_row = await find_banned_player(ign)
+            masterlist_rows = [masterlist_row] if masterlist_row else await find_player_by_alt(ign)
+            watchlist_rows = [watchlist_row] if watchlist_row else await find_banned_player_by_alt(ign)
+            if not masterlist_rows and not watchlist_rows:
+                await interaction.followup.send(f"❌ {ign} was not found in the Masterlist or Watchlist", ephemeral=True)
+                return
+
+            embed = discord.Embed(title=f"🔎 {ign}", color=0x00ff00 if not watchlist_rows else 0xff0000)
+            for row in masterlist_rows[:10]:
+                embed.add_field(name=f"🎯 Masterlist: {row[0]}", value=_row_summary(MASTERLIST_COLUMNS, row), inline=False)
+            for row in watchlist_rows[:10]:
+                embed.add_field(name=f"🧰 Watchlist: {row[0]}", value=_row_summary(WATCHLIST_COLUMNS, row), inline=False)
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="lookup", description="Fuzzy search for a player in the Masterlist and Watchlist")
+    @app_commands.describe(query="Full, partial or misspelled IGN or alt")
+    async def lookup_command(interaction: discord.Interaction, query: str):
+        """
+        Slash command to search both lists and their Known Alts, tolerating typos.
+        Results are ranked by similarity and shown in an embed.
+
+        Args:
+            interaction: The Discord interaction object
+            query: The name to search for
+        """
+        await interaction.response.defer(ephemeral=True)
+        try:
+            results = await lookup(query)
+            if not results:
+                await interaction.followup.send(f"❌ No players matching {query} in the Masterlist or Watchlist", ephemeral=True)
+                return
+
+            on_watchlist = any(label.startswith("Watchlist") for _, _, label, _ in results)
+            embed = discord.Embed(title=f"🔎 Lookup: {query}", color=0xff0000 if on_watchlist else 0x00ff00)
+            for score, name, label, rows in results:
+                emoji = "🧰" if label.startswith("Watchlist") else "🎯"
+                embed.add_field(
+                    name=f"{emoji} {name} - {label} ({score:.0%})"[:256],
+                    value=_lookup_summary(label, name, rows),
+                    inline=False
+                )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
@@ -0,0 +1,85 @@
+import discord
+from utils.google_sheet import get_call_tracker, get_scheduler, SHEETS_REQUESTS_PER_MINUTE, QUOTA_WINDOW_SECONDS
+from utils.async_ops import run_sheets_state
+
+def format_top(counts, title, limit=8):
+    """
+    Formats the most frequent entries of a request count as a fixed-width table.
+
+    Args:
+        counts (Counter): Request counts keyed by a string or a tuple of strings
+        title (str): Header of the label column
+        limit (int): Maximum number of rows
+
+    Returns:
+        str: The table, or an empty string if there is nothing to show
+    """
+    if not counts:
+        return ""
+    lines = [f"{title:<48}{'requests':>10}"]
+    for key, count in counts.most_common(limit):
+        label = " / ".join(key) if isinstance(key, tuple) else key
+        lines.append(f"{label[:47]:<48}{count:>10}")
+    return "\n".join(lines) + "\n"
+
+def format_quota(tracker, scheduler):
+    """
+    Builds the /quota message from the call tracker and the request scheduler.
+
+    Args:
+        tracker (ApiCallTracker): The Sheets API call tracker
+        scheduler (RequestScheduler): The Sheets request scheduler
+
+    Returns:
+        str: The message
+    """
+    last_window = tracker.requests_last_window()
+    percent = last_window / SHEETS_REQUESTS_PER_MINUTE * 100 if SHEETS_REQUESTS_PER_MINUTE else 0
+    message = (
+        f"**Sheets API usage**\n"
+        f"Last {QUOTA_WINDOW_SECONDS}s: {last_window} / {SHEETS_REQUESTS_PER_MINUTE} requests ({percent:.0f}%)\n"
+        f"Since startup: {tracker.total()} requests, {tracker.rate_limited} rate limited (429)\n"
+        f"Waiting for quota: {scheduler.queue_depth}\n"
+    )
+    recent = format_top(tracker.counts(("caller", "operation"), recent=True), f"last {QUOTA_WINDOW_SECONDS}s: caller / operation")
+    if recent:
+        message += f"```\n{recent}```"
+    callers = format_top(tracker.counts(("caller", "operation")), "since startup: caller / operation")
+    if callers:
+        message += f"```\n{callers}```"
+    worksheets = format_top(tracker.counts("worksheet"), "since startup: worksheet", limit=5)
+    if worksheets:
+        message += f"```\n{worksheets}```"
+    return message
+
+def quota_message():
+    """
+    Builds the /quota message for the current spreadsheet.
+
+    Runs where the Sheets requests are sent, which is a Sheets worker
+    process when the worker pool is running.
+
+    Returns:
+        str: The message
+    """
+    return format_quota(get_call_tracker(), get_scheduler())
+
+def setup(bot):
+    """
+    Setup function for the quota command.
+    Registers the /quota slash command with the bot.
+
+    Args:
+        bot: The Discord bot instance
+    """
+    @bot.tree.command(name="quota", description="Show Google Sheets API usage and the most expensive operations")
+    async def quota(interaction: discord.Interaction):
+        """
+        Slash command that shows how many Sheets API requests were sent in the
+        last minute against the configured quota, and which functions and
+        operations sent the most.
+
+        Args:
+            interaction: The Discord interaction object
+        """
+        await interaction.response.send_message(await run_sheets_state(quota_message), ephemeral=True)
@@ -1,20 +1,69 @@
 import discord
 import re
 from datetime import datetime, timedelta
-from utils.masterlist_ops import add_player_to_guild, remove_player_from_guild, edit_player_in_guild, find_player
-from utils.watchlist_ops import add_player_to_banlist, remove_player_from_banlist, edit_player_in_banlist
+from utils.async_ops import add_player_to_guild, remove_player_from_guild, edit_player_in_guild
+from utils.async_ops import add_player_to_banlist, remove_player_from_banlist, edit_player_in_banlist
 from utils.google_sheet import get_sheet
+from utils.metrics import instrumented, timed, mark_error
+from utils.guild_registry import guild_routed
+from utils.session_store import SessionStore, ModalSession, FLOW_MASTERLIST_ADD, FLOW_MASTERLIST_EDIT, FLOW_WATCHLIST_ADD
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
-multi_modal_store = {}
+multi_modal_store = SessionStore()
+
+EXPIRED_SESSION_MESSAGE = "❌ This form has expired. Please start again from the menu."
+
+# Option sets shared by the select menus and the CSV import validation
+STATUS_OPTIONS = [
+    ("Active, Main", "Player is active with main account", "Active, Main"),
+    ("Active, Alt", "Player is active with alternate account", "Active, Alt"),
+    ("Inactive", "Player is currently inactive", "Inactive"),
+    ("Kicked", "Player was kicked from the guild", "Kicked"),
+    ("Left", "Player left the guild", "Left"),
+    ("Banned", "Player is banned", "BANNED"),
+]
+
+RANK_OPTIONS = [
+    ("0 - Endless", "🔴"),
+    ("1 - Ultimate Entity", "🟠"),
+    ("2 - Divine Celestial", "🟤"),
+    ("3 - Omnipotent God", "🟣"),
+    ("4 - Ascending Human", "🟢"),
+    ("5 - Lost Soul", "⚫"),
+    ("6 - Not in Guild", "⚪"),
+]
+
+BAN_STATUS_OPTIONS = [
+    ("(ST) Whisper Warning", "1 - (ST) Whisper Warning", "🟠"),
+    ("(ST) Region Warning", "2 - (ST) Region Warning", "🔴"),
+    ("(ST) Banned", "3 - (ST) Banned", "🟤"),
+    ("General Ban", "General Ban", "🔨"),
+    ("Caution", "Caution", "⚠️"),
+]
+
+BAN_REASON_OPTIONS = [
+    ("(ST) Leeching", "ST - Leeching"),
+    ("(ST) Not Following Instructions", "ST - Not Following Instructions"),
+    ("(ST) Not Responding to Warnings", "ST - Not Responding to Warnings"),
+    ("(ST) Banned in other raids", "ST - Banned in other raids"),
+    ("Making Trouble", "Making Trouble"),
+    ("Suspicious Person", "Suspicious Person"),
+    ("Scammer", "Scammer"),
+    ("Big Drama Llama", "Big Drama Llama"),
+    ("Griefing", "Griefing"),
+    ("VOE Issue", "VOE Issue"),
+    ("Kyzey's Shit List", "Kyzey's Shit List"),
+]
 
 class PersistentActionView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)  # No timeout - persistent
 
     @discord.ui.button(label="Add Player to Masterlist", style=discord.ButtonStyle.green, custom_id="persistent_add")
+    @instrumented
+    @guild_routed
     async def add_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
             # Create a view with the status select menu
@@ -26,23 +75,32 @@ class PersistentActionView(discord.ui.View):
                 ephemeral=True
             )
         except Exception as e:
+            mark_error()
             await interaction.followup.send(f"❌ Error opening select menu: {str(e)}", ephemeral=True)
 
     @discord.ui.button(label="Remove Player from Masterlist", style=discord.ButtonStyle.red, custom_id="persistent_remove")
+    @instrumented
+    @guild_routed
     async def remove_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
             await interaction.response.send_modal(RemovePlayerModal())
         except Exception as e:
+            mark_error()
             await interaction.followup.send(f"❌ Error opening modal: {str(e)}", ephemeral=True)
 
     @discord.ui.button(label="Edit Player in Masterlist", style=discord.ButtonStyle.gray, custom_id="persistent_edit")
+    @instrumented
+    @guild_routed
     async def edit_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
             await interaction.response.send_modal(EditPlayerModal())
         except Exception as e:
+            mark_error()
             await interaction.followup.send(f"❌ Error opening modal: {str(e)}", ephemeral=True)
 
     @discord.ui.button(label="Add Player in Watchlist", style=discord.ButtonStyle.red, custom_id="persistent_watchlist")
+    @instrumented
+    @guild_routed
     async def watchlist_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
             view = discord.ui.View()
@@ -53,6 +111,7 @@ class PersistentActionView(discord.ui.View):
                 ephemeral=True
             )
         except Exception as e:
+            mark_error()
             await interaction.followup.send(f"❌ Error opening menu: {str(e)}", ephemeral=True)
 
 
@@ -64,12 +123,15 @@ class RemovePlayerModal(discord.ui.Modal, title="Remove Player from Masterlist")
         max_length=50
     )
 
+    @instrumented
+    @guild_routed
     async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
+        await timed("defer", interaction.response.defer(ephemeral=True))
         try:
-            success, message = remove_player_from_guild(self.player_id.value, interaction.user.name)
-            await interaction.followup.send(message, ephemeral=True)
+            success, message = await remove_player_from_guild(self.player_id.value, interaction.user.name)
+            await timed("followup", interaction.followup.send(message, ephemeral=True))
         except Exception as e:
+            mark_error()
             await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
 
 class EditPlayerModal(discord.ui.Modal, title="Edit Player in Masterlist - Step 1"):
@@ -104,21 +166,24 @@ class EditPlayerModal(discord.ui.Modal, title="Edit Player in Masterlist - Step
         max_length=500
     )
 
+    @instrumented
+    @guild_routed
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            multi_modal_store[interaction.user.id] = {
-                "player_ign": self.player_ign.value,
-                "discord_id": self.discord_id.value or "",
-                "known_alts": self.known_alts.value or "",
-                "house": self.house.value or "",
-                "notes": self.notes.value or "",
-            }
+            multi_modal_store.put(interaction.user.id, FLOW_MASTERLIST_EDIT, ModalSession(
+                player_ign=self.player_ign.value,
+                discord_id=self.discord_id.value or "",
+                known_alts=self.known_alts.value or "",
+                house=self.house.value or "",
+                notes=self.notes.value or "",
+            ))
             await interaction.response.send_message(
             "✅ Step 1 complete! Click below to continue to Step 2.",
             view=ContinueToStep2EditView(),
             ephemeral=True
         )
         except Exception as e:
+            mark_error()
             await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
 
 class EditPlayerModalStep2(discord.ui.Modal):
@@ -142,11 +207,15 @@ class EditPlayerModalStep2(discord.ui.Modal):
 
         self.add_item(self.sus_alert)
 
+    @instrumented
+    @guild_routed
     async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
+        await timed("defer", interaction.response.defer(ephemeral=True))
         try:
-            data = multi_modal_store.pop(interaction.user.id, {})
-            action_by_value = data.get('action_by', '')
+            session = multi_modal_store.pop(interaction.user.id, FLOW_MASTERLIST_EDIT)
+            if session is None:
+                await interaction.followup.send(EXPIRED_SESSION_MESSAGE, ephemeral=True)
+                return
             sus_alert_value = self.sus_alert.value.strip().lower() if self.sus_alert.value else "no"
 
             if sus_alert_value not in ['yes', 'no']:
@@ -154,27 +223,24 @@ class EditPlayerModalStep2(discord.ui.Modal):
                 return
 
             sus_alert_boolean = sus_alert_value == "yes"
-            current_row = find_player(self.player_ign)
-            if not current_row:
-                await interaction.followup.send("❌ Player not found in Masterlist.", ephemeral=True)
-                return
-
+            # None keeps the cell as it is in the sheet at the time of the write
             row_data = [
                 self.player_ign,
-                current_row[1],  # Join Date
-                current_row[2],  # Rank
-                current_row[3],  # Status
-                self.known_alts or current_row[4],
-                data.get("house", current_row[5]),
-                self.discord_id or current_row[6],
-                data.get("notes", current_row[7]),
+                None,  # Join Date
+                None,  # Rank
+                None,  # Status
+                self.known_alts or None,
+                session.house or None,
+                self.discord_id or None,
+                session.notes or None,
                 sus_alert_boolean,
             ]
 
-            success, message = edit_player_in_guild(self.player_ign, row_data, action_by_value)
-            await interaction.followup.send(message, ephemeral=True)
+            success, message = await edit_player_in_guild(self.player_ign, row_data, interaction.user.name)
+            await timed("followup", interaction.followup.send(message, ephemeral=True))
 
         except Exception as e:
+            mark_error()
             await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
 
 class CustomEditDateModal(discord.ui.Modal, title="Enter Custom Date"):
@@ -185,6 +251,8 @@ class CustomEditDateModal(discord.ui.Modal, title="Enter Custom Date"):
         max_length=10
     )
 
+    @instrumented
+    @guild_routed
     async def on_submit(self, interaction: discord.Interaction):
         try:
             # Validate date format
@@ -196,6 +264,7 @@ class CustomEditDateModal(discord.ui.Modal, title="Enter Custom Date"):
             # Store the custom date and show the edit modal
             await interaction.response.send_modal(EditPlayerModalWithDate(self.custom_date.value))
         except Exception as e:
+            mark_error()
             await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
 
 class CustomDateModal(discord.ui.Modal, title="Enter Custom Date"):
@@ -210,6 +279,8 @@ class CustomDateModal(discord.ui.Modal, title="Enter Custom Date"):
         max_length=10
     )
 
+    @instrumented
+    @guild_routed
     async def on_submit(self, interaction: discord.Interaction):
         try:
             date_pattern = r'^\d{1,2}/\d{1,2}/\d{4}$'
@@ -222,6 +293,7 @@ class CustomDateModal(discord.ui.Modal, title="Enter Custom Date"):
                 view=RankSelectView(self.selected_status, self.custom_date.value)
             )
         except Exception as e:
+            mark_error()
             await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
 
 class AddPlayerModalWithDate(discord.ui.Modal, title="Add Player to Masterlist - Step 1"):
@@ -262,24 +334,27 @@ class AddPlayerModalWithDate(discord.ui.Modal, title="Add Player to Masterlist -
         max_length=500
     )
 
+    @instrumented
+    @guild_routed
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            multi_modal_store[interaction.user.id] = {
-                "player_ign": self.player_ign.value,
-                "discord_id": self.discord_id.value or "",
-                "known_alts": self.known_alts.value or "",
-                "house": self.house.value or "",
-                "notes": self.notes.value or "",
-                "selected_date": self.selected_date,
-                "selected_status": self.selected_status,
-                "selected_rank": self.selected_rank,
-            }
+            multi_modal_store.put(interaction.user.id, FLOW_MASTERLIST_ADD, ModalSession(
+                player_ign=self.player_ign.value,
+                discord_id=self.discord_id.value or "",
+                known_alts=self.known_alts.value or "",
+                house=self.house.value or "",
+                notes=self.notes.value or "",
+                selected_date=self.selected_date,
+                selected_status=self.selected_status,
+                selected_rank=self.selected_rank,
+            ))
             await interaction.response.send_message(
                 "Click below to continue..",
                 view=ContinueToStep2View(),
                 ephemeral=True
             )
         except Exception as e:
+            mark_error()
             await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
 
 class AddPlayerModalStep2(discord.ui.Modal, title="Add Player to Masterlist - Step 2"):
@@ -302,29 +377,35 @@ class AddPlayerModalStep2(discord.ui.Modal, title="Add Player to Masterlist - St
         max_length=3
     )
 
+    @instrumented
+    @guild_routed
     async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
+        await timed("defer", interaction.response.defer(ephemeral=True))
         try:
-            data = multi_modal_store.pop(interaction.user.id, {})
+            session = multi_modal_store.pop(interaction.user.id, FLOW_MASTERLIST_ADD)
+            if session is None:
+                await interaction.followup.send(EXPIRED_SESSION_MESSAGE, ephemeral=True)
+                return
             sus_alert_value = self.sus_alert.value.strip().lower() if self.sus_alert.value else "no"
             if sus_alert_value not in ['yes', 'no']:
                 await interaction.followup.send("❌ Suspicious Alert must be 'Yes' or 'No' (or leave empty for No)", ephemeral=True)
                 return
             sus_alert_boolean = sus_alert_value == "yes"
             row_data = [
-                data.get("player_ign", ""),
-                data.get("selected_date", ""),
-                data.get("selected_rank", ""),
-                data.get("selected_status", ""),
-                data.get("known_alts", ""),
-                data.get("house", ""),
-                data.get("discord_id", ""),
-                data.get("notes", ""),
+                session.player_ign,
+                session.selected_date,
+                session.selected_rank,
+                session.selected_status,
+                session.known_alts,
+                session.house,
+                session.discord_id,
+                session.notes,
                 sus_alert_boolean
             ]
-            success, message = add_player_to_guild(row_data, interaction.user.name)
-            await interaction.followup.send(message, ephemeral=True)
+            success, message = await add_player_to_guild(row_data, interaction.user.name)
+            await timed("followup", interaction.followup.send(message, ephemeral=True))
         except Exception as e:
+            mark_error()
             try:
                 await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
             except:
@@ -352,6 +433,8 @@ class EditDateSelect(discord.ui.Select):
             options=options
         )
 
+    @instrumented
+    @guild_routed
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.send_modal(EditPlayerModalWithDate(self.values[0]))
 
@@ -362,6 +445,8 @@ class EditDatePickerView(discord.ui.View):
         self.add_item(EditDateSelect())
 
     @discord.ui.button(label="📅 Custom Date", style=discord.ButtonStyle.gray)
+    @instrumented
+    @guild_routed
     async def custom_date_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(CustomEditDateModal())
 
@@ -382,6 +467,8 @@ class EditStatusSelect(discord.ui.Select):
             options=options
         )
 
+    @instrumented
+    @guild_routed
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.edit_message(
             content="Select new join date:",
@@ -400,13 +487,17 @@ class EditPlayerModalWithDate(discord.ui.Modal, title="Edit Player in Masterlist
         max_length=50
     )
 
+    @instrumented
+    @guild_routed
     async def on_submit(self, interaction: discord.Interaction):
+        await timed("defer", interaction.response.defer(ephemeral=True))
         try:
             new_data = [self.player_id.value, self.selected_date, "Active, Main"]  # Default status
-            success, message = edit_player_in_guild(self.player_id.value, new_data, interaction.user.name)
-            await interaction.response.send_message(message, ephemeral=True)
+            success, message = await edit_player_in_guild(self.player_id.value, new_data, interaction.user.name)
+            await timed("followup", interaction.followup.send(message, ephemeral=True))
         except Exception as e:
-            await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
+            mark_error()
+            await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
 
 class DateSelect(discord.ui.Select):
     def __init__(self, selected_status: str):
@@ -428,6 +519,8 @@ class DateSelect(discord.ui.Select):
             options=options
         )
 
+    @instrumented
+    @guild_routed
     async def callback(self, interaction: discord.Interaction):
         selected_date = self.values[0]
         await interaction.response.edit_message(
@@ -442,6 +535,8 @@ class DatePickerView(discord.ui.View):
         self.add_item(DateSelect(selected_status))
 
     @discord.ui.button(label="📅 Custom Date", style=discord.ButtonStyle.gray)
+    @instrumented
+    @guild_routed
     async def custom_date_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(CustomDateModal(self.selected_status))
 
@@ -452,18 +547,14 @@ class RankSelect(discord.ui.Select):
             min_values=1,
             max_values=1,
             options=[
-                discord.SelectOption(label="0 - Endless", value="0 - Endless", emoji="🔴"),
-                discord.SelectOption(label="1 - Ultimate Entity", value="1 - Ultimate Entity", emoji="🟠"),
-                discord.SelectOption(label="2 - Divine Celestial", value="2 - Divine Celestial", emoji="🟤"),
-                discord.SelectOption(label="3 - Omnipotent God", value="3 - Omnipotent God", emoji="🟣"),
-                discord.SelectOption(label="4 - Ascending Human", value="4 - Ascending Human", emoji="🟢"),
-                discord.SelectOption(label="5 - Lost Soul", value="5 - Lost Soul", emoji="⚫"),
-                discord.SelectOption(label="6 - Not in Guild", value="6 - Not in Guild", emoji="⚪"),
+                discord.SelectOption(label=rank, value=rank, emoji=emoji) for rank, emoji in RANK_OPTIONS
             ]
         )
         self.selected_status = selected_status
         self.selected_date = selected_date
 
+    @instrumented
+    @guild_routed
     async def callback(self, interaction: discord.Interaction):
         selected_rank = self.values[0]
         await interaction.response.send_modal(AddPlayerModalWithDate(self.selected_date, self.selected_status, selected_rank))
@@ -476,12 +567,8 @@ class RankSelectView(discord.ui.View):
 class StatusSelect(discord.ui.Select):
     def __init__(self):
         options = [
-            discord.SelectOption(label="Active, Main", description="Player is active with main account", value="Active, Main"),
-            discord.SelectOption(label="Active, Alt", description="Player is active with alternate account", value="Active, Alt"),
-            discord.SelectOption(label="Inactive", description="Player is currently inactive", value="Inactive"),
-            discord.SelectOption(label="Kicked", description="Player was kicked from the guild", value="Kicked"),
-            discord.SelectOption(label="Left", description="Player left the guild", value="Left"),
-            discord.SelectOption(label="Banned", description="Player is banned", value="BANNED")
+            discord.SelectOption(label=label, description=description, value=value)
+            for label, description, value in STATUS_OPTIONS
         ]
         super().__init__(
             placeholder="Select player status...",
@@ -490,6 +577,8 @@ class StatusSelect(discord.ui.Select):
             options=options
         )
 
+    @instrumented
+    @guild_routed
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.edit_message(
             content="Select join date:",
@@ -498,33 +587,43 @@ class StatusSelect(discord.ui.Select):
 
 class ContinueToStep2View(discord.ui.View):
     @discord.ui.button(label="Continue", style=discord.ButtonStyle.primary)
+    @instrumented
+    @guild_routed
     async def continue_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        data = multi_modal_store.get(interaction.user.id, {})
+        session = multi_modal_store.get(interaction.user.id, FLOW_MASTERLIST_ADD)
+        if session is None:
+            await interaction.response.send_message(EXPIRED_SESSION_MESSAGE, ephemeral=True)
+            return
         await interaction.response.send_modal(
             AddPlayerModalStep2(
-                data.get("selected_date", ""),
-                data.get("selected_status", ""),
-                data.get("selected_rank", ""),
-                data.get("player_ign", ""),
-                data.get("discord_id", ""),
-                data.get("known_alts", ""),
-                data.get("house", ""),
-                data.get("notes", "")
+                session.selected_date,
+                session.selected_status,
+                session.selected_rank,
+                session.player_ign,
+                session.discord_id,
+                session.known_alts,
+                session.house,
+                session.notes
             )
         )
 
 # For EditPlayerModal
 class ContinueToStep2EditView(discord.ui.View):
     @discord.ui.button(label="Continue", style=discord.ButtonStyle.primary)
+    @instrumented
+    @guild_routed
     async def continue_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        data = multi_modal_store.get(interaction.user.id, {})
+        session = multi_modal_store.get(interaction.user.id, FLOW_MASTERLIST_EDIT)
+        if session is None:
+            await interaction.response.send_message(EXPIRED_SESSION_MESSAGE, ephemeral=True)
+            return
         await interaction.response.send_modal(
             EditPlayerModalStep2(
-                data.get("player_ign", ""),
-                data.get("rank", ""),
-                data.get("status", ""),
-                data.get("discord_id", ""),
-                data.get("known_alts", "")
+                session.player_ign,
+                session.selected_rank,
+                session.selected_status,
+                session.discord_id,
+                session.known_alts
             )
         )
 
@@ -566,24 +665,27 @@ class Watchlist(discord.ui.Modal, title="Add player to Watchlist"):
         max_length=500
     )
 
+    @instrumented
+    @guild_routed
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            multi_modal_store[interaction.user.id] = {
-                "player_ign": self.player_ign.value,
-                "discord_id": self.discord_id.value or "",
-                "known_alts": self.known_alts.value or "",
-                "house": self.house.value or "",
-                "notes": self.notes.value or "",
-                "selected_date": self.selected_date,
-                "selected_status": self.selected_status,
-                "selected_reason": self.selected_reason,
-            }
+            multi_modal_store.put(interaction.user.id, FLOW_WATCHLIST_ADD, ModalSession(
+                player_ign=self.player_ign.value,
+                discord_id=self.discord_id.value or "",
+                known_alts=self.known_alts.value or "",
+                house=self.house.value or "",
+                notes=self.notes.value or "",
+                selected_date=self.selected_date,
+                selected_status=self.selected_status,
+                selected_reason=self.selected_reason,
+            ))
             await interaction.response.send_message(
                 "Click below to continue..",
                 view=WatchlistContinueView(),
                 ephemeral=True
             )
         except Exception as e:
+            mark_error()
             await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
 
 class BanStatus(discord.ui.Select):
@@ -593,14 +695,12 @@ class BanStatus(discord.ui.Select):
             min_values=1,
             max_values=1,
             options=[
-                discord.SelectOption(label="(ST) Whisper Warning", value="1 - (ST) Whisper Warning", emoji="🟠"),
-                discord.SelectOption(label="(ST) Region Warning", value="2 - (ST) Region Warning", emoji="🔴"),
-                discord.SelectOption(label="(ST) Banned", value="3 - (ST) Banned", emoji="🟤"),
-                discord.SelectOption(label="General Ban", value="General Ban", emoji="🔨"),
-                discord.SelectOption(label="Caution", value="Caution", emoji="⚠️"),
+                discord.SelectOption(label=label, value=value, emoji=emoji) for label, value, emoji in BAN_STATUS_OPTIONS
             ]
         )
 
+    @instrumented
+    @guild_routed
     async def callback(self, interaction: discord.Interaction):
         view = discord.ui.View()
         view.add_item(StatusReason(self.values[0]))
@@ -618,20 +718,12 @@ class StatusReason(discord.ui.Select):
             min_values=1,
             max_values=1,
             options=[
-                discord.SelectOption(label="(ST) Leeching", value="ST - Leeching"),
-                discord.SelectOption(label="(ST) Not Following Instructions", value="ST - Not Following Instructions"),
-                discord.SelectOption(label="(ST) Not Responding to Warnings", value="ST - Not Responding to Warnings"),
-                discord.SelectOption(label="(ST) Banned in other raids", value="ST - Banned in other raids"),
-                discord.SelectOption(label="Making Trouble", value="Making Trouble"),
-                discord.SelectOption(label="Suspicious Person", value="Suspicious Person"),
-                discord.SelectOption(label="Scammer", value="Scammer"),
-                discord.SelectOption(label="Big Drama Llama", value="Big Drama Llama"),
-                discord.SelectOption(label="Griefing", value="Griefing"),
-                discord.SelectOption(label="VOE Issue", value="VOE Issue"),
-                discord.SelectOption(label="Kyzey's Shit List", value="Kyzey's Shit List"),
+                discord.SelectOption(label=label, value=value) for label, value in BAN_REASON_OPTIONS
             ]
         )
 
+    @instrumented
+    @guild_routed
     async def callback(self, interaction: discord.Interaction):
         selected_reason = self.values[0]
         view = discord.ui.View()
@@ -660,24 +752,31 @@ class WatchlistDateSelect(discord.ui.Select):
             max_values=1,
             options=options
         )
+    @instrumented
+    @guild_routed
     async def callback(self, interaction: discord.Interaction):
         selected_date = self.values[0]
         await interaction.response.send_modal(Watchlist(selected_date, self.selected_status, self.selected_reason))
 
 class WatchlistContinueView(discord.ui.View):
     @discord.ui.button(label="Continue", style=discord.ButtonStyle.primary)
+    @instrumented
+    @guild_routed
     async def continue_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        data = multi_modal_store.get(interaction.user.id, {})
+        session = multi_modal_store.get(interaction.user.id, FLOW_WATCHLIST_ADD)
+        if session is None:
+            await interaction.response.send_message(EXPIRED_SESSION_MESSAGE, ephemeral=True)
+            return
         await interaction.response.send_modal(
             AddWatchlistModalStep2(
-                data.get("selected_date", ""),
-                data.get("selected_status", ""),
-                data.get("player_ign", ""),
-                data.get("discord_id", ""),
-                data.get("known_alts", ""),
-                data.get("house", ""),
-                data.get("notes", ""),
-                data.get("selected_reason", ""),
+                session.selected_date,
+                session.selected_status,
+                session.selected_reason,
+                session.player_ign,
+                session.discord_id,
+                session.known_alts,
+                session.house,
+                session.notes,
             )
         )
 
@@ -709,26 +808,32 @@ class AddWatchlistModalStep2(discord.ui.Modal, title="Add Player to Watchlist -
         max_length=500
     )
 
+    @instrumented
+    @guild_routed
     async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
+        await timed("defer", interaction.response.defer(ephemeral=True))
         try:
-            data = multi_modal_store.pop(interaction.user.id, {})
+            session = multi_modal_store.pop(interaction.user.id, FLOW_WATCHLIST_ADD)
+            if session is None:
+                await interaction.followup.send(EXPIRED_SESSION_MESSAGE, ephemeral=True)
+                return
             row_data = [
-                data.get("player_ign", ""),
-                data.get("selected_status", ""),
+                session.player_ign,
+                session.selected_status,
                 self.guild.value,
-                data.get("selected_date", ""),
-                data.get("selected_reason", ""),
-                data.get("action_by", ""),
-                data.get("notes", ""),
+                session.selected_date,
+                session.selected_reason,
+                "",  # Action By, filled in from the user name by add_player_to_banlist
+                session.notes,
                 self.screenshot.value,
-                data.get("known_alts", ""),
-                data.get("discord_id", ""),
-                data.get("house", ""),
+                session.known_alts,
+                session.discord_id,
+                session.house,
             ]
-            success, message = add_player_to_banlist(row_data, interaction.user.name)
-            await interaction.followup.send(message, ephemeral=True)
+            success, message = await add_player_to_banlist(row_data, interaction.user.name)
+            await timed("followup", interaction.followup.send(message, ephemeral=True))
         except Exception as e:
+            mark_error()
             try:
                 await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
             except:
@@ -739,6 +844,7 @@ class AddWatchlistModalStep2(discord.ui.Modal, title="Add Player to Watchlist -
 
 def setup(bot):
     @bot.tree.command(name="create_sheet_menu", description="Create a persistent sheet management menu")
+    @instrumented
     async def create_sheet_menu(interaction: discord.Interaction):
         embed = discord.Embed(
             title="📊 Sheet Management System",
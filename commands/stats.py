@@ -0,0 +1,82 @@
+import discord
+from utils.metrics import get_registry
+from utils.loop_watchdog import get_watchdog
+
+# Longest message Discord accepts
+MAX_MESSAGE_LENGTH = 2000
+
+def _format_ms(milliseconds):
+    return f"{milliseconds / 1000:.1f}s" if milliseconds >= 1000 else f"{milliseconds:.0f}ms"
+
+def format_stats(rows, limit=1900):
+    """
+    Formats metrics snapshot rows as a fixed-width table for a code block.
+
+    Each interaction's total comes first, followed by its spans indented below it.
+
+    Args:
+        rows (list): Rows from MetricsRegistry.snapshot()
+        limit (int): Maximum length of the table
+
+    Returns:
+        str: The table
+    """
+    lines = [f"{'interaction / span':<44}{'n':>6}{'err':>5}{'p50':>8}{'p95':>8}{'p99':>8}"]
+    for row in rows:
+        label = row["name"] if row["stage"] == "total" else f"  {row['stage']}"
+        lines.append(
+            f"{label[:43]:<44}{row['count']:>6}{row['errors']:>5}"
+            f"{_format_ms(row['p50']):>8}{_format_ms(row['p95']):>8}{_format_ms(row['p99']):>8}"
+        )
+    table = ""
+    for line in lines:
+        if len(table) + len(line) + 1 > limit:
+            table += "..."
+            break
+        table += line + "\n"
+    return table
+
+def format_stats_message(rows, lag=None):
+    """
+    Builds the /stats message, cutting the table so the whole message fits in one Discord message.
+
+    Args:
+        rows (list): Rows from MetricsRegistry.snapshot()
+        lag (dict): Event-loop lag from LoopWatchdog.lag_stats(), or None without the watchdog
+
+    Returns:
+        str: The message, at most MAX_MESSAGE_LENGTH characters
+    """
+    footer = ""
+    if lag is not None:
+        footer = (
+            f"Event loop lag: {_format_ms(lag['p50'])} p50, {_format_ms(lag['p99'])} p99, "
+            f"{_format_ms(lag['max'])} max, {lag['stalls']} stall(s) since start"
+        )
+    table = format_stats(rows, limit=MAX_MESSAGE_LENGTH - len("```\n```\n") - len(footer))
+    return f"```\n{table}```" + (f"\n{footer}" if footer else "")
+
+def setup(bot):
+    """
+    Setup function for the stats command.
+    Registers the /stats slash command with the bot.
+
+    Args:
+        bot: The Discord bot instance
+    """
+    @bot.tree.command(name="stats", description="Show interaction latency and error statistics")
+    async def stats(interaction: discord.Interaction):
+        """
+        Slash command that shows latency percentiles and error counts per
+        interaction and span since the bot started.
+
+        Args:
+            interaction: The Discord interaction object
+        """
+        rows = get_registry().snapshot()
+        if not rows:
+            await interaction.response.send_message("No interactions recorded yet.", ephemeral=True)
+            return
+        watchdog = get_watchdog()
+        lag = watchdog.lag_stats() if watchdog is not None else None
+        await interaction.response.send_message(format_stats_message(rows, lag), ephemeral=True)
@@ -0,0 +1,204 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import unittest
+from unittest import mock
+from contextlib import contextmanager
+
+# Keep the benchmarks away from the real SQLite mirror
+os.environ["SHEETS_MIRROR_PATH"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_sheets import FakeSpreadsheet, fake_backend
+from utils import masterlist_ops, update_log_ops, sheet_cache, storage
+from utils.sheets_backend import SheetsBackend
+
+# Roster sizes to benchmark, and operations timed per size
+BENCHMARK_SIZES = [int(size) for size in os.getenv("BENCHMARK_SIZES", "100,1000,10000,100000").split(",")]
+BENCHMARK_ITERATIONS = int(os.getenv("BENCHMARK_ITERATIONS", "100"))
+# Simulated round-trip time of every fake API request, in seconds
+BENCHMARK_LATENCY = float(os.getenv("BENCHMARK_LATENCY", "0"))
+# Storage backend under test: "sheets" (against the fake spreadsheet), "memory" or "sqlite"
+BENCHMARK_BACKEND = os.getenv("BENCHMARK_BACKEND", "sheets")
+
+# Regression thresholds per operation: ({roster size: max ms per operation}, max API calls per operation).
+# The times exclude the simulated latency; a size that is not listed uses the
+# ceiling of the next larger listed size. Removes renumber every row below
+# the deleted one, so their time grows with the roster.
+THRESHOLDS = {
+    'add': ({100000: 5.0}, 1),
+    'edit': ({100000: 5.0}, 1),
+    'remove': ({100: 3.0, 1000: 12.0, 10000: 120.0, 100000: 1000.0}, 1),
+    'lookup': ({100000: 1.0}, 0),
+    'lookup_discord_id': ({100000: 1.0}, 0),
+    'recent_updates': ({10000: 1.0, 100000: 8.0}, 2),
+}
+
+MASTERLIST_HEADER = ["IGN", "Join Date", "Rank", "Status", "Known Alts", "House", "Discord ID", "Notes", "Sus Alert"]
+UPDATE_SHEET_HEADER = ["Date", "User", "Change"]
+
+def masterlist_row(i):
+    return [f"Player{i:06d}", "2024/01/01", "Member", "Active", f"Alt{i:06d}a, Alt{i:06d}b", "House", str(10 ** 17 + i), "", "FALSE"]
+
+def build_sheets(size):
+    """
+    Builds the tabs of a roster with a Masterlist of `size` players and an Update Sheet of `size` entries.
+    """
+    return {
+        'Masterlist': [MASTERLIST_HEADER] + [masterlist_row(i) for i in range(size)],
+        'Watchlist': [],
+        'Update Sheet': [UPDATE_SHEET_HEADER] + [["2024/01/01", "Bench", f"Added player to Masterlist: Player{i:06d}"] for i in range(size)],
+    }
+
+@contextmanager
+def benchmark_backend(sheets, name=BENCHMARK_BACKEND, latency=BENCHMARK_LATENCY):
+    """
+    Installs a storage backend holding the given tabs inside the block.
+
+    Yields:
+        FakeSpreadsheet or None: The fake spreadsheet counting API calls, None for local backends
+    """
+    spreadsheet = None
+    with tempfile.TemporaryDirectory() as directory:
+        if name == "sheets":
+            spreadsheet = FakeSpreadsheet(sheets, latency=latency)
+            backend = SheetsBackend()
+        elif name == "sqlite":
+            backend = storage.SqliteBackend(os.path.join(directory, "benchmark.db"))
+            for sheet_name, rows in sheets.items():
+                backend.replace_rows(sheet_name, rows)
+        else:
+            backend = storage.MemoryBackend(sheets)
+        previous = storage.set_backend(backend)
+        try:
+            if spreadsheet is None:
+                yield None
+            else:
+                with fake_backend(spreadsheet):
+                    yield spreadsheet
+        finally:
+            storage.set_backend(previous)
+            if name == "sqlite":
+                backend.store._conn.close()
+
+def measure(spreadsheet, func, arguments):
+    """
+    Calls func once per argument tuple.
+
+    Returns:
+        tuple: (milliseconds per call excluding simulated latency, API calls per call)
+    """
+    calls_before = spreadsheet.request_count if spreadsheet else 0
+    start = time.perf_counter()
+    for args in arguments:
+        func(*args)
+    elapsed = time.perf_counter() - start
+    if spreadsheet is None:
+        return elapsed * 1000 / len(arguments), 0
+    calls = (spreadsheet.request_count - calls_before) / len(arguments)
+    return (elapsed - calls * len(arguments) * spreadsheet.latency) * 1000 / len(arguments), calls
+
+def run_size(size, iterations=BENCHMARK_ITERATIONS):
+    """
+    Runs every benchmark against a fresh BENCHMARK_BACKEND of one roster size.
+
+    Returns:
+        dict: (milliseconds per call, API calls per call) keyed by operation, plus the replica load time under 'load'
+    """
+    rng = random.Random(size)
+    iterations = min(iterations, size)
+    results = {}
+    # Measured with the default freshness settings, whatever the environment says
+    with mock.patch.object(sheet_cache, "SHEETS_FRESHNESS_INTERVAL", 30.0), \
+            mock.patch.object(sheet_cache, "SHEETS_MAX_STALENESS", 600.0), \
+            benchmark_backend(build_sheets(size)) as spreadsheet:
+        sheet_cache._replicas.clear()
+        replica = masterlist_ops.get_masterlist_replica()
+        results['load'] = measure(spreadsheet, replica.ensure_loaded, [()])
+
+        existing = [masterlist_row(i) for i in rng.sample(range(size), iterations)]
+        results['lookup'] = measure(spreadsheet, masterlist_ops.find_player, [(row[0],) for row in existing])
+        results['lookup_discord_id'] = measure(spreadsheet, masterlist_ops.find_player_by_discord_id, [(row[6],) for row in existing])
+
+        new_rows = [masterlist_row(size + i) for i in range(iterations)]
+        results['add'] = measure(spreadsheet, masterlist_ops.add_player_to_guild, [(row, "bench") for row in new_rows])
+
+        edits = [(row[0], row[:3] + ["Inactive"] + row[4:], "bench") for row in existing]
+        results['edit'] = measure(spreadsheet, masterlist_ops.edit_player_in_guild, edits)
+
+        results['remove'] = measure(spreadsheet, masterlist_ops.remove_player_from_guild, [(row[0], "bench") for row in existing])
+
+        results['recent_updates'] = measure(spreadsheet, update_log_ops.get_recent_updates, [(10,)] * iterations)
+
+        masterlist = storage.get_backend().scan('Masterlist')
+        assert len(masterlist) == size + 1, "Masterlist has the wrong number of rows after the benchmark"
+        assert replica.get_all_rows() == masterlist, "Masterlist replica drifted from the storage backend"
+    sheet_cache._replicas.clear()
+    return results
+
+def format_results(results):
+    """
+    Formats benchmark results as a table with one row per operation and a column per size.
+    """
+    sizes = sorted({size for size, _ in results})
+    operations = ['load'] + list(THRESHOLDS)
+    lines = [f"{'operation':<20}" + "".join(f"{size:>16,}" for size in sizes)]
+    for operation in operations:
+        cells = []
+        for size in sizes:
+            milliseconds, calls = results[(size, operation)]
+            cells.append(f"{milliseconds:>9.3f}ms {calls:>4.1f}c")
+        lines.append(f"{operation:<20}" + "".join(f"{cell:>16}" for cell in cells))
+    return "\n".join(lines)
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Offline throughput and API-call benchmarks of the Masterlist data path,
+    run against BENCHMARK_BACKEND (by default an in-memory fake of the Sheets
+    API) at each BENCHMARK_SIZES roster size. Each test fails if its operation goes over its THRESHOLDS entry.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.results = {}
+        for size in BENCHMARK_SIZES:
+            for operation, result in run_size(size).items():
+                cls.results[(size, operation)] = result
+
+    @classmethod
+    def tearDownClass(cls):
+        print("\n" + format_results(cls.results))
+
+    def check(self, operation):
+        ceilings, max_calls = THRESHOLDS[operation]
+        for size in BENCHMARK_SIZES:
+            max_milliseconds = ceilings[min((listed for listed in ceilings if listed >= size), default=max(ceilings))]
+            milliseconds, calls = self.results[(size, operation)]
+            with self.subTest(size=size):
+                self.assertLessEqual(calls, max_calls, f"{operation} made {calls} API calls per operation at {size} rows")
+                self.assertLessEqual(milliseconds, max_milliseconds, f"{operation} took {milliseconds:.3f}ms at {size} rows")
+
+    def test_add(self):
+        self.check('add')
+
+    def test_edit(self):
+        self.check('edit')
+
+    def test_remove(self):
+        self.check('remove')
+
+    def test_lookup(self):
+        self.check('lookup')
+
+    def test_lookup_discord_id(self):
+        self.check('lookup_discord_id')
+
+    def test_recent_updates(self):
+        self.check('recent_updates')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.bulk import parse_masterlist_csv, parse_watchlist_csv, parse_ign_list
+
+class TestCsvImport(unittest.TestCase):
+    """
+    CSV imports keep the valid rows and report every bad row by line number.
+    """
+
+    def test_valid_row(self):
+        text = (
+            "ign , join date, RANK,status,known alts,house,discord id,notes,suspicious alert\n"
+            "Alpha,01/02/2024,0 - Endless,\"Active, Main\",\"A1, A2\",Red,1001,note,Yes\n"
+        )
+        rows, errors = parse_masterlist_csv(text)
+        self.assertEqual(errors, [])
+        self.assertEqual(rows, [["Alpha", "01/02/2024", "0 - Endless", "Active, Main", "A1, A2", "Red", "1001", "note", True]])
+
+    def test_choices_match_labels_ignoring_case(self):
+        rows, errors = parse_masterlist_csv("IGN,Rank,Status\nAlpha,5 - lost soul,banned\n")
+        self.assertEqual(errors, [])
+        self.assertEqual(rows[0][2:4], ["5 - Lost Soul", "BANNED"])
+
+    def test_missing_columns_and_dates_default(self):
+        rows, errors = parse_watchlist_csv("IGN,Status,Reason\nBravo,Caution,Making Trouble\n")
+        self.assertEqual(errors, [])
+        self.assertEqual(rows[0][3], datetime.now().strftime("%m/%d/%Y"))
+        self.assertEqual(rows[0][5:], ["", "", "", "", "", ""])
+
+    def test_malformed_rows(self):
+        text = (
+            "IGN,Join Date,Rank,Status,Suspicious Alert\n"
+            ",01/02/2024,0 - Endless,Inactive,No\n"
+            "Bravo,2024-01-02,0 - Endless,Inactive,No\n"
+            "Charlie,1/2/24,0 - Endless,Inactive,No\n"
+            "Delta,01/02/2024,Admiral,Inactive,No\n"
+            "Echo,01/02/2024,0 - Endless,Sleeping,No\n"
+            "Foxtrot,01/02/2024,0 - Endless,Inactive,Maybe\n"
+            "\n"
+            "Golf,01/02/2024,0 - Endless,Inactive\n"
+        )
+        rows, errors = parse_masterlist_csv(text)
+        self.assertEqual([row[0] for row in rows], ["Golf"])
+        self.assertEqual(errors, [
+            "Line 2: missing IGN",
+            "Line 3: invalid date '2024-01-02', use MM/DD/YYYY",
+            "Line 4: invalid date '1/2/24', use MM/DD/YYYY",
+            "Line 5: unknown rank 'Admiral'",
+            "Line 6: unknown status 'Sleeping'",
+            "Line 7: Suspicious Alert must be 'Yes' or 'No', got 'maybe'",
+        ])
+
+    def test_bad_header(self):
+        with self.assertRaises(ValueError):
+            parse_masterlist_csv("")
+        with self.assertRaises(ValueError):
+            parse_watchlist_csv("Name,Status\nAlpha,Caution\n")
+
+    def test_ign_list(self):
+        self.assertEqual(parse_ign_list("Alpha, Bravo;Alpha\n\n Charlie "), ["Alpha", "Bravo", "Charlie"])
+
+if __name__ == '__main__':
+    unittest.main()
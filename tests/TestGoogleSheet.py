@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gspread.exceptions import APIError
+
+from fake_sheets import FakeHTTPSession
+from utils import google_sheet
+from utils.google_sheet import ScheduledHTTPClient, RequestScheduler, ApiCallTracker, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from utils.guild_registry import GuildSheetConfig, sheet_scope
+
+SPREADSHEET_URL = "https://sheets.googleapis.com/v4/spreadsheets/test-spreadsheet"
+
+class TestRequestScheduler(unittest.TestCase):
+    """
+    The token bucket refills at the quota rate up to its burst, and waiting
+    requests get tokens in priority order.
+    """
+
+    def test_bucket_refills_at_the_quota_rate(self):
+        scheduler = RequestScheduler(requests_per_minute=600, burst=10)
+        scheduler.throttle()
+        scheduler._updated -= 0.35
+        scheduler._refill()
+        self.assertAlmostEqual(scheduler._tokens, 3.5, delta=0.1)
+        scheduler._updated -= 100
+        scheduler._refill()
+        self.assertEqual(scheduler._tokens, 10)
+
+    def test_burst_then_wait(self):
+        scheduler = RequestScheduler(requests_per_minute=600, burst=2)
+        start = time.monotonic()
+        scheduler.acquire()
+        scheduler.acquire()
+        self.assertLess(time.monotonic() - start, 0.05)
+        scheduler.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.08)
+
+    def test_throttle_empties_the_bucket(self):
+        scheduler = RequestScheduler(requests_per_minute=600, burst=10)
+        scheduler.throttle()
+        start = time.monotonic()
+        scheduler.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.08)
+
+    def test_interactive_requests_go_first(self):
+        scheduler = RequestScheduler(requests_per_minute=120, burst=1)
+        scheduler.throttle()
+        served = []
+        threads = []
+
+        def request(priority):
+            scheduler.acquire(priority)
+            served.append(priority)
+
+        for priority in [PRIORITY_BACKGROUND, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE]:
+            thread = threading.Thread(target=request, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            deadline = time.monotonic() + 1
+            while scheduler.queue_depth < len(threads) and time.monotonic() < deadline:
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(served, [PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BACKGROUND])
+
+class TestRetries(unittest.TestCase):
+    """
+    Rate-limited requests are always retried; timeouts and server errors
+    only for reads, since a write may already have been applied.
+    """
+
+    def send(self, method, endpoint, statuses):
+        session = FakeHTTPSession(statuses)
+        client = ScheduledHTTPClient(None, session=session)
+        client.scheduler = RequestScheduler(6000, burst=100)
+        client.tracker = ApiCallTracker()
+        with mock.patch.object(google_sheet, "SHEETS_MAX_BACKOFF", 0), sheet_scope(GuildSheetConfig(None, "test-spreadsheet")):
+            try:
+                client.request(method, SPREADSHEET_URL + endpoint)
+            except APIError as e:
+                return len(session.requests), e.response.status_code
+        return len(session.requests), 200
+
+    def test_reads_retry_server_errors(self):
+        self.assertEqual(self.send("get", "/values/Masterlist!A:A", [503, 408]), (3, 200))
+        self.assertEqual(self.send("post", "/values:batchGetByDataFilter", [500]), (2, 200))
+
+    def test_writes_retry_only_rate_limits(self):
+        self.assertEqual(self.send("post", ":batchUpdate", [429, 429]), (3, 200))
+        self.assertEqual(self.send("post", ":batchUpdate", [503]), (1, 503))
+        self.assertEqual(self.send("post", "/values/Masterlist!A1:append", [408]), (1, 408))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import threading
+import unittest
+
+# Keep the tests away from the real SQLite mirror
+os.environ["SHEETS_MIRROR_PATH"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_discord import FakeInteraction, FakeUser
+from fake_sheets import FakeSpreadsheet, FakeSheetPool, fake_backend
+from utils import async_ops, google_sheet, masterlist_ops, sheet_cache, storage
+from utils.guild_registry import GuildRegistry, DEFAULT_KEY, set_guild_registry, guild_scope, guild_routed, scoped_path
+from utils.google_sheet import RequestScheduler
+from utils.metrics import instrumented
+from TestBenchmarks import build_sheets, masterlist_row
+
+DEFAULT_GUILD = 100
+ALLIES_GUILD = 200
+
+def write_registry(directory, entries):
+    path = os.path.join(directory, "guild_sheets.json")
+    with open(path, "w") as f:
+        json.dump(entries, f)
+    return path
+
+class TestGuildRegistry(unittest.TestCase):
+    """
+    Guilds map to their own spreadsheet; unlisted guilds use SPREADSHEET_ID only
+    without a registry file or with the "default" opt-in.
+    """
+
+    def test_entries_and_fallback(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_registry(directory, {
+                str(ALLIES_GUILD): {"spreadsheet_id": "allies-sheet", "name": "Allies", "requests_per_minute": 20},
+                "300": "allies-sheet",
+                "400": "main-sheet",
+            })
+            registry = GuildRegistry(path, "main-sheet")
+            allies = registry.get(ALLIES_GUILD)
+            self.assertEqual((allies.key, allies.name, allies.requests_per_minute), ("allies-sheet", "Allies", 20))
+            self.assertEqual(registry.get(300).key, "allies-sheet")
+            self.assertEqual(registry.get(400).key, DEFAULT_KEY)
+            self.assertEqual(registry.get(None).key, DEFAULT_KEY)
+            self.assertEqual([config.key for config in registry.configs()], [DEFAULT_KEY, "allies-sheet"])
+
+            # Once guilds are listed, unlisted guilds need the explicit opt-in
+            with self.assertRaises(ValueError):
+                registry.get(999)
+            write_registry(directory, {str(ALLIES_GUILD): "allies-sheet", "default": True})
+            registry.reload()
+            self.assertEqual(registry.get(999).key, DEFAULT_KEY)
+            with self.assertRaises(ValueError):
+                GuildRegistry(path, None).get(999)
+            self.assertEqual(GuildRegistry(os.path.join(directory, "missing.json"), "main-sheet").get(999).key, DEFAULT_KEY)
+            self.assertEqual(GuildRegistry(os.path.join(directory, "missing.json"), None).get(999).key, DEFAULT_KEY)
+
+    def test_scoped_path(self):
+        self.assertEqual(scoped_path("asbot.db", DEFAULT_KEY), "asbot.db")
+        self.assertEqual(scoped_path("asbot.db", "allies-sheet"), "asbot.allies-sheet.db")
+        self.assertEqual(scoped_path("", "allies-sheet"), "")
+
+class TestFairQueueing(unittest.TestCase):
+    """
+    A burst from one spreadsheet must not hold back another sharing its quota.
+    """
+
+    def test_tenants_take_turns(self):
+        scheduler = RequestScheduler(requests_per_minute=1200, burst=1)
+        scheduler.throttle()
+        served = []
+        threads = []
+
+        def request(tenant):
+            scheduler.acquire(tenant=tenant)
+            served.append(tenant)
+
+        for tenant in ["busy", "busy", "busy", "quiet"]:
+            thread = threading.Thread(target=request, args=(tenant,))
+            thread.start()
+            threads.append(thread)
+            deadline = time.monotonic() + 1
+            while scheduler.queue_depth < len(threads) and time.monotonic() < deadline:
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(served, ["busy", "quiet", "busy", "busy"])
+
+class AddPlayerModal:
+    @instrumented
+    @guild_routed
+    async def on_submit(self, interaction, row):
+        return await async_ops.add_player_to_guild(row, "kahzukie")
+
+class TestGuildIsolation(unittest.TestCase):
+    """
+    Each guild reads and writes only its own spreadsheet, also when the
+    work runs in a worker thread.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = write_registry(self.directory.name, {str(DEFAULT_GUILD): "main-sheet", str(ALLIES_GUILD): "allies-sheet"})
+        self.previous_registry = set_guild_registry(GuildRegistry(path, "main-sheet"))
+        self.main = FakeSpreadsheet(build_sheets(10))
+        self.allies = FakeSpreadsheet(build_sheets(10))
+        google_sheet._pools["allies-sheet"] = FakeSheetPool(self.allies)
+        sheet_cache._replicas.clear()
+
+    def tearDown(self):
+        storage._backends.clear()
+        sheet_cache._replicas.clear()
+        google_sheet._pools.pop("allies-sheet", None)
+        async_ops.shutdown()
+        set_guild_registry(self.previous_registry)
+        self.directory.cleanup()
+
+    def test_guilds_use_their_own_spreadsheet(self):
+        row = masterlist_row(500)
+        interaction = FakeInteraction(FakeUser(1, "kahzukie"), {"custom_id": "persistent_add"})
+        interaction.guild_id = ALLIES_GUILD
+        with fake_backend(self.main):
+            asyncio.run(AddPlayerModal().on_submit(interaction, row))
+
+            masterlist = self.allies.worksheet('Masterlist').get_all_values()
+            self.assertEqual(masterlist[-1][0], row[0])
+            self.assertEqual(self.allies.worksheet('Update Sheet').get_all_values()[-1][1:], ["Kahz", f"Added player to Masterlist: {row[0]}"])
+            self.assertEqual(len(self.main.worksheet('Masterlist').get_all_values()), 11)
+            self.assertEqual(len(self.main.worksheet('Update Sheet').get_all_values()), 11)
+
+            with guild_scope(ALLIES_GUILD):
+                self.assertIsNotNone(masterlist_ops.find_player(row[0]))
+            with guild_scope(DEFAULT_GUILD):
+                self.assertIsNone(masterlist_ops.find_player(row[0]))
+                self.assertIsNotNone(masterlist_ops.find_player(masterlist_row(0)[0]))
+        self.assertEqual(set(storage._backends), {DEFAULT_KEY, "allies-sheet"})
+
+if __name__ == '__main__':
+    unittest.main()
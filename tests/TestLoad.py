@@ -0,0 +1,305 @@
+import os
+import sys
+import math
+import time
+import random
+import asyncio
+import unittest
+from unittest import mock
+from datetime import datetime
+
+# Keep the load run away from the real SQLite mirror
+os.environ["SHEETS_MIRROR_PATH"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_discord import FakeUser, press, choose, submit
+from TestBenchmarks import build_sheets, benchmark_backend
+from utils import sheet_cache, storage
+from utils.watchlist_ops import ACTION_BY_NAMES
+from commands import sheet
+
+# Moderators using the persistent menu at once, and flows each of them runs one after another
+LOAD_CONCURRENCY = int(os.getenv("LOAD_CONCURRENCY", "20"))
+LOAD_ROUNDS = int(os.getenv("LOAD_ROUNDS", "3"))
+# Simulated round trip of every fake Sheets request, and of every Discord response, in seconds
+LOAD_LATENCY = float(os.getenv("LOAD_LATENCY", "0.05"))
+LOAD_DISCORD_LATENCY = float(os.getenv("LOAD_DISCORD_LATENCY", "0.02"))
+# Longest pause between two steps of a flow, in seconds (the time a moderator spends reading or typing)
+LOAD_THINK_TIME = float(os.getenv("LOAD_THINK_TIME", "0.05"))
+# Masterlist and Update Sheet rows the fake spreadsheet starts with
+LOAD_ROSTER_SIZE = int(os.getenv("LOAD_ROSTER_SIZE", "1000"))
+# Longest tolerated event-loop stall, in milliseconds, and how often the loop is sampled, in seconds
+LOAD_MAX_LAG_MS = float(os.getenv("LOAD_MAX_LAG_MS", "50"))
+LOAD_LAG_INTERVAL = float(os.getenv("LOAD_LAG_INTERVAL", "0.005"))
+
+WATCHLIST_HEADER = ["IGN", "Status", "Guild", "Date", "Reason", "Action By", "Notes", "Screenshot", "Known Alts", "Discord ID", "House"]
+
+FLOWS = ('masterlist', 'watchlist')
+OUTCOMES = ('ok', 'lost', 'crossed', 'failed')
+
+class FlowError(Exception):
+    """
+    A step of a flow did not answer the way the next step needs.
+    """
+
+class Moderator:
+    """
+    One simulated moderator clicking through the real views and modals of commands/sheet.py.
+
+    Each step gets its own interaction, as it does with Discord. The time
+    spent inside handlers is summed per flow; think time between steps is not.
+    """
+
+    def __init__(self, index, rng):
+        names = list(ACTION_BY_NAMES)
+        self.user = FakeUser(10 ** 17 + index, names[index % len(names)])
+        self.index = index
+        self.rng = rng
+        self.handler_time = 0.0
+
+    async def step(self, action, *args, **kwargs):
+        if LOAD_THINK_TIME:
+            await asyncio.sleep(self.rng.uniform(0, LOAD_THINK_TIME))
+        start = time.perf_counter()
+        interaction = await action(*args, self.user, latency=LOAD_DISCORD_LATENCY, **kwargs)
+        self.handler_time += time.perf_counter() - start
+        return interaction
+
+    @staticmethod
+    def next_view(interaction):
+        message = interaction.response.message
+        if message is None or message.view is None:
+            raise FlowError(message.content if message else f"no message ({interaction.response.kind})")
+        return message.view
+
+    @staticmethod
+    def next_modal(interaction):
+        if interaction.response.modal is None:
+            message = interaction.response.message
+            raise FlowError(message.content if message else f"no modal ({interaction.response.kind})")
+        return interaction.response.modal
+
+    def entry(self, flow, round_number):
+        """
+        Returns the IGN and the fields this moderator types into a flow, unique to both.
+        """
+        ign = f"Load{self.index:03d}{flow[0].upper()}{round_number:03d}"
+        return ign, {
+            'discord_id': str(self.user.id),
+            'known_alts': f"{ign}Alt",
+            'house': f"House{self.index:03d}",
+            'notes': f"{self.user.name} round {round_number}",
+        }
+
+    async def masterlist_flow(self, menu, ign, fields):
+        today = datetime.now().strftime("%m/%d/%Y")
+        interaction = await self.step(press, menu, "Add Player to Masterlist")
+        interaction = await self.step(choose, self.next_view(interaction), sheet.StatusSelect, "Active, Main")
+        interaction = await self.step(choose, self.next_view(interaction), sheet.DateSelect, today)
+        interaction = await self.step(choose, self.next_view(interaction), sheet.RankSelect, sheet.RANK_OPTIONS[3][0])
+        interaction = await self.step(submit, self.next_modal(interaction), player_ign=ign, **fields)
+        interaction = await self.step(press, self.next_view(interaction), "Continue")
+        start = time.perf_counter()
+        interaction = await self.step(submit, self.next_modal(interaction), sus_alert="No")
+        return interaction, time.perf_counter() - start
+
+    async def watchlist_flow(self, menu, ign, fields):
+        today = datetime.now().strftime("%m/%d/%Y")
+        interaction = await self.step(press, menu, "Add Player in Watchlist")
+        interaction = await self.step(choose, self.next_view(interaction), sheet.BanStatus, sheet.BAN_STATUS_OPTIONS[4][1])
+        interaction = await self.step(choose, self.next_view(interaction), sheet.StatusReason, sheet.BAN_REASON_OPTIONS[4][1])
+        interaction = await self.step(choose, self.next_view(interaction), sheet.WatchlistDateSelect, today)
+        interaction = await self.step(submit, self.next_modal(interaction), player_ign=ign, **fields)
+        interaction = await self.step(press, self.next_view(interaction), "Continue")
+        start = time.perf_counter()
+        interaction = await self.step(
+            submit, self.next_modal(interaction),
+            guild=f"Guild{self.index:03d}", screenshot=f"https://example.com/{ign}.png"
+        )
+        return interaction, time.perf_counter() - start
+
+    async def run(self, menu, rounds):
+        """
+        Runs `rounds` flows, alternating between the Masterlist and Watchlist flows.
+
+        Returns:
+            list: One result dict per flow
+        """
+        results = []
+        for round_number in range(rounds):
+            flow = FLOWS[(self.index + round_number) % len(FLOWS)]
+            ign, fields = self.entry(flow, round_number)
+            result = {'flow': flow, 'ign': ign, 'fields': fields, 'user': self.user, 'message': ""}
+            self.handler_time = 0.0
+            try:
+                run_flow = self.masterlist_flow if flow == 'masterlist' else self.watchlist_flow
+                interaction, result['submit'] = await run_flow(menu, ign, fields)
+                messages = [message.content for message in interaction.followup.messages]
+                result['message'] = messages[-1] if messages else ""
+                if sheet.EXPIRED_SESSION_MESSAGE in messages:
+                    result['outcome'] = 'lost'
+                elif result['message'].startswith("✅"):
+                    result['outcome'] = 'ok' if ign in result['message'] else 'crossed'
+                else:
+                    result['outcome'] = 'failed'
+            except FlowError as e:
+                result['message'] = str(e)
+                result['outcome'] = 'lost' if str(e) == sheet.EXPIRED_SESSION_MESSAGE else 'failed'
+            except Exception as e:
+                result['message'] = f"{type(e).__name__}: {e}"
+                result['outcome'] = 'failed'
+            result['latency'] = self.handler_time
+            results.append(result)
+        return results
+
+async def monitor_lag(samples, stop, interval=LOAD_LAG_INTERVAL):
+    """
+    Samples event-loop lag: how much later than requested a short sleep wakes up.
+    """
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - start - interval))
+
+def verify_rows(results):
+    """
+    Checks every successful flow against the row it wrote, demoting it to
+    'lost' if the row is missing or 'crossed' if it holds another moderator's fields.
+    """
+    backend = storage.get_backend()
+    tabs = {
+        'masterlist': {row[0]: row for row in backend.scan('Masterlist')[1:] if row},
+        'watchlist': {row[0]: row for row in backend.scan('Watchlist')[1:] if row},
+    }
+    for result in results:
+        if result['outcome'] != 'ok':
+            continue
+        row = tabs[result['flow']].get(result['ign'])
+        if row is None:
+            result['outcome'] = 'lost'
+            continue
+        fields = result['fields']
+        if result['flow'] == 'masterlist':
+            written = {'known_alts': row[4], 'house': row[5], 'discord_id': row[6], 'notes': row[7]}
+        else:
+            written = {'notes': row[6], 'known_alts': row[8], 'discord_id': row[9], 'house': row[10]}
+            if row[5] != ACTION_BY_NAMES[result['user'].name]:
+                result['outcome'] = 'crossed'
+        if written != fields:
+            result['outcome'] = 'crossed'
+
+async def run_load(concurrency=LOAD_CONCURRENCY, rounds=LOAD_ROUNDS):
+    """
+    Runs `concurrency` moderators against one shared persistent menu, as in the live channel.
+
+    Returns:
+        dict: The flow results, event-loop lag samples, wall time, API calls and sessions left in the store
+    """
+    sheet.multi_modal_store._entries.clear()
+    menu = sheet.PersistentActionView()
+    moderators = [Moderator(index, random.Random(index)) for index in range(concurrency)]
+    lag, stop = [], asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lag, stop))
+    start = time.perf_counter()
+    try:
+        batches = await asyncio.gather(*(moderator.run(menu, rounds) for moderator in moderators))
+    finally:
+        stop.set()
+        await monitor
+    wall = time.perf_counter() - start
+    results = [result for batch in batches for result in batch]
+    verify_rows(results)
+    return {'results': results, 'lag': lag, 'wall': wall, 'sessions_left': len(sheet.multi_modal_store)}
+
+def percentile(samples, q):
+    """
+    Nearest-rank percentile of a list of samples, 0 if it is empty.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+def format_report(report, api_calls):
+    """
+    Formats a load run as outcome counts and latency percentiles per flow, followed by the event-loop lag.
+    """
+    results = report['results']
+    lines = [
+        f"{LOAD_CONCURRENCY} moderators x {LOAD_ROUNDS} flows in {report['wall']:.2f}s, "
+        f"Sheets latency {LOAD_LATENCY * 1000:.0f}ms, Discord latency {LOAD_DISCORD_LATENCY * 1000:.0f}ms, {api_calls} API calls",
+        f"{'flow':<12}" + "".join(f"{outcome:>8}" for outcome in OUTCOMES)
+        + "".join(f"{label:>10}" for label in ('p50', 'p95', 'p99', 'max', 'submit95')) + "  (ms)",
+    ]
+    for flow in FLOWS:
+        flow_results = [result for result in results if result['flow'] == flow]
+        latencies = [result['latency'] * 1000 for result in flow_results if result['outcome'] == 'ok']
+        submits = [result['submit'] * 1000 for result in flow_results if result['outcome'] == 'ok']
+        counts = "".join(f"{sum(result['outcome'] == outcome for result in flow_results):>8}" for outcome in OUTCOMES)
+        percentiles = "".join(f"{percentile(latencies, q):>10.1f}" for q in (50, 95, 99, 100))
+        lines.append(f"{flow:<12}{counts}{percentiles}{percentile(submits, 95):>10.1f}")
+    lag = [sample * 1000 for sample in report['lag']]
+    lines.append(
+        f"event loop lag over {len(lag)} samples: p50 {percentile(lag, 50):.1f}ms, "
+        f"p99 {percentile(lag, 99):.1f}ms, max {max(lag, default=0.0):.1f}ms"
+    )
+    lines.append(f"sessions left in multi_modal_store: {report['sessions_left']}")
+    for result in results:
+        if result['outcome'] != 'ok':
+            lines.append(f"  {result['outcome']}: {result['flow']} {result['ign']} by {result['user'].name}: {result['message']}")
+    return "\n".join(lines)
+
+class TestLoad(unittest.TestCase):
+    """
+    Concurrent-interaction load run of the persistent menu flows: LOAD_CONCURRENCY
+    moderators click through the real Masterlist and Watchlist add flows of
+    commands/sheet.py at once, against the fake Sheets backend with LOAD_LATENCY
+    per request. Fails on any lost, crossed or failed flow, on sessions left
+    behind in multi_modal_store, or on an event-loop stall over LOAD_MAX_LAG_MS.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        sheets = build_sheets(LOAD_ROSTER_SIZE)
+        sheets['Watchlist'] = [WATCHLIST_HEADER]
+        # Run with the default freshness settings, whatever the environment says
+        with mock.patch.object(sheet_cache, "SHEETS_FRESHNESS_INTERVAL", 30.0), \
+                mock.patch.object(sheet_cache, "SHEETS_MAX_STALENESS", 600.0), \
+                benchmark_backend(sheets, name="sheets", latency=LOAD_LATENCY) as spreadsheet:
+            sheet_cache._replicas.clear()
+            try:
+                cls.report = asyncio.run(run_load())
+            finally:
+                sheet_cache._replicas.clear()
+            cls.api_calls = spreadsheet.request_count
+
+    @classmethod
+    def tearDownClass(cls):
+        print("\n" + format_report(cls.report, cls.api_calls))
+
+    def outcomes(self, outcome):
+        return [f"{result['flow']} {result['ign']}: {result['message']}" for result in self.report['results'] if result['outcome'] == outcome]
+
+    def test_all_flows_ran(self):
+        self.assertEqual(len(self.report['results']), LOAD_CONCURRENCY * LOAD_ROUNDS)
+
+    def test_no_lost_sessions(self):
+        self.assertEqual(self.outcomes('lost'), [])
+
+    def test_no_crossed_sessions(self):
+        self.assertEqual(self.outcomes('crossed'), [])
+
+    def test_no_failed_flows(self):
+        self.assertEqual(self.outcomes('failed'), [])
+
+    def test_no_sessions_left(self):
+        self.assertEqual(self.report['sessions_left'], 0)
+
+    def test_event_loop_lag(self):
+        worst = max(self.report['lag'], default=0.0) * 1000
+        self.assertLessEqual(worst, LOAD_MAX_LAG_MS, f"the event loop stalled for {worst:.1f}ms")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import io
+import os
+import sys
+import time
+import asyncio
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_discord import FakeInteraction, FakeUser
+from utils.loop_watchdog import LoopWatchdog, RollingHistogram
+from utils.metrics import instrumented, get_registry
+from commands.stats import format_stats_message, MAX_MESSAGE_LENGTH
+
+def slow_sheets_call():
+    time.sleep(0.3)
+
+class BlockingModal:
+    @instrumented
+    async def on_submit(self, interaction):
+        slow_sheets_call()
+
+async def block_loop_once():
+    watchdog = LoopWatchdog(asyncio.get_running_loop(), threshold_ms=100, interval=0.01, window=60)
+    watchdog.start()
+    await asyncio.sleep(0.05)
+    interaction = FakeInteraction(FakeUser(1, "kahzukie"), {"custom_id": "persistent_remove"})
+    await BlockingModal().on_submit(interaction)
+    await asyncio.sleep(0.05)
+    watchdog.stop()
+    return watchdog
+
+class TestLoopWatchdog(unittest.TestCase):
+    """
+    A blocking call inside an instrumented handler must be reported once,
+    naming the handler, the interaction and the blocking function.
+    """
+
+    def test_stall_is_captured(self):
+        with redirect_stdout(io.StringIO()) as output:
+            watchdog = asyncio.run(block_loop_once())
+        self.assertEqual(len(watchdog.stalls), 1)
+        stall = watchdog.stalls[0]
+        self.assertEqual(stall.interaction, "BlockingModal.on_submit")
+        self.assertEqual(stall.command, "persistent_remove")
+        self.assertEqual(stall.user, "kahzukie")
+        self.assertTrue(stall.caller.startswith("slow_sheets_call"), stall.caller)
+        self.assertIn("slow_sheets_call", stall.stack)
+        self.assertGreaterEqual(stall.duration_ms, 250)
+        self.assertIn("Event loop blocked", output.getvalue())
+
+        stats = watchdog.lag_stats()
+        self.assertEqual(stats["stalls"], 1)
+        self.assertGreaterEqual(stats["max"], 250)
+        stages = {(row["name"], row["stage"]) for row in get_registry().snapshot()}
+        self.assertIn(("BlockingModal.on_submit", "loop_stall"), stages)
+
+    def test_rolling_histogram_drops_old_samples(self):
+        histogram = RollingHistogram(window=10, slices=10)
+        histogram.observe(500, now=100.0)
+        histogram.observe(2, now=105.0)
+        merged, worst = histogram.merged(now=106.0)
+        self.assertEqual((merged.count, worst), (2, 500))
+        merged, worst = histogram.merged(now=111.0)
+        self.assertEqual((merged.count, worst), (1, 2))
+
+    def test_stop_after_the_loop_closed(self):
+        async def start():
+            watchdog = LoopWatchdog(asyncio.get_running_loop())
+            watchdog.start()
+            return watchdog
+        loop = asyncio.new_event_loop()
+        watchdog = loop.run_until_complete(start())
+        loop.close()
+        watchdog.stop()
+        watchdog._thread.join(1)
+        self.assertFalse(watchdog._thread.is_alive())
+
+    def test_stats_message_fits_with_the_lag_line(self):
+        rows = [{"name": f"Handler{i}.on_submit", "stage": "total", "count": 1, "errors": 0, "p50": 1, "p95": 2, "p99": 3} for i in range(100)]
+        lag = {"p50": 1, "p99": 40, "max": 1200, "stalls": 3}
+        message = format_stats_message(rows, lag)
+        self.assertLessEqual(len(message), MAX_MESSAGE_LENGTH)
+        self.assertTrue(message.endswith("3 stall(s) since start"), message[-80:])
+
+if __name__ == '__main__':
+    unittest.main()
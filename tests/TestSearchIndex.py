@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.search_index import PrefixIndex, TrigramIndex
+
+NAMES = ["Kahzukie", "Kahz", "Beaako", "Nightflower", "Nyx", "Alpha", "Alphabet", "Luna"]
+
+class TestPrefixIndex(unittest.TestCase):
+    """
+    Autocomplete matches the start of a name, ignoring case, in alphabetical order.
+    """
+
+    def setUp(self):
+        self.index = PrefixIndex([(name, "Masterlist") for name in NAMES] + [("kahzalt", "Masterlist alt")])
+
+    def test_prefix_matches(self):
+        self.assertEqual(
+            self.index.search("KAH"),
+            [("Kahz", "Masterlist"), ("kahzalt", "Masterlist alt"), ("Kahzukie", "Masterlist")]
+        )
+        self.assertEqual(self.index.search(" alpha "), [("Alpha", "Masterlist"), ("Alphabet", "Masterlist")])
+        self.assertEqual(self.index.search("Zed"), [])
+
+    def test_limit(self):
+        self.assertEqual(len(self.index.search("", limit=3)), 3)
+        self.assertEqual(len(self.index.search("", limit=25)), len(NAMES) + 1)
+
+class TestTrigramIndex(unittest.TestCase):
+    """
+    Lookup scores names by shared trigrams, so short prefixes and misspelled
+    long names both match, and updates keep the index in step with the roster.
+    """
+
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.update(NAMES)
+
+    def names(self, query, **kwargs):
+        return [name for _, name in self.index.search(query, **kwargs)]
+
+    def test_short_query(self):
+        self.assertIn("Nyx", self.names("ny"))
+        self.assertEqual(self.names("Nyx")[0], "Nyx")
+        self.assertEqual(self.names("xq"), [])
+
+    def test_long_misspelled_query(self):
+        results = self.index.search("Kahzukei")
+        self.assertEqual(results[0][1], "Kahzukie")
+        self.assertLess(results[0][0], 1.0)
+        self.assertEqual(self.names("night flower")[0], "Nightflower")
+        self.assertEqual(self.index.search("Nightflower")[0], (1.0, "Nightflower"))
+
+    def test_scores_are_ordered_and_limited(self):
+        results = self.index.search("Alpha", limit=2)
+        self.assertEqual([name for _, name in results], ["Alpha", "Alphabet"])
+        self.assertGreater(results[0][0], results[1][0])
+        self.assertEqual(self.names("Alpha", min_score=0.95), ["Alpha"])
+
+    def test_update_adds_and_removes(self):
+        self.index.update(["Kahzukie", "Skar"])
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.names("Alpha"), [])
+        self.assertEqual(self.names("Skar"), ["Skar"])
+        self.index.update(["Kahzukie", "Skar", "Exdel"])
+        self.assertEqual(self.names("Exdel"), ["Exdel"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import session_store
+from utils.session_store import SessionStore, ModalSession, FLOW_MASTERLIST_ADD, FLOW_WATCHLIST_ADD
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+class TestSessionStore(unittest.TestCase):
+    """
+    Modal state expires after the TTL since its last use, and the least
+    recently used entry is evicted once the store is full.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(session_store, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_expire(self):
+        store = SessionStore(ttl=60)
+        store.put(1, FLOW_MASTERLIST_ADD, ModalSession(player_ign="Alpha"))
+        self.clock.now += 59
+        self.assertEqual(store.get(1, FLOW_MASTERLIST_ADD).player_ign, "Alpha")
+        # Reading it extended its lifetime
+        self.clock.now += 59
+        self.assertIsNotNone(store.get(1, FLOW_MASTERLIST_ADD))
+        self.clock.now += 60
+        self.assertIsNone(store.get(1, FLOW_MASTERLIST_ADD))
+        self.assertEqual(len(store), 0)
+
+    def test_pop_of_an_expired_entry(self):
+        store = SessionStore(ttl=60)
+        store.put(1, FLOW_MASTERLIST_ADD, ModalSession())
+        self.clock.now += 61
+        self.assertIsNone(store.pop(1, FLOW_MASTERLIST_ADD))
+        self.assertEqual(len(store), 0)
+
+    def test_put_purges_expired_entries(self):
+        store = SessionStore(ttl=60)
+        for user_id in range(5):
+            store.put(user_id, FLOW_MASTERLIST_ADD, ModalSession())
+        self.clock.now += 61
+        store.put(99, FLOW_WATCHLIST_ADD, ModalSession())
+        self.assertEqual(len(store), 1)
+
+    def test_least_recently_used_is_evicted(self):
+        store = SessionStore(ttl=60, max_entries=2)
+        store.put(1, FLOW_MASTERLIST_ADD, ModalSession(player_ign="Alpha"))
+        store.put(2, FLOW_MASTERLIST_ADD, ModalSession(player_ign="Bravo"))
+        store.get(1, FLOW_MASTERLIST_ADD)
+        store.put(3, FLOW_MASTERLIST_ADD, ModalSession(player_ign="Charlie"))
+        self.assertEqual(len(store), 2)
+        self.assertIsNone(store.get(2, FLOW_MASTERLIST_ADD))
+        self.assertEqual(store.get(1, FLOW_MASTERLIST_ADD).player_ign, "Alpha")
+        self.assertEqual(store.get(3, FLOW_MASTERLIST_ADD).player_ign, "Charlie")
+
+    def test_flows_are_kept_apart(self):
+        store = SessionStore(ttl=60)
+        store.put(1, FLOW_MASTERLIST_ADD, ModalSession(player_ign="Alpha"))
+        store.put(1, FLOW_WATCHLIST_ADD, ModalSession(player_ign="Bravo"))
+        self.assertEqual(store.pop(1, FLOW_MASTERLIST_ADD).player_ign, "Alpha")
+        self.assertIsNone(store.get(1, FLOW_MASTERLIST_ADD))
+        self.assertEqual(store.get(1, FLOW_WATCHLIST_ADD).player_ign, "Bravo")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from TestBenchmarks import build_sheets, masterlist_row, benchmark_backend
+from utils import masterlist_ops, sheet_cache, storage
+
+class TestWriteChecks(unittest.TestCase):
+    """
+    A write trusts the replica within SHEETS_FRESHNESS_INTERVAL of the last
+    sync, and after it checks only the rows it writes to, so a row moved by
+    hand is still found.
+    """
+
+    def setUp(self):
+        sheet_cache._replicas.clear()
+
+    def tearDown(self):
+        sheet_cache._replicas.clear()
+
+    def hand_insert(self, spreadsheet, row_number, row):
+        spreadsheet._worksheets['Masterlist'].rows.insert(row_number - 1, row)
+
+    def test_write_within_the_interval_is_one_request(self):
+        with benchmark_backend(build_sheets(10), "sheets") as spreadsheet:
+            masterlist_ops.get_masterlist_replica().ensure_loaded()
+            before = spreadsheet.request_count
+            success, message = masterlist_ops.remove_player_from_guild(masterlist_row(3)[0], "bench")
+            self.assertTrue(success, message)
+            self.assertEqual(spreadsheet.request_count - before, 1)
+
+    def test_stale_single_write_checks_its_row(self):
+        with benchmark_backend(build_sheets(10), "sheets") as spreadsheet:
+            masterlist_ops.get_masterlist_replica().ensure_loaded()
+            self.hand_insert(spreadsheet, 2, ["Inserted"])
+            with mock.patch.object(sheet_cache, "SHEETS_FRESHNESS_INTERVAL", 0.0):
+                success, message = masterlist_ops.remove_player_from_guild(masterlist_row(3)[0], "bench")
+            self.assertTrue(success, message)
+            igns = storage.get_backend().read_column('Masterlist')
+            self.assertIn("Inserted", igns)
+            self.assertNotIn(masterlist_row(3)[0], igns)
+            self.assertEqual(len(igns), 11)
+
+    def test_stale_bulk_write_probes_once(self):
+        with benchmark_backend(build_sheets(10), "sheets") as spreadsheet:
+            masterlist_ops.get_masterlist_replica().ensure_loaded()
+            self.hand_insert(spreadsheet, 2, ["Inserted"])
+            player_ids = [masterlist_row(i)[0] for i in (1, 4, 7)]
+            reads_before = spreadsheet.calls["values_get"]
+            with mock.patch.object(sheet_cache, "SHEETS_FRESHNESS_INTERVAL", 0.0):
+                success, message, not_found = masterlist_ops.bulk_remove_players_from_guild(player_ids, "bench")
+            self.assertTrue(success, message)
+            self.assertEqual(not_found, [])
+            # One IGN column probe, then the reload it triggers
+            self.assertEqual(spreadsheet.calls["values_get"] - reads_before, 2)
+            igns = storage.get_backend().read_column('Masterlist')
+            self.assertIn("Inserted", igns)
+            self.assertFalse(set(player_ids) & set(igns))
+
+if __name__ == '__main__':
+    unittest.main()
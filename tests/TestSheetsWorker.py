@@ -0,0 +1,123 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils import async_ops, google_sheet, sheets_worker, storage
+from utils.sheets_worker import WorkerError
+from TestBenchmarks import build_sheets, masterlist_row
+from worker_support import QUOTA_CREDENTIALS, take_quota_token, hold_sheets_thread, send_traced_request
+
+class TestSheetsWorker(unittest.TestCase):
+    """
+    Operations sent to a Sheets worker process run there and their results,
+    errors and crashes come back to the caller.
+
+    The worker reads its configuration from the environment, so it is
+    pointed at a prepared SQLite database instead of Google Sheets.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "asbot.db")
+        backend = storage.SqliteBackend(self.path)
+        for sheet_name, rows in build_sheets(10).items():
+            backend.replace_rows(sheet_name, rows)
+        backend.store._conn.close()
+        self.environ = dict(os.environ)
+        os.environ.update(STORAGE_BACKEND="sqlite", STORAGE_SQLITE_PATH=self.path, SHEETS_MIRROR_PATH="", SHEETS_MAX_WORKERS="1")
+        # Lets the workers import the helpers of worker_support
+        os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(__file__)), os.environ.get("PYTHONPATH")]))
+
+    def tearDown(self):
+        sheets_worker.stop_worker_pool()
+        os.environ.clear()
+        os.environ.update(self.environ)
+        self.directory.cleanup()
+
+    def test_operations_run_in_the_worker(self):
+        row = masterlist_row(500)
+
+        async def session():
+            pool = sheets_worker.start_worker_pool(processes=2)
+            results = {}
+            results['add'] = await async_ops.add_player_to_guild(row, "bench")
+            results['find'] = await async_ops.find_player(row[0])
+            results['suggest'] = await async_ops.suggest("Player00050")
+            results['concurrent'] = await asyncio.gather(*(async_ops.find_player(masterlist_row(i)[0]) for i in range(10)))
+            with self.assertRaises(ValueError):
+                await pool.call(int, "not a number")
+            with self.assertRaises(WorkerError):
+                await pool.call(os._exit, 1)
+            # Calls fail until the worker has been restarted
+            for _ in range(100):
+                try:
+                    results['after_restart'] = await async_ops.find_player(row[0])
+                    break
+                except WorkerError:
+                    await asyncio.sleep(0.1)
+            return results
+
+        results = asyncio.run(session())
+        self.assertIs(results['add'][0], True)
+        self.assertEqual(results['find'][:4], row[:4])
+        self.assertIn((row[0], "Masterlist"), results['suggest'])
+        self.assertEqual([result[0] for result in results['concurrent']], [masterlist_row(i)[0] for i in range(10)])
+        self.assertEqual(results['after_restart'][0], row[0])
+
+        # Stopping the pool flushes the worker's Update Sheet queue
+        sheets_worker.stop_worker_pool()
+        backend = storage.SqliteBackend(self.path)
+        self.assertEqual(backend.scan('Masterlist')[-1][0], row[0])
+        self.assertEqual(backend.scan('Update Sheet')[-1][2], f"Added player to Masterlist: {row[0]}")
+        backend.store._conn.close()
+
+    def test_quota_is_paced_by_the_bot(self):
+        scheduler = google_sheet.get_scheduler(QUOTA_CREDENTIALS)
+
+        async def session():
+            pool = sheets_worker.start_worker_pool(processes=2)
+            await pool.call(take_quota_token)
+            # An empty bucket in the bot holds back the worker's next request
+            scheduler.throttle()
+            start = time.monotonic()
+            await pool.call(take_quota_token)
+            return time.monotonic() - start
+
+        try:
+            self.assertGreater(asyncio.run(session()), 0.5)
+        finally:
+            google_sheet._schedulers.pop(QUOTA_CREDENTIALS, None)
+
+    def test_state_reads_skip_the_sheets_queue(self):
+        async def session():
+            pool = sheets_worker.start_worker_pool(processes=1)
+            await async_ops.find_player(masterlist_row(0)[0])
+            # SHEETS_MAX_WORKERS is 1, so this call takes the worker's only Sheets thread
+            held = asyncio.ensure_future(pool.call(hold_sheets_thread, 3))
+            await asyncio.sleep(0.5)
+            start = time.monotonic()
+            suggestions = await async_ops.suggest("Player000005")
+            elapsed = time.monotonic() - start
+            await held
+            return suggestions, elapsed
+
+        suggestions, elapsed = asyncio.run(session())
+        self.assertIn((masterlist_row(5)[0], "Masterlist"), suggestions)
+        self.assertLess(elapsed, 1.5)
+
+    def test_requests_are_attributed_to_the_operation(self):
+        async def session():
+            pool = sheets_worker.start_worker_pool(processes=1)
+            return await pool.call(send_traced_request)
+
+        counts = asyncio.run(session())
+        self.assertEqual(dict(counts), {("send_traced_request", "post"): 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_sheets import FakeSpreadsheet, fake_backend
+from utils.storage import StorageBackend, MemoryBackend, SqliteBackend, ExportingBackend, append_change, update_change, delete_change
+from utils.sheets_backend import SheetsBackend
+
+SHEETS = {
+    'Masterlist': [["IGN", "Rank", "Status"], ["Alpha", "Member", "Active"], ["Bravo", "Officer", "Active"]],
+    'Update Sheet': [["Date", "User", "Change"]],
+}
+
+CHANGES = [
+    [append_change('Masterlist', [["Charlie", "Member", True]]), append_change('Update Sheet', [["2024/01/01", "Kahz", "Added Charlie"]])],
+    [update_change('Masterlist', 2, ["Alpha", "Officer"])],
+    [update_change('Masterlist', 3, ["Inactive"], 2)],
+    [delete_change('Masterlist', [2, 3]), append_change('Update Sheet', [["2024/01/02", "Kahz", "Removed Alpha"], ["2024/01/02", "Kahz", "Removed Bravo"]])],
+    [append_change('Masterlist', [["Delta", "", ""], ["Echo", "Member", 5]])],
+]
+
+EXPECTED_MASTERLIST = [["IGN", "Rank", "Status"], ["Charlie", "Member", "TRUE"], ["Delta", "", ""], ["Echo", "Member", "5"]]
+
+class TestStorageBackends(unittest.TestCase):
+    """
+    The same changes must leave every storage backend with the same rows.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check_backend(self, backend):
+        for changes in CHANGES:
+            backend.commit(changes)
+        self.assertEqual(backend.scan('Masterlist'), EXPECTED_MASTERLIST)
+        self.assertEqual(backend.read_column('Masterlist'), ["IGN", "Charlie", "Delta", "Echo"])
+        self.assertEqual(backend.read_rows('Masterlist', 3, 4), [["Delta"], ["Echo", "Member", "5"]])
+        self.assertEqual(backend.find('Masterlist', " Echo "), [4])
+        self.assertEqual(backend.find('Masterlist', "Alpha"), [])
+        self.assertEqual(backend.tail('Update Sheet', 2, columns=3), [["2024/01/02", "Kahz", "Removed Alpha"], ["2024/01/02", "Kahz", "Removed Bravo"]])
+        self.assertEqual(len(backend.tail('Update Sheet', 10)), 4)
+
+    def test_backends_must_implement_scan_and_commit(self):
+        class ScanOnlyBackend(StorageBackend):
+            def scan(self, sheet_name):
+                return []
+
+        with self.assertRaises(TypeError):
+            ScanOnlyBackend()
+
+    def test_memory_backend(self):
+        self.check_backend(MemoryBackend(SHEETS))
+
+    def test_sqlite_backend(self):
+        backend = SqliteBackend(os.path.join(self.directory.name, "storage.db"))
+        for sheet_name, rows in SHEETS.items():
+            backend.replace_rows(sheet_name, rows)
+        self.check_backend(backend)
+        backend.store._conn.close()
+
+    def test_sheets_backend(self):
+        spreadsheet = FakeSpreadsheet(SHEETS)
+        with fake_backend(spreadsheet):
+            before = spreadsheet.calls['batch_update']
+            self.check_backend(SheetsBackend())
+            self.assertEqual(spreadsheet.calls['batch_update'] - before, len(CHANGES))
+
+    def test_exporting_backend(self):
+        export = MemoryBackend(SHEETS)
+        backend = ExportingBackend(MemoryBackend(), export, interval=60)
+        self.check_backend(backend)
+        backend.flush()
+        self.assertEqual(backend.depth, 0)
+        self.assertEqual(export.scan('Masterlist'), EXPECTED_MASTERLIST)
+        self.assertEqual(export.scan('Update Sheet'), backend.scan('Update Sheet'))
+        backend.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
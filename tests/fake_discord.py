@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+
+import discord
+
+# Interaction IDs handed out to fake interactions
+_interaction_ids = itertools.count(1)
+
+class FakeUser:
+    """
+    The user behind a fake interaction; only the fields the commands read.
+    """
+
+    def __init__(self, user_id, name):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+
+class FakeMessage:
+    """
+    The ephemeral message a fake interaction answered with, and the view attached to it.
+    """
+
+    def __init__(self, content=None, view=None, embed=None):
+        self.content = content
+        self.view = view
+        self.embed = embed
+
+class FakeResponse:
+    """
+    Stand-in for discord.InteractionResponse.
+
+    Records what the handler answered with, waits `latency` seconds per
+    call to simulate the Discord round trip, and raises
+    discord.InteractionResponded on a second response like the real one.
+    """
+
+    def __init__(self, interaction, latency=0.0):
+        self._interaction = interaction
+        self.latency = latency
+        self.kind = None
+        self.message = None
+        self.modal = None
+
+    def is_done(self):
+        return self.kind is not None
+
+    async def _respond(self, kind):
+        if self.kind is not None:
+            raise discord.InteractionResponded(self._interaction)
+        self.kind = kind
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def send_message(self, content=None, *, view=None, embed=None, ephemeral=False, **kwargs):
+        await self._respond("message")
+        self.message = FakeMessage(content, view, embed)
+
+    async def edit_message(self, *, content=None, view=None, embed=None, **kwargs):
+        await self._respond("edit")
+        self.message = FakeMessage(content, view, embed)
+
+    async def send_modal(self, modal):
+        await self._respond("modal")
+        self.modal = modal
+
+    async def defer(self, *, ephemeral=False, thinking=False):
+        await self._respond("defer")
+
+class FakeFollowup:
+    """
+    Stand-in for the interaction followup webhook; keeps every message sent.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.messages = []
+
+    async def send(self, content=None, *, view=None, embed=None, ephemeral=False, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = FakeMessage(content, view, embed)
+        self.messages.append(message)
+        return message
+
+class FakeInteraction:
+    """
+    Stand-in for discord.Interaction, one per button press, select or modal submit.
+
+    Args:
+        user (FakeUser): The user interacting
+        data (dict): The interaction payload, such as the chosen select values
+        latency (float): Simulated Discord round trip of every response, in seconds
+    """
+
+    def __init__(self, user, data=None, latency=0.0):
+        self.id = next(_interaction_ids)
+        self.user = user
+        self.data = data or {}
+        self.guild = None
+        self.guild_id = None
+        self.response = FakeResponse(self, latency)
+        self.followup = FakeFollowup(latency)
+
+def find_item(view, label=None, item_type=None):
+    """
+    Returns the first component of a view with the given label or type.
+
+    Raises:
+        LookupError: If the view has no such component
+    """
+    for item in view.children:
+        if label is not None and getattr(item, "label", None) != label:
+            continue
+        if item_type is not None and not isinstance(item, item_type):
+            continue
+        return item
+    raise LookupError(f"{type(view).__name__} has no component {label or item_type.__name__}")
+
+async def press(view, label, user, latency=0.0):
+    """
+    Presses a button through discord.py's own component dispatch.
+
+    Returns:
+        FakeInteraction: The interaction, holding the handler's response
+    """
+    item = find_item(view, label=label)
+    interaction = FakeInteraction(user, {"component_type": 2, "custom_id": item.custom_id}, latency)
+    await view._scheduled_task(item, interaction)
+    return interaction
+
+async def choose(view, item_type, value, user, latency=0.0):
+    """
+    Picks one option of a select menu through discord.py's own component dispatch.
+
+    Returns:
+        FakeInteraction: The interaction, holding the handler's response
+    """
+    item = find_item(view, item_type=item_type)
+    interaction = FakeInteraction(user, {"component_type": 3, "custom_id": item.custom_id, "values": [value]}, latency)
+    await view._scheduled_task(item, interaction)
+    return interaction
+
+async def submit(modal, user, latency=0.0, **fields):
+    """
+    Fills in the text inputs of a modal by attribute name and submits it
+    through discord.py's own modal dispatch.
+
+    Returns:
+        FakeInteraction: The interaction, holding the handler's response
+    """
+    components = [
+        {"type": 1, "components": [{"type": 4, "custom_id": getattr(modal, name).custom_id, "value": value}]}
+        for name, value in fields.items()
+    ]
+    interaction = FakeInteraction(user, {"custom_id": modal.custom_id, "components": components}, latency)
+    await modal._scheduled_task(interaction, components, {})
+    return interaction
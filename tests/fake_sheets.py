@@ -0,0 +1,312 @@
+import re
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from gspread.cell import Cell
+from gspread.exceptions import WorksheetNotFound
+
+from utils import google_sheet
+from utils.google_sheet import SheetPool
+
+_A1_RE = re.compile(r"^([A-Z]*)(\d*)$")
+
+def _column_number(letters):
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord('A') + 1
+    return number
+
+def _split_range(range_name):
+    """
+    Splits an A1 range such as "'Update Sheet'!A5:C" into its title and bounds.
+
+    Returns:
+        tuple: (title, first_row, first_column, last_row, last_column), 1-based, None where open
+    """
+    title, _, cells = range_name.rpartition("!")
+    if len(title) > 1 and title[0] == title[-1] == "'":
+        title = title[1:-1].replace("''", "'")
+    start, _, end = cells.partition(":")
+    end = end or start
+    bounds = []
+    for part in (start, end):
+        letters, digits = _A1_RE.match(part).groups()
+        bounds.append((int(digits) if digits else None, _column_number(letters) if letters else None))
+    (first_row, first_column), (last_row, last_column) = bounds
+    return title, first_row, first_column, last_row, last_column
+
+def _cell_value(cell):
+    value = cell.get("userEnteredValue", {})
+    if "boolValue" in value:
+        return "TRUE" if value["boolValue"] else "FALSE"
+    if "numberValue" in value:
+        number = value["numberValue"]
+        return str(int(number)) if float(number).is_integer() else str(number)
+    return str(value.get("stringValue", ""))
+
+def _trim(rows):
+    """
+    Drops trailing blank cells and rows, as the values API does.
+    """
+    trimmed = []
+    for row in rows:
+        row = list(row)
+        while row and row[-1] == "":
+            row.pop()
+        trimmed.append(row)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+def _data_row_count(rows):
+    """
+    Returns the number of the last row that has a non-blank cell.
+    """
+    count = len(rows)
+    while count and not any(rows[count - 1]):
+        count -= 1
+    return count
+
+class FakeWorksheet:
+    """
+    In-memory stand-in for a gspread Worksheet.
+
+    Rows are stored as lists of strings, the way get_all_values reads them.
+    Every method that would be an API request goes through the parent
+    FakeSpreadsheet, which counts it and applies the simulated latency.
+    """
+
+    def __init__(self, spreadsheet, sheet_id, title, rows=None):
+        self.spreadsheet = spreadsheet
+        self.id = sheet_id
+        self.title = title
+        self.rows = [[str(value) for value in row] for row in rows or []]
+
+    @property
+    def row_count(self):
+        return len(self.rows)
+
+    @property
+    def col_count(self):
+        return max(26, max((len(row) for row in self.rows), default=0))
+
+    def _row(self, row_number):
+        while len(self.rows) < row_number:
+            self.rows.append([])
+        return self.rows[row_number - 1]
+
+    def _write(self, row_number, first_column, values):
+        row = self._row(row_number)
+        row += [""] * (first_column - 1 + len(values) - len(row))
+        row[first_column - 1:first_column - 1 + len(values)] = [str(value) for value in values]
+
+    def _read(self, first_row, first_column, last_row, last_column):
+        first_row = first_row or 1
+        last_row = min(last_row or len(self.rows), len(self.rows))
+        first_column = first_column or 1
+        rows = []
+        for row in self.rows[first_row - 1:last_row]:
+            rows.append(row[first_column - 1:last_column] if last_column else row[first_column - 1:])
+        return _trim(rows)
+
+    def get_all_values(self):
+        self.spreadsheet._request("values_get")
+        width = max((len(row) for row in self.rows), default=0)
+        return [row + [""] * (width - len(row)) for row in self.rows]
+
+    def row_values(self, row):
+        self.spreadsheet._request("values_get")
+        trimmed = _trim(self.rows[row - 1:row])
+        return trimmed[0] if trimmed else []
+
+    def find(self, query, in_column=None):
+        self.spreadsheet._request("values_get")
+        for row_number, row in enumerate(self.rows, start=1):
+            for column, value in enumerate(row, start=1):
+                if value == query and (in_column is None or column == in_column):
+                    return Cell(row_number, column, value)
+        return None
+
+    def append_row(self, values, **kwargs):
+        return self.append_rows([values], **kwargs)
+
+    def append_rows(self, values, **kwargs):
+        self.spreadsheet._request("values_append")
+        first_row = _data_row_count(self.rows) + 1
+        for offset, row in enumerate(values):
+            self._write(first_row + offset, 1, row)
+        last_row = first_row + len(values) - 1
+        return {"updates": {"updatedRange": f"'{self.title}'!A{first_row}:Z{last_row}", "updatedRows": len(values)}}
+
+    def update(self, values=None, range_name=None, **kwargs):
+        self.spreadsheet._request("values_update")
+        if isinstance(values, str) and not isinstance(range_name, str):
+            # Old-style update(range_name, values) call
+            values, range_name = range_name, values
+        _, first_row, first_column, _, _ = _split_range(range_name or "A1")
+        for offset, row in enumerate(values):
+            self._write((first_row or 1) + offset, first_column or 1, row)
+        return {"updatedRange": f"'{self.title}'!{range_name}"}
+
+    def delete_rows(self, start_index, end_index=None):
+        self.spreadsheet._request("batch_update")
+        del self.rows[start_index - 1:end_index or start_index]
+
+class FakeSpreadsheet:
+    """
+    In-memory stand-in for a gspread Spreadsheet with the tabs the bot uses.
+
+    Supports the requests the ops modules send: batch_update with
+    appendCells, updateCells and deleteDimension, values_batch_update,
+    values_get and fetch_sheet_metadata.
+
+    Every request sleeps for `latency` seconds and is counted in `calls` by
+    API method, so a benchmark can report API calls per operation.
+    """
+
+    def __init__(self, sheets=None, latency=0.0):
+        self.id = "fake-spreadsheet"
+        self.title = "Fake Spreadsheet"
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._worksheets = {}
+        for sheet_id, (title, rows) in enumerate((sheets or {}).items()):
+            self._worksheets[title] = FakeWorksheet(self, sheet_id, title, rows)
+
+    def _request(self, operation):
+        with self._lock:
+            self.calls[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def request_count(self):
+        return sum(self.calls.values())
+
+    def _by_id(self, sheet_id):
+        for worksheet in self._worksheets.values():
+            if worksheet.id == sheet_id:
+                return worksheet
+        raise WorksheetNotFound(sheet_id)
+
+    def worksheets(self):
+        self._request("fetch_sheet_metadata")
+        return list(self._worksheets.values())
+
+    def worksheet(self, title):
+        self._request("fetch_sheet_metadata")
+        try:
+            return self._worksheets[title]
+        except KeyError:
+            raise WorksheetNotFound(title)
+
+    def fetch_sheet_metadata(self, params=None):
+        self._request("fetch_sheet_metadata")
+        return {
+            "sheets": [
+                {"properties": {"sheetId": ws.id, "title": ws.title, "gridProperties": {"rowCount": ws.row_count}}}
+                for ws in self._worksheets.values()
+            ]
+        }
+
+    def values_get(self, range_name, params=None):
+        title, first_row, first_column, last_row, last_column = _split_range(range_name)
+        self._request("values_get")
+        values = self._worksheets[title]._read(first_row, first_column, last_row, last_column)
+        response = {"range": range_name, "majorDimension": "ROWS"}
+        if values:
+            response["values"] = values
+        return response
+
+    def values_batch_update(self, body):
+        self._request("values_batch_update")
+        for item in body.get("data", []):
+            title, first_row, first_column, _, _ = _split_range(item["range"])
+            worksheet = self._worksheets[title]
+            for offset, row in enumerate(item["values"]):
+                worksheet._write(first_row + offset, first_column or 1, row)
+        return {"totalUpdatedRows": len(body.get("data", []))}
+
+    def batch_update(self, body):
+        self._request("batch_update")
+        replies = []
+        for request in body.get("requests", []):
+            if "appendCells" in request:
+                item = request["appendCells"]
+                worksheet = self._by_id(item["sheetId"])
+                first_row = _data_row_count(worksheet.rows) + 1
+                for offset, row in enumerate(item["rows"]):
+                    worksheet._write(first_row + offset, 1, [_cell_value(cell) for cell in row.get("values", [])])
+            elif "updateCells" in request:
+                item = request["updateCells"]
+                start = item["start"]
+                worksheet = self._by_id(start["sheetId"])
+                for offset, row in enumerate(item["rows"]):
+                    values = [_cell_value(cell) for cell in row.get("values", [])]
+                    worksheet._write(start["rowIndex"] + 1 + offset, start.get("columnIndex", 0) + 1, values)
+            elif "deleteDimension" in request:
+                item = request["deleteDimension"]["range"]
+                worksheet = self._by_id(item["sheetId"])
+                del worksheet.rows[item["startIndex"]:item["endIndex"]]
+            else:
+                raise NotImplementedError(f"FakeSpreadsheet does not support {list(request)}")
+            replies.append({})
+        return {"spreadsheetId": self.id, "replies": replies}
+
+class FakeSheetPool(SheetPool):
+    """
+    SheetPool that hands out a FakeSpreadsheet instead of opening the real one.
+    """
+
+    def __init__(self, spreadsheet):
+        super().__init__(spreadsheet.id)
+        self.fake = spreadsheet
+
+    def _open_spreadsheet(self):
+        return self.fake
+
+@contextmanager
+def fake_backend(spreadsheet):
+    """
+    Routes get_sheet and get_spreadsheet to a fake spreadsheet inside the block.
+
+    Args:
+        spreadsheet (FakeSpreadsheet): The fake to serve
+    """
+    previous = google_sheet._pool
+    google_sheet._pool = FakeSheetPool(spreadsheet)
+    try:
+        yield spreadsheet
+    finally:
+        google_sheet._pool = previous
+
+class FakeResponse:
+    """
+    An HTTP response with only the fields gspread reads.
+    """
+
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.text = ""
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": "fake error", "status": "FAKE"}}
+
+class FakeHTTPSession:
+    """
+    HTTP session that answers requests without sending them.
+
+    Each request takes the next status code from `statuses`, and gets 200
+    once they run out. Requests are kept in `requests` as (method, url).
+    """
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        return FakeResponse(self.statuses.pop(0) if self.statuses else 200)
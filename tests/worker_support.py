@@ -0,0 +1,31 @@
+import time
+
+from fake_sheets import FakeHTTPSession
+from utils import google_sheet
+from utils.guild_registry import GuildSheetConfig, sheet_scope
+
+# Credentials whose quota the worker tests wait for
+QUOTA_CREDENTIALS = "test-credentials"
+
+def take_quota_token():
+    """
+    Waits for one Sheets request token in the worker, as every request does.
+    """
+    google_sheet.get_scheduler(QUOTA_CREDENTIALS).acquire()
+
+def hold_sheets_thread(seconds):
+    time.sleep(seconds)
+
+def send_traced_request():
+    """
+    Sends one request through ScheduledHTTPClient, as a Sheets operation does.
+
+    Returns:
+        Counter: The requests recorded by caller and operation
+    """
+    client = google_sheet.ScheduledHTTPClient(None, session=FakeHTTPSession())
+    client.scheduler = google_sheet.RequestScheduler(600)
+    client.tracker = google_sheet.ApiCallTracker()
+    with sheet_scope(GuildSheetConfig(None, "test-spreadsheet")):
+        client.request("post", "https://sheets.googleapis.com/v4/spreadsheets/test-spreadsheet:batchUpdate")
+    return client.tracker.counts(("caller", "operation"))
@@ -0,0 +1,208 @@
+import os
+import time
+import asyncio
+import threading
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from . import masterlist_ops, watchlist_ops, update_log_ops, search_index
+from .google_sheet import get_client, get_sheet
+from .guild_registry import current_sheet_config
+from .storage import get_backend
+from .metrics import span, mark_error
+from .sheets_worker import get_worker_pool
+
+load_dotenv()
+
+SHEETS_MAX_WORKERS = int(os.getenv("SHEETS_MAX_WORKERS", "4"))
+
+# Worksheets opened during the startup warm-up
+WARM_UP_SHEETS = ('Masterlist', 'Watchlist', 'Update Sheet')
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+def get_executor(key=None):
+    """
+    Returns the bounded thread pool used for blocking calls to a spreadsheet.
+
+    Each spreadsheet has its own pool, so a guild whose calls are queued
+    for quota cannot take up the workers of another guild. The pool size
+    is read from the SHEETS_MAX_WORKERS environment variable (default: 4).
+
+    Args:
+        key (str): Spreadsheet key, or None for the current guild's spreadsheet
+
+    Returns:
+        ThreadPoolExecutor: The spreadsheet's Sheets executor
+    """
+    key = key or current_sheet_config().key
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = _executors[key] = ThreadPoolExecutor(max_workers=SHEETS_MAX_WORKERS, thread_name_prefix=f"sheets-{key[:8]}")
+        return executor
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Runs a blocking Google Sheets function on the current spreadsheet's thread pool.
+
+    The caller's context variables (such as the request priority and the
+    current guild) are carried over to the worker thread.
+
+    Args:
+        func (callable): The synchronous function to run
+        *args: Positional arguments for the function
+        **kwargs: Keyword arguments for the function
+
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(context.run, func, *args, **kwargs))
+
+async def run_sheets(func, *args, **kwargs):
+    """
+    Runs a blocking Google Sheets function wherever Sheets work is done.
+
+    That is a Sheets worker process when the worker pool is running
+    (SHEETS_WORKER_PROCESSES), else the current spreadsheet's thread pool.
+    In worker mode the function must be defined at module level and its
+    arguments and result must be picklable.
+
+    Args:
+        func (callable): The synchronous function to run
+        *args: Positional arguments for the function
+        **kwargs: Keyword arguments for the function
+
+    Returns:
+        The function's return value
+    """
+    pool = get_worker_pool()
+    if pool is not None:
+        return await pool.call(func, *args, **kwargs)
+    return await run_blocking(func, *args, **kwargs)
+
+async def run_sheets_state(func, *args, **kwargs):
+    """
+    Runs a quick, non-blocking function over the Sheets state (replicas,
+    queues, call counts) in the process holding it.
+
+    Called directly when Sheets work is done in this process; sent to the
+    Sheets worker's state thread otherwise. Either way it never waits
+    behind queued Sheets calls.
+
+    Args:
+        func (callable): The function to run
+        *args: Positional arguments for the function
+        **kwargs: Keyword arguments for the function
+
+    Returns:
+        The function's return value
+    """
+    pool = get_worker_pool()
+    if pool is not None:
+        return await pool.call_state(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+def shutdown():
+    """
+    Waits for queued Sheets calls to finish and stops the thread pools.
+    """
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+async def _timed(timings, step, func, *args):
+    start = time.perf_counter()
+    result = await run_blocking(func, *args)
+    timings.append((step, time.perf_counter() - start))
+    return result
+
+async def warm_up():
+    """
+    Prepares everything the first interaction would otherwise pay for,
+    for the current guild's spreadsheet.
+
+    With the Google Sheets storage backend, authorizes the Sheets client
+    once and opens the worksheets concurrently. Then loads the Masterlist and Watchlist replicas (from the SQLite mirror
+    when it has a copy), syncs the Update Sheet mirror and builds the
+    /lookup indexes. When the Sheets worker pool is running, this happens
+    in the worker of the current spreadsheet.
+
+    Returns:
+        list: (step (str), seconds (float)) for each step, in completion order
+    """
+    pool = get_worker_pool()
+    if pool is not None:
+        # The replicas live in the worker, so warm it up instead
+        return await pool.call(warm_up)
+    timings = []
+    if get_backend().remote:
+        await _timed(timings, "Authorize Sheets client", get_client, current_sheet_config().credentials)
+        await asyncio.gather(*(_timed(timings, f"Open {name}", get_sheet, name) for name in WARM_UP_SHEETS))
+    await asyncio.gather(
+        _timed(timings, "Load Masterlist", masterlist_ops.get_masterlist_replica().ensure_loaded),
+        _timed(timings, "Load Watchlist", watchlist_ops.get_watchlist_replica().ensure_loaded),
+        _timed(timings, "Sync Update Sheet mirror", update_log_ops.sync_update_log_mirror),
+    )
+    await _timed(timings, "Build lookup indexes", search_index.refresh_lookup_indexes)
+    return timings
+
+def _async_wrapper(func):
+    stage = f"sheets.{func.__name__}"
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with span(stage):
+            result = await run_sheets(func, *args, **kwargs)
+        # Operations report failures as (False, message, ...) instead of raising
+        if isinstance(result, tuple) and result and result[0] is False:
+            mark_error()
+        return result
+    return wrapper
+
+# Masterlist operations
+add_player_to_guild = _async_wrapper(masterlist_ops.add_player_to_guild)
+bulk_add_players_to_guild = _async_wrapper(masterlist_ops.bulk_add_players_to_guild)
+remove_player_from_guild = _async_wrapper(masterlist_ops.remove_player_from_guild)
+edit_player_in_guild = _async_wrapper(masterlist_ops.edit_player_in_guild)
+bulk_remove_players_from_guild = _async_wrapper(masterlist_ops.bulk_remove_players_from_guild)
+bulk_edit_players_in_guild = _async_wrapper(masterlist_ops.bulk_edit_players_in_guild)
+get_all_players = _async_wrapper(masterlist_ops.get_all_players)
+find_player = _async_wrapper(masterlist_ops.find_player)
+find_player_by_discord_id = _async_wrapper(masterlist_ops.find_player_by_discord_id)
+find_player_by_alt = _async_wrapper(masterlist_ops.find_player_by_alt)
+
+# Watchlist operations
+add_player_to_banlist = _async_wrapper(watchlist_ops.add_player_to_banlist)
+bulk_add_players_to_banlist = _async_wrapper(watchlist_ops.bulk_add_players_to_banlist)
+remove_player_from_banlist = _async_wrapper(watchlist_ops.remove_player_from_banlist)
+edit_player_in_banlist = _async_wrapper(watchlist_ops.edit_player_in_banlist)
+bulk_remove_players_from_banlist = _async_wrapper(watchlist_ops.bulk_remove_players_from_banlist)
+bulk_edit_players_in_banlist = _async_wrapper(watchlist_ops.bulk_edit_players_in_banlist)
+get_all_banned_players = _async_wrapper(watchlist_ops.get_all_banned_players)
+find_banned_player = _async_wrapper(watchlist_ops.find_banned_player)
+find_banned_player_by_discord_id = _async_wrapper(watchlist_ops.find_banned_player_by_discord_id)
+find_banned_player_by_alt = _async_wrapper(watchlist_ops.find_banned_player_by_alt)
+is_player_banned = _async_wrapper(watchlist_ops.is_player_banned)
+
+# Search
+lookup = _async_wrapper(search_index.lookup)
+
+async def suggest(prefix, sheets=None, limit=25):
+    """
+    Suggests IGNs and alts that start with the typed text, see search_index.suggest.
+
+    Served from memory, by the Sheets worker holding the replicas when the
+    worker pool is running.
+
+    Returns:
+        list: Unique (name, label) tuples in alphabetical order
+    """
+    return await run_sheets_state(search_index.suggest, prefix, sheets, limit)
@@ -0,0 +1,49 @@
+from .storage import get_backend, append_change
+from .update_log_ops import build_update_row
+from .metrics import span
+
+def resolve_targets(replica, player_ids):
+    """
+    Finds the rows a bulk write goes to.
+
+    Syncs the replica and resolves every ID with one check against the
+    sheet (see SheetReplica.resolve_rows()). An ID listed twice, or two IDs
+    on the same row, target that row once. Call this with `replica.lock`
+    held, and keep it held until the write is applied to the replica.
+
+    Args:
+        replica (SheetReplica): Replica of the worksheet being written
+        player_ids (list): IDs of the targeted players
+
+    Returns:
+        tuple: (targets (dict of row number to the first ID found there), not_found (list of IDs))
+    """
+    replica.ensure_synced()
+    targets = {}
+    not_found = []
+    for player_id, row_number in zip(player_ids, replica.resolve_rows(player_ids)):
+        if row_number is None:
+            not_found.append(player_id)
+        else:
+            targets.setdefault(row_number, player_id)
+    return targets, not_found
+
+def commit_with_log(changes, user_name, change_descriptions):
+    """
+    Commits changes and their Update Sheet entries together.
+
+    With the Google Sheets backend this is one batch_update, so a change
+    is never written without its Update Sheet entry or the other way round.
+    Every op logs through here; there is no separate Update Sheet write.
+
+    Args:
+        changes (list): Changes built with the utils.storage change builders
+        user_name (str): Name of the user making the change
+        change_descriptions (list): One Update Sheet description per logged change
+
+    Returns:
+        The backend's commit result, e.g. the batch_update response
+    """
+    log_rows = [build_update_row(user_name, description) for description in change_descriptions]
+    with span("audit_commit"):
+        return get_backend().commit(list(changes) + [append_change('Update Sheet', log_rows)])
@@ -1,59 +1,645 @@
 import os
+import sys
 import json
+import time
+import heapq
+import random
+import itertools
+import threading
+import contextvars
+from collections import Counter, deque
+from contextlib import contextmanager
+from urllib.parse import unquote
 import gspread
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
 from google.oauth2.service_account import Credentials
 from dotenv import load_dotenv
 
+from .guild_registry import SPREADSHEET_ID, DEFAULT_KEY, current_sheet_config
+
 load_dotenv()
 
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 SERVICE_ACCOUNT_JSON = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
-SPREADSHEET_ID = os.getenv("SPREADSHEET_ID")
 
-def get_client():
+SHEETS_REQUESTS_PER_MINUTE = int(os.getenv("SHEETS_REQUESTS_PER_MINUTE", "60"))
+SHEETS_REQUEST_BURST = int(os.getenv("SHEETS_REQUEST_BURST", "10"))
+SHEETS_MAX_RETRIES = int(os.getenv("SHEETS_MAX_RETRIES", "5"))
+SHEETS_MAX_BACKOFF = float(os.getenv("SHEETS_MAX_BACKOFF", "32"))
+
+# Request priorities, lower values are sent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Rate limit, request timeout and server errors are worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# A rate-limited request was not applied, so it is the only one safe to retry
+# for writes; a timeout or server error may come after the write went through
+RATE_LIMITED_STATUS_CODES = {429}
+# POST endpoints that only read, so they can be retried like a GET
+READ_ONLY_POST_VERBS = (":batchGet", ":batchGetByDataFilter", ":getByDataFilter")
+
+_priority = contextvars.ContextVar("sheets_priority", default=PRIORITY_INTERACTIVE)
+
+@contextmanager
+def request_priority(priority):
+    """
+    Sets the scheduling priority of Sheets requests made inside the block.
+
+    Interactive reads and writes use the default PRIORITY_INTERACTIVE;
+    background work such as replica refreshes and exports should use PRIORITY_BACKGROUND.
+
+    Args:
+        priority (int): Priority for requests in the block, lower runs first
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority():
     """
-    Creates and returns an authenticated Google Sheets client.
-    
-    Attempts to load credentials from either a file path or JSON content.
-    
     Returns:
-        gspread.Client: Authenticated Google Sheets client
-        
+        int: Priority of Sheets requests made in the current context
+    """
+    return _priority.get()
+
+class RequestScheduler:
+    """
+    Token bucket with a priority queue in front of every Sheets request.
+
+    Tokens refill at the per-minute quota rate up to a small burst. When
+    requests are waiting, the one with the lowest priority value gets the
+    next token, so interactive calls go ahead of background work.
+
+    Within a priority, requests are queued fairly across tenants (the
+    spreadsheets sharing the quota): each tenant's requests are tagged
+    with consecutive virtual start times, so tenants take turns and a
+    burst from one guild cannot hold back another's. A single tenant is
+    served oldest first.
+    """
+
+    def __init__(self, requests_per_minute=SHEETS_REQUESTS_PER_MINUTE, burst=SHEETS_REQUEST_BURST):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0
+        self._finish_times = {}
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE, tenant=DEFAULT_KEY):
+        """
+        Blocks until this request may be sent.
+
+        Args:
+            priority (int): Request priority, lower runs first
+            tenant (str): Spreadsheet key the request is for, for fair queueing
+        """
+        with self._cond:
+            start = max(self._virtual_time, self._finish_times.get(tenant, 0))
+            self._finish_times[tenant] = start + 1
+            entry = (priority, start, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == entry and self._tokens >= 1:
+                        heapq.heappop(self._waiters)
+                        self._virtual_time = max(self._virtual_time, start)
+                        self._tokens -= 1
+                        self._cond.notify_all()
+                        return
+                    wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.05
+                    self._cond.wait(timeout=wait)
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def throttle(self):
+        """
+        Empties the bucket after a rate limit response so every caller backs off.
+        """
+        with self._cond:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+_schedulers = {}
+_sheet_schedulers = {}
+_schedulers_lock = threading.Lock()
+# Builds the scheduler of a set of credentials; replaced in Sheets worker processes
+_scheduler_factory = None
+
+def set_scheduler_factory(factory):
+    """
+    Makes get_scheduler build new schedulers with factory(credentials), e.g.
+    in a Sheets worker whose requests are paced by the bot process.
+
+    Args:
+        factory (callable): Takes the credentials and returns an object with acquire(), throttle() and queue_depth
+    """
+    global _scheduler_factory
+    with _schedulers_lock:
+        _scheduler_factory = factory
+        _schedulers.clear()
+
+def get_scheduler(credentials=None):
+    """
+    Returns the Sheets request scheduler of a set of credentials.
+
+    The quota belongs to the service account, so every spreadsheet reached
+    with the same credentials shares one scheduler.
+
+    Args:
+        credentials (str): Service account JSON path or content, None for the current guild's
+
+    Returns:
+        RequestScheduler: The scheduler those credentials' requests go through
+    """
+    if credentials is None:
+        credentials = current_sheet_config().credentials
+    credentials = credentials or SERVICE_ACCOUNT_JSON
+    with _schedulers_lock:
+        scheduler = _schedulers.get(credentials)
+        if scheduler is None:
+            scheduler = _schedulers[credentials] = _scheduler_factory(credentials) if _scheduler_factory else RequestScheduler()
+        return scheduler
+
+def get_sheet_scheduler(config):
+    """
+    Returns the scheduler capping one spreadsheet's requests, if its registry entry sets requests_per_minute.
+
+    Args:
+        config (GuildSheetConfig): The spreadsheet's configuration
+
+    Returns:
+        RequestScheduler or None: The cap, or None if the spreadsheet only shares its credentials' quota
+    """
+    if not config.requests_per_minute:
+        return None
+    with _schedulers_lock:
+        scheduler = _sheet_schedulers.get(config.key)
+        if scheduler is None:
+            scheduler = _sheet_schedulers[config.key] = RequestScheduler(config.requests_per_minute)
+        return scheduler
+
+# Window of the rolling request count shown against SHEETS_REQUESTS_PER_MINUTE
+QUOTA_WINDOW_SECONDS = 60
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Plumbing between the calling operation and gspread, never reported as callers
+_CALLER_SKIP_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(_REPO_DIR, "utils", "async_ops.py"),
+    os.path.join(_REPO_DIR, "utils", "metrics.py"),
+    os.path.join(_REPO_DIR, "utils", "sheets_worker.py"),
+}
+
+class ApiCallTracker:
+    """
+    Counts Sheets API requests by operation, worksheet and calling function.
+
+    Keeps totals since startup plus the requests of the last
+    QUOTA_WINDOW_SECONDS, so usage can be compared with the per-minute quota.
+    Retries count too, since every attempt uses quota.
+    """
+
+    def __init__(self, window=QUOTA_WINDOW_SECONDS):
+        self.window = window
+        self._lock = threading.Lock()
+        self._totals = Counter()
+        self._recent = deque()
+        self.rate_limited = 0
+
+    def _prune(self, now):
+        while self._recent and self._recent[0][0] <= now - self.window:
+            self._recent.popleft()
+
+    def record(self, operation, worksheet, caller):
+        """
+        Records one request.
+
+        Args:
+            operation (str): gspread API method, e.g. "values_get" or "batch_update"
+            worksheet (str): Worksheet the request touched, or "-" if unknown
+            caller (str): Function that caused the request, e.g. "find_banned_player"
+        """
+        key = (operation, worksheet, caller)
+        now = time.monotonic()
+        with self._lock:
+            self._totals[key] += 1
+            self._recent.append((now, key))
+            self._prune(now)
+
+    def record_rate_limited(self):
+        with self._lock:
+            self.rate_limited += 1
+
+    def counts(self, group_by=("operation", "worksheet", "caller"), recent=False):
+        """
+        Totals the recorded requests grouped by some of their fields.
+
+        Args:
+            group_by (str or tuple): "operation", "worksheet", "caller" or a tuple of them
+            recent (bool): Count only the last window instead of everything since startup
+
+        Returns:
+            Counter: Request counts keyed by the field value, or by a tuple of values
+        """
+        fields = ("operation", "worksheet", "caller")
+        single = isinstance(group_by, str)
+        positions = [fields.index(field) for field in ([group_by] if single else group_by)]
+        with self._lock:
+            if recent:
+                self._prune(time.monotonic())
+                source = Counter(key for _, key in self._recent)
+            else:
+                source = Counter(self._totals)
+        grouped = Counter()
+        for key, count in source.items():
+            values = tuple(key[i] for i in positions)
+            grouped[values[0] if single else values] += count
+        return grouped
+
+    def requests_last_window(self):
+        """
+        Returns:
+            int: Requests sent in the last QUOTA_WINDOW_SECONDS
+        """
+        with self._lock:
+            self._prune(time.monotonic())
+            return len(self._recent)
+
+    def total(self):
+        """
+        Returns:
+            int: Requests sent since startup (or the last reset)
+        """
+        with self._lock:
+            return sum(self._totals.values())
+
+    def reset(self):
+        with self._lock:
+            self._totals = Counter()
+            self._recent = deque()
+            self.rate_limited = 0
+
+_tracker = ApiCallTracker()
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+def get_call_tracker(key=None):
+    """
+    Returns the Sheets API call tracker of a spreadsheet.
+
+    Args:
+        key (str): Spreadsheet key, or None for the current guild's spreadsheet
+
+    Returns:
+        ApiCallTracker: The tracker that spreadsheet's requests are recorded in
+    """
+    key = key or current_sheet_config().key
+    if key == DEFAULT_KEY:
+        return _tracker
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = _trackers[key] = ApiCallTracker()
+        return tracker
+
+def _trace_caller(method):
+    """
+    Works out which gspread method and which bot function a request comes from.
+
+    The gspread method is the frame just above HTTPClient.request. The
+    caller is the outermost bot function on the stack, e.g.
+    add_player_to_guild rather than the replica helper it went through.
+
+    Returns:
+        tuple: (operation (str), caller (str))
+    """
+    operation = None
+    caller = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.abspath(code.co_filename)
+        if operation is None and os.path.basename(filename) == "http_client.py" and "gspread" in filename:
+            operation = code.co_name
+        elif filename.startswith(_REPO_DIR) and filename not in _CALLER_SKIP_FILES and "site-packages" not in filename:
+            caller = code.co_name
+        frame = frame.f_back
+    return operation or method.lower(), caller or "-"
+
+def _is_read_only(method, endpoint):
+    """
+    Tells whether a request only reads, so sending it twice changes nothing.
+
+    Returns:
+        bool: True for GET requests and read-only batch requests
+    """
+    if method.upper() == "GET":
+        return True
+    return method.upper() == "POST" and endpoint.split("?", 1)[0].endswith(READ_ONLY_POST_VERBS)
+
+def _range_title(range_name):
+    title = unquote(range_name).split("!", 1)[0]
+    if len(title) > 1 and title[0] == title[-1] == "'":
+        title = title[1:-1].replace("''", "'")
+    return title
+
+def _request_worksheet(endpoint, params, json_body):
+    """
+    Finds the worksheet a request touches from its URL, parameters or body.
+
+    Returns:
+        str: The worksheet title, several titles joined with ",", or "-" if unknown
+    """
+    titles = set()
+    path = endpoint.split("?", 1)[0]
+    if "/values/" in path:
+        # The range is percent-encoded, so a literal ":" starts a verb such as ":append"
+        titles.add(_range_title(path.split("/values/", 1)[1].split(":", 1)[0]))
+    ranges = (params or {}).get("ranges")
+    for range_name in ([ranges] if isinstance(ranges, str) else ranges or []):
+        titles.add(_range_title(range_name))
+    if isinstance(json_body, dict):
+        for item in json_body.get("data", []):
+            if isinstance(item, dict) and "range" in item:
+                titles.add(_range_title(item["range"]))
+        sheet_ids = set()
+        for request in json_body.get("requests", []):
+            for body in request.values():
+                if isinstance(body, dict):
+                    target = body.get("range") or body.get("start") or body
+                    if isinstance(target, dict) and "sheetId" in target:
+                        sheet_ids.add(target["sheetId"])
+        if sheet_ids:
+            names = get_pool().sheet_titles()
+            titles.update(names.get(sheet_id, str(sheet_id)) for sheet_id in sheet_ids)
+    titles.discard("")
+    return ",".join(sorted(titles)) or "-"
+
+class ScheduledHTTPClient(HTTPClient):
+    """
+    gspread HTTP client that sends every request through the RequestScheduler.
+
+    Requests wait for the scheduler of the client's credentials, queued
+    fairly against other spreadsheets, and for the current spreadsheet's
+    own cap if it has one. 429 responses are retried with jittered
+    exponential backoff, so callers wait briefly during a quota burst
+    instead of failing. 408 and 5xx responses are retried only for reads:
+    a write such as an appendCells batch_update may already have been
+    applied, and sending it again would append its rows twice. Every attempt is recorded in the spreadsheet's ApiCallTracker.
+    """
+
+    scheduler = None
+    tracker = None
+
+    def request(self, method, endpoint, params=None, data=None, json=None, files=None, headers=None):
+        config = current_sheet_config()
+        scheduler = self.scheduler or get_scheduler(config.credentials)
+        sheet_scheduler = get_sheet_scheduler(config)
+        tracker = self.tracker or get_call_tracker(config.key)
+        priority = _priority.get()
+        operation, caller = _trace_caller(method)
+        worksheet = _request_worksheet(endpoint, params, json)
+        retryable = RETRYABLE_STATUS_CODES if _is_read_only(method, endpoint) else RATE_LIMITED_STATUS_CODES
+        attempt = 0
+        while True:
+            if sheet_scheduler is not None:
+                sheet_scheduler.acquire(priority)
+            scheduler.acquire(priority, config.key)
+            tracker.record(operation, worksheet, caller)
+            try:
+                return super().request(method, endpoint, params=params, data=data, json=json, files=files, headers=headers)
+            except APIError as e:
+                status = e.response.status_code
+                if status not in retryable or attempt >= SHEETS_MAX_RETRIES:
+                    raise
+                if status == 429:
+                    tracker.record_rate_limited()
+                    scheduler.throttle()
+                time.sleep(random.uniform(0, min(SHEETS_MAX_BACKOFF, 2 ** attempt)))
+                attempt += 1
+
+_clients = {}
+_client_lock = threading.Lock()
+
+def _load_credentials(source=None):
+    """
+    Loads the service account credentials from either a file path or JSON content.
+
+    Args:
+        source (str): File path or JSON content (default: GOOGLE_SERVICE_ACCOUNT_JSON)
+
+    Returns:
+        Credentials: Service account credentials scoped for Google Sheets
+
     Raises:
         ValueError: If credentials cannot be loaded
     """
+    source = source or SERVICE_ACCOUNT_JSON
+    if source and os.path.exists(source):
+        return Credentials.from_service_account_file(
+            source,
+            scopes=SCOPES
+        )
     try:
-        if os.path.exists(SERVICE_ACCOUNT_JSON):
-            credentials = Credentials.from_service_account_file(
-                SERVICE_ACCOUNT_JSON,
-                scopes=SCOPES
-            )
-        else:
+        service_account_info = json.loads(source)
+        return Credentials.from_service_account_info(
+            service_account_info,
+            scopes=SCOPES
+        )
+    except (json.JSONDecodeError, TypeError):
+        raise ValueError(f"GOOGLE_SERVICE_ACCOUNT_JSON must be either a valid file path or JSON content. Current value: {source}")
+
+def get_client(credentials=None):
+    """
+    Returns the authenticated Google Sheets client of a set of credentials.
+
+    Clients are pooled: each set of credentials is parsed and authorized
+    only once. The client's authorized session refreshes the access token
+    in place when it expires, so the same client can be reused for the
+    lifetime of the process. Every request it makes goes through the request scheduler.
+
+    Args:
+        credentials (str): Service account JSON path or content (default: GOOGLE_SERVICE_ACCOUNT_JSON)
+
+    Returns:
+        gspread.Client: Authenticated Google Sheets client
+
+    Raises:
+        ValueError: If credentials cannot be loaded
+    """
+    credentials = credentials or SERVICE_ACCOUNT_JSON
+    client = _clients.get(credentials)
+    if client is not None:
+        return client
+
+    with _client_lock:
+        client = _clients.get(credentials)
+        if client is None:
             try:
-                service_account_info = json.loads(SERVICE_ACCOUNT_JSON)
-                credentials = Credentials.from_service_account_info(
-                    service_account_info,
-                    scopes=SCOPES
-                )
-            except (json.JSONDecodeError, TypeError):
-                raise ValueError(f"GOOGLE_SERVICE_ACCOUNT_JSON must be either a valid file path or JSON content. Current value: {SERVICE_ACCOUNT_JSON}")
-        
-        return gspread.authorize(credentials)
-    except Exception as e:
-        print(f"Error setting up Google credentials: {e}")
-        print(f"SERVICE_ACCOUNT_JSON value: {SERVICE_ACCOUNT_JSON}")
-        print(f"SPREADSHEET_ID value: {SPREADSHEET_ID}")
-        raise
+                client = _clients[credentials] = gspread.authorize(_load_credentials(credentials), http_client=ScheduledHTTPClient)
+            except Exception as e:
+                print(f"Error setting up Google credentials: {e}")
+                print(f"SERVICE_ACCOUNT_JSON value: {credentials}")
+                print(f"SPREADSHEET_ID value: {current_sheet_config().spreadsheet_id}")
+                raise
+        return client
+
+class SheetPool:
+    """
+    Cache of the Spreadsheet handle and its Worksheet handles, keyed by sheet name.
+
+    Opening the spreadsheet and looking a worksheet up by name each cost an
+    API round trip, so the handles are kept for the lifetime of the process.
+    A single metadata request fills the cache for every tab at once.
+    """
+
+    def __init__(self, spreadsheet_id, credentials=None):
+        self.spreadsheet_id = spreadsheet_id
+        self.credentials = credentials
+        self._spreadsheet = None
+        self._worksheets = {}
+        self._lock = threading.Lock()
+
+    def _open_spreadsheet(self):
+        return get_client(self.credentials).open_by_key(self.spreadsheet_id)
+
+    def get_spreadsheet(self):
+        """
+        Returns the cached Spreadsheet handle, opening it on first use.
+
+        Returns:
+            gspread.Spreadsheet: The spreadsheet handle
+        """
+        with self._lock:
+            if self._spreadsheet is None:
+                self._spreadsheet = self._open_spreadsheet()
+            return self._spreadsheet
+
+    def get_sheet(self, sheet_name):
+        """
+        Returns the cached Worksheet handle for a tab.
+
+        On a cache miss the handles of all tabs are refreshed with one
+        metadata request, which also picks up tabs created since the last load.
+
+        Args:
+            sheet_name (str): Name of the worksheet to retrieve
+
+        Returns:
+            gspread.Worksheet: The requested worksheet object
+
+        Raises:
+            gspread.WorksheetNotFound: If no tab with that name exists
+        """
+        worksheet = self._worksheets.get(sheet_name)
+        if worksheet is not None:
+            return worksheet
+
+        spreadsheet = self.get_spreadsheet()
+        with self._lock:
+            worksheet = self._worksheets.get(sheet_name)
+            if worksheet is None:
+                self._worksheets = {ws.title: ws for ws in spreadsheet.worksheets()}
+                worksheet = self._worksheets.get(sheet_name)
+            if worksheet is None:
+                raise gspread.WorksheetNotFound(sheet_name)
+            return worksheet
+
+    def sheet_titles(self):
+        """
+        Returns the titles of the cached worksheet handles by sheet ID, without any API request.
+
+        Returns:
+            dict: Worksheet title keyed by sheet ID
+        """
+        return {worksheet.id: title for title, worksheet in list(self._worksheets.items())}
+
+    def invalidate(self, sheet_name=None):
+        """
+        Drops cached handles so they are looked up again on next use.
+
+        Call this after a tab is renamed or deleted.
+
+        Args:
+            sheet_name (str): Tab to drop, or None to drop the spreadsheet and every tab
+        """
+        with self._lock:
+            if sheet_name is None:
+                self._spreadsheet = None
+                self._worksheets = {}
+            else:
+                self._worksheets.pop(sheet_name, None)
+
+_pool = SheetPool(SPREADSHEET_ID)
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool():
+    """
+    Returns the worksheet handle pool of the current guild's spreadsheet.
+
+    Returns:
+        SheetPool: The pool for the spreadsheet, SPREADSHEET_ID's outside a registered guild
+    """
+    config = current_sheet_config()
+    if config.key == DEFAULT_KEY:
+        return _pool
+    with _pools_lock:
+        pool = _pools.get(config.key)
+        if pool is None:
+            pool = _pools[config.key] = SheetPool(config.spreadsheet_id, config.credentials)
+        return pool
+
+def get_spreadsheet():
+    """
+    Gets the Google Spreadsheet from the handle pool.
+
+    Returns:
+        gspread.Spreadsheet: The spreadsheet object
+    """
+    return get_pool().get_spreadsheet()
 
 def get_sheet(sheet_name):
     """
     Gets a specific worksheet from the Google Spreadsheet.
-    
+
+    Handles are cached by the pool, so repeated calls make no API requests.
+
     Args:
         sheet_name (str): Name of the worksheet to retrieve
-        
+
     Returns:
         gspread.Worksheet: The requested worksheet object
     """
-    client = get_client()
-    return client.open_by_key(SPREADSHEET_ID).worksheet(sheet_name)
\ No newline at end of file
+    return get_pool().get_sheet(sheet_name)
+
+def invalidate_sheet(sheet_name=None):
+    """
+    Drops cached worksheet handles after a tab is renamed or deleted.
+
+    Args:
+        sheet_name (str): Name of the renamed or deleted tab, or None to drop every handle
+    """
+    get_pool().invalidate(sheet_name)
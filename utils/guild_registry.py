@@ -0,0 +1,290 @@
+import os
+import json
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Spreadsheet used without a registry file, and by unlisted guilds if the file opts in with "default": true
+SPREADSHEET_ID = os.getenv("SPREADSHEET_ID")
+# JSON file mapping guild IDs to their spreadsheets
+GUILD_SHEETS_FILE = os.getenv("GUILD_SHEETS_FILE", "guild_sheets.json")
+
+# Key of the SPREADSHEET_ID spreadsheet in every per-spreadsheet cache
+DEFAULT_KEY = "default"
+
+class GuildSheetConfig:
+    """
+    The spreadsheet a guild works on, and how to reach it.
+
+    Per-spreadsheet state (worksheet handles, replicas, the Update Sheet
+    queue, the storage backend, API call counts) is keyed by `key`, so
+    guilds sharing a spreadsheet share that state. Guilds whose entry names
+    other service account credentials get their own client and quota.
+    """
+
+    __slots__ = ("guild_id", "spreadsheet_id", "name", "credentials", "requests_per_minute", "key")
+
+    def __init__(self, guild_id, spreadsheet_id, name="", credentials=None, requests_per_minute=None, default_spreadsheet_id=None):
+        self.guild_id = guild_id
+        self.spreadsheet_id = spreadsheet_id
+        self.name = name
+        self.credentials = credentials
+        self.requests_per_minute = requests_per_minute
+        self.key = DEFAULT_KEY if spreadsheet_id == default_spreadsheet_id else spreadsheet_id
+
+class GuildRegistry:
+    """
+    Mapping of guild IDs to spreadsheets, read from a JSON file.
+
+    The file maps each guild ID to a spreadsheet ID, or to an object with
+    "spreadsheet_id" and optionally "name", "service_account_json" (other
+    credentials, with their own quota) and "requests_per_minute" (a cap on
+    this spreadsheet's share of the quota):
+
+        {"123456789012345678": "1AbC...", "234567890123456789": {"spreadsheet_id": "1XyZ...", "name": "Allies"}}
+
+    Without the file, or with an empty one, every guild uses SPREADSHEET_ID.
+    Once the file lists guilds, a guild without an entry is refused, unless
+    the file also holds "default": true to send unlisted guilds to
+    SPREADSHEET_ID. Work done outside any guild uses SPREADSHEET_ID.
+    """
+
+    def __init__(self, path=GUILD_SHEETS_FILE, default_spreadsheet_id=SPREADSHEET_ID):
+        self.path = path
+        self.default_spreadsheet_id = default_spreadsheet_id
+        self._lock = threading.Lock()
+        self._entries = None
+        self._allow_default = True
+        self._default = GuildSheetConfig(None, default_spreadsheet_id, default_spreadsheet_id=default_spreadsheet_id)
+
+    def _load(self):
+        entries = {}
+        allow_default = True
+        if self.path and os.path.exists(self.path):
+            with open(self.path) as f:
+                raw = json.load(f)
+            allow_default = raw.pop("default", False) is True
+            for guild_id, entry in raw.items():
+                if isinstance(entry, str):
+                    entry = {"spreadsheet_id": entry}
+                entries[int(guild_id)] = GuildSheetConfig(
+                    int(guild_id),
+                    entry["spreadsheet_id"],
+                    entry.get("name", ""),
+                    entry.get("service_account_json"),
+                    entry.get("requests_per_minute"),
+                    self.default_spreadsheet_id,
+                )
+            allow_default = allow_default or not entries
+        return entries, allow_default
+
+    def _ensure_loaded(self):
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._set(*self._load())
+        return self._entries
+
+    def get(self, guild_id=None):
+        """
+        Returns the spreadsheet configuration of a guild.
+
+        Args:
+            guild_id (int): Discord guild ID, or None outside a guild
+
+        Returns:
+            GuildSheetConfig: The guild's entry, or the SPREADSHEET_ID default
+
+        Raises:
+            ValueError: If the guild has no entry and the file lists guilds without opting in to the default
+        """
+        if guild_id is None:
+            return self._default
+        entries = self._ensure_loaded()
+        config = entries.get(guild_id)
+        if config is not None:
+            return config
+        if entries and (not self._allow_default or not self.default_spreadsheet_id):
+            raise ValueError(f"No spreadsheet is configured for guild {guild_id}; add it to {self.path}")
+        return self._default
+
+    def configs(self):
+        """
+        Returns one configuration per distinct spreadsheet, the default first if it is set.
+
+        Returns:
+            list: GuildSheetConfig objects
+        """
+        configs = {DEFAULT_KEY: self._default} if self.default_spreadsheet_id else {}
+        for config in self._ensure_loaded().values():
+            configs.setdefault(config.key, config)
+        return list(configs.values())
+
+    def guilds(self):
+        """
+        Returns:
+            dict: GuildSheetConfig keyed by guild ID, for every guild in the file
+        """
+        return dict(self._ensure_loaded())
+
+    def reload(self):
+        """
+        Reads the registry file again, e.g. after a guild was added.
+        """
+        with self._lock:
+            self._set(*self._load())
+
+    def _set(self, entries, allow_default):
+        # The flag goes first: readers check _entries without the lock
+        self._allow_default = allow_default
+        self._entries = entries
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_guild_registry():
+    """
+    Returns the process-wide guild registry, read from GUILD_SHEETS_FILE.
+
+    Returns:
+        GuildRegistry: The registry
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = GuildRegistry()
+    return _registry
+
+def set_guild_registry(registry):
+    """
+    Replaces the process-wide guild registry, e.g. in tests.
+
+    Returns:
+        GuildRegistry: The previous registry, or None
+    """
+    global _registry
+    with _registry_lock:
+        previous, _registry = _registry, registry
+    return previous
+
+_guild = contextvars.ContextVar("guild_id", default=None)
+_sheet = contextvars.ContextVar("guild_sheet", default=None)
+
+def use_guild(guild_id):
+    """
+    Makes a guild current for the rest of the running task, such as an interaction handler.
+
+    Args:
+        guild_id (int): Discord guild ID, or None outside a guild
+    """
+    _guild.set(guild_id)
+
+@contextmanager
+def guild_scope(guild_id):
+    """
+    Makes a guild current inside the block.
+
+    Sheets calls made inside the block, including those handed to worker
+    threads by run_blocking, go to that guild's spreadsheet.
+
+    Args:
+        guild_id (int): Discord guild ID, or None outside a guild
+    """
+    token = _guild.set(guild_id)
+    try:
+        yield
+    finally:
+        _guild.reset(token)
+
+@contextmanager
+def sheet_scope(config):
+    """
+    Makes a spreadsheet current inside the block, for background work bound
+    to one spreadsheet rather than to a guild.
+
+    Args:
+        config (GuildSheetConfig): The spreadsheet's configuration
+    """
+    token = _sheet.set(config)
+    try:
+        yield
+    finally:
+        _sheet.reset(token)
+
+def current_guild_id():
+    """
+    Returns:
+        int or None: The current guild ID
+    """
+    return _guild.get()
+
+def current_sheet_config():
+    """
+    Returns the configuration of the current spreadsheet.
+
+    Returns:
+        GuildSheetConfig: The spreadsheet set by sheet_scope, else the current guild's
+
+    Raises:
+        ValueError: If the current guild has no spreadsheet
+    """
+    return _sheet.get() or get_guild_registry().get(_guild.get())
+
+def current_sheet_key():
+    """
+    Returns:
+        str: Key of the current spreadsheet in the per-spreadsheet caches
+    """
+    return current_sheet_config().key
+
+def scoped_path(path, key):
+    """
+    Returns the local file path a spreadsheet's data is kept in.
+
+    The default spreadsheet keeps the configured path, so existing
+    single-guild files stay in use; other spreadsheets get the key added
+    before the extension (e.g. asbot.1XyZ.db).
+
+    Args:
+        path (str): Configured path, or empty if the feature is disabled
+        key (str): Spreadsheet key
+
+    Returns:
+        str: The path for that spreadsheet
+    """
+    if not path or key == DEFAULT_KEY:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{key}{extension}"
+
+def interaction_guild_id(args):
+    """
+    Returns the guild ID of the first interaction among a handler's arguments.
+
+    Returns:
+        int or None: The guild ID, or None if there is no interaction or it came from a DM
+    """
+    for arg in args:
+        if hasattr(arg, "response") and hasattr(arg, "guild_id"):
+            return arg.guild_id
+    return None
+
+def guild_routed(func):
+    """
+    Decorator that makes the guild of a handler's interaction current while
+    it runs, so its Sheets calls go to that guild's spreadsheet.
+
+    Slash commands get this from GuildCommandTree; button, select and modal
+    handlers, which Discord does not route through the command tree, use
+    this decorator.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with guild_scope(interaction_guild_id(args)):
+            return await func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,290 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from collections import deque
+from dotenv import load_dotenv
+
+from .metrics import LatencyHistogram, BACKGROUND, get_registry, instrumented
+
+load_dotenv()
+
+# Set to 1 to watch the event loop for stalls
+LOOP_WATCHDOG = os.getenv("LOOP_WATCHDOG", "").strip().lower() in ("1", "true", "yes")
+# Lag above which the blocking stack is captured, in milliseconds
+LOOP_STALL_THRESHOLD_MS = float(os.getenv("LOOP_STALL_THRESHOLD_MS", "250"))
+# Seconds between heartbeats of the event loop
+LOOP_WATCHDOG_INTERVAL = float(os.getenv("LOOP_WATCHDOG_INTERVAL", "0.05"))
+# Seconds of lag samples kept in the rolling histogram
+LOOP_LAG_WINDOW = float(os.getenv("LOOP_LAG_WINDOW", "300"))
+
+# Stall reports kept for /stats, and stack frames printed per stall
+STALL_HISTORY = 20
+STACK_LIMIT = 25
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+async def _probe(*args, **kwargs):
+    pass
+
+# Every instrumented handler runs inside a wrapper with this code object,
+# whose `record` local names the interaction
+_INSTRUMENTED_CODE = instrumented(_probe).__code__
+
+class RollingHistogram:
+    """
+    Latency histogram over the last `window` seconds.
+
+    Samples go into `slices` consecutive sub-histograms; the oldest is
+    dropped once it falls out of the window, so memory stays constant.
+    """
+
+    def __init__(self, window=LOOP_LAG_WINDOW, slices=10):
+        self.slice_seconds = window / slices
+        self.slices = deque(maxlen=slices)
+
+    def observe(self, milliseconds, now=None):
+        now = time.monotonic() if now is None else now
+        start = now - now % self.slice_seconds
+        if not self.slices or self.slices[-1][0] != start:
+            self.slices.append([start, LatencyHistogram(), 0.0])
+        entry = self.slices[-1]
+        entry[1].observe(milliseconds)
+        entry[2] = max(entry[2], milliseconds)
+
+    def merged(self, now=None):
+        """
+        Returns the samples of the window as one histogram.
+
+        Returns:
+            tuple: (LatencyHistogram, max milliseconds)
+        """
+        now = time.monotonic() if now is None else now
+        histogram = LatencyHistogram()
+        worst = 0.0
+        for start, part, part_max in self.slices:
+            if start + self.slice_seconds * self.slices.maxlen <= now:
+                continue
+            histogram.counts = [a + b for a, b in zip(histogram.counts, part.counts)]
+            histogram.count += part.count
+            histogram.total += part.total
+            worst = max(worst, part_max)
+        return histogram, worst
+
+class StallReport:
+    """
+    One event-loop stall: what was running on the loop when it passed the threshold.
+    """
+
+    __slots__ = ("started_at", "duration_ms", "interaction", "command", "user", "blocking", "caller", "stack")
+
+    def __init__(self, started_at, interaction, command, user, blocking, caller, stack):
+        self.started_at = started_at
+        self.duration_ms = 0.0
+        self.interaction = interaction
+        self.command = command
+        self.user = user
+        self.blocking = blocking
+        self.caller = caller
+        self.stack = stack
+
+    def summary(self):
+        where = self.interaction
+        if self.command:
+            where += f" ({self.command}" + (f" by {self.user})" if self.user else ")")
+        if self.caller == self.blocking:
+            return f"{where}, at {self.blocking}"
+        return f"{where}, at {self.caller} -> {self.blocking}"
+
+def _describe_interaction(interaction):
+    command = getattr(interaction, "command", None)
+    if command is not None:
+        label = f"/{command.qualified_name}"
+    else:
+        data = getattr(interaction, "data", None) or {}
+        label = data.get("custom_id", "")
+    user = getattr(interaction, "user", None)
+    return label, getattr(user, "name", "")
+
+def _frame_label(entry):
+    return f"{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})"
+
+def capture_stall(frame):
+    """
+    Describes what a blocked thread is doing from its current frame.
+
+    The interaction is the innermost instrumented handler on the stack and
+    the command comes from the first `interaction` argument found. The
+    caller is the innermost frame in the bot's own code, and the blocking
+    frame is the innermost frame overall, e.g. a gspread or socket call.
+
+    Args:
+        frame: The thread's current frame, from sys._current_frames()
+
+    Returns:
+        StallReport: The report, with the duration still 0
+    """
+    interaction_name = BACKGROUND
+    command, user = "", ""
+    found_interaction = found_record = False
+    current = frame
+    while current is not None and not (found_interaction and found_record):
+        code = current.f_code
+        if not found_record and code is _INSTRUMENTED_CODE:
+            record = current.f_locals.get("record")
+            if record is not None:
+                interaction_name = record.name
+                found_record = True
+        if not found_interaction and "interaction" in code.co_varnames:
+            interaction = current.f_locals.get("interaction")
+            if interaction is not None:
+                command, user = _describe_interaction(interaction)
+                found_interaction = True
+        current = current.f_back
+
+    entries = traceback.extract_stack(frame)
+    blocking = _frame_label(entries[-1]) if entries else "-"
+    caller = "-"
+    for entry in reversed(entries):
+        filename = os.path.abspath(entry.filename)
+        if filename.startswith(_REPO_DIR) and "site-packages" not in filename and filename != os.path.abspath(__file__):
+            caller = _frame_label(entry)
+            break
+    stack = "".join(traceback.format_list(entries[-STACK_LIMIT:]))
+    return StallReport(time.time(), interaction_name, command, user, blocking, caller, stack)
+
+class LoopWatchdog:
+    """
+    Measures event-loop lag continuously and captures the stack of the code blocking it.
+
+    A heartbeat task on the loop sleeps LOOP_WATCHDOG_INTERVAL at a time;
+    how much later than asked it wakes up is the lag, kept in a rolling
+    histogram. A daemon thread checks the heartbeat; when it is more than
+    `threshold_ms` late, the thread captures the loop thread's stack,
+    prints it with the interaction that was running and keeps the report.
+    The stall's full length is recorded as a "loop_stall" span of that
+    interaction once the loop wakes up again.
+
+    Args:
+        loop: The event loop to watch; must be called from its thread
+        threshold_ms (float): Lag that counts as a stall
+        interval (float): Seconds between heartbeats
+        window (float): Seconds of lag kept in the histogram
+    """
+
+    def __init__(self, loop, threshold_ms=LOOP_STALL_THRESHOLD_MS, interval=LOOP_WATCHDOG_INTERVAL, window=LOOP_LAG_WINDOW):
+        self.loop = loop
+        self.threshold_ms = threshold_ms
+        self.interval = interval
+        self.lag = RollingHistogram(window)
+        self.stalls = deque(maxlen=STALL_HISTORY)
+        self.stall_count = 0
+        self._loop_thread_id = threading.get_ident()
+        self._lock = threading.Lock()
+        self._last_beat = time.perf_counter()
+        self._current_stall = None
+        self._stop = threading.Event()
+        self._task = None
+        self._thread = None
+
+    def start(self):
+        self._last_beat = time.perf_counter()
+        self._task = self.loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._task.cancel)
+        self._task = None
+
+    async def _heartbeat(self):
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag_ms = max(0.0, (now - before - self.interval) * 1000)
+            with self._lock:
+                self._last_beat = now
+                self.lag.observe(lag_ms)
+                stall, self._current_stall = self._current_stall, None
+            if stall is not None:
+                stall.duration_ms = lag_ms
+                get_registry().observe(stall.interaction, "loop_stall", lag_ms / 1000)
+                print(f"✅ Event loop resumed after {lag_ms:.0f} ms stall in {stall.interaction}")
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                late_ms = (time.perf_counter() - self._last_beat - self.interval) * 1000
+                if late_ms < self.threshold_ms or self._current_stall is not None:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stall = capture_stall(frame)
+            del frame
+            with self._lock:
+                if self._current_stall is not None:
+                    continue
+                self._current_stall = stall
+                self.stalls.append(stall)
+                self.stall_count += 1
+            print(f"⚠️ Event loop blocked for {late_ms:.0f} ms in {stall.summary()}\n{stall.stack}", end="")
+
+    def lag_stats(self):
+        """
+        Returns the event-loop lag over the rolling window.
+
+        Returns:
+            dict: count, p50, p99 and max lag (ms), and stalls since start
+        """
+        with self._lock:
+            histogram, worst = self.lag.merged()
+            stalls = self.stall_count
+        return {
+            "count": histogram.count,
+            "p50": histogram.percentile(50),
+            "p99": histogram.percentile(99),
+            "max": worst,
+            "stalls": stalls,
+        }
+
+_watchdog = None
+
+def start_watchdog(**kwargs):
+    """
+    Starts the process-wide watchdog on the running event loop.
+
+    Args:
+        **kwargs: Overrides of the LoopWatchdog settings
+
+    Returns:
+        LoopWatchdog: The running watchdog
+    """
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = LoopWatchdog(asyncio.get_running_loop(), **kwargs)
+        _watchdog.start()
+    return _watchdog
+
+def get_watchdog():
+    """
+    Returns the running watchdog.
+
+    Returns:
+        LoopWatchdog or None: The watchdog, or None if it was not started
+    """
+    return _watchdog
+
+def stop_watchdog():
+    """
+    Stops the watchdog thread and heartbeat, if they are running.
+    """
+    global _watchdog
+    if _watchdog is not None:
+        _watchdog.stop()
+        _watchdog = None
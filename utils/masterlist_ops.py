@@ -1,5 +1,26 @@
-from .google_sheet import get_sheet
-from .update_log_ops import log_update
+from .sheet_cache import get_replica
+from .storage import append_change, update_change, delete_change
+from .batch_ops import commit_with_log, resolve_targets
+
+# Column-scoped replica indexes: IGN (A), Known Alts (E, comma-separated), Discord ID (G)
+MASTERLIST_INDEXES = {'ign': (0, False), 'alt': (4, True), 'discord_id': (6, False)}
+
+# Rows per commit when importing players in bulk
+IMPORT_CHUNK_SIZE = 500
+
+def get_masterlist_replica():
+    """
+    Returns the local Masterlist replica that lookups are served from.
+
+    Returns:
+        SheetReplica: The Masterlist replica
+    """
+    return get_replica('Masterlist', MASTERLIST_INDEXES)
+
+def _fresh_replica():
+    replica = get_masterlist_replica()
+    replica.ensure_fresh()
+    return replica
 
 def add_player_to_guild(row_data, user_name):
     """
@@ -12,14 +33,63 @@ def add_player_to_guild(row_data, user_name):
     Returns:
         tuple: (success (bool), message (str))
     """
+    replica = get_masterlist_replica()
     try:
-        sheet = get_sheet('Masterlist')
-        sheet.append_row(row_data)
-        log_update(user_name, f"Added player to Masterlist: {row_data[0]}")
+        with replica.lock:
+            replica.ensure_synced()
+            commit_with_log([append_change('Masterlist', [row_data])], user_name, [f"Added player to Masterlist: {row_data[0]}"])
+            replica.apply_append(row_data)
         return True, f"✅ Successfully added {row_data[0]} to Masterlist!"
     except Exception as e:
+        replica.invalidate()
         return False, f"❌ Error adding player to Masterlist: {str(e)}"
 
+def bulk_add_players_to_guild(rows, user_name):
+    """
+    Adds many players to the Masterlist, skipping IGNs that are already listed.
+
+    Duplicate IGNs within the rows are skipped too. The rest are written in
+    chunks of IMPORT_CHUNK_SIZE; each chunk is one commit that also
+    appends one Update Sheet entry per player.
+
+    Args:
+        rows (list): Player rows to add, in Masterlist column order
+        user_name (str): Name of the user making the change
+
+    Returns:
+        tuple: (success (bool), message (str), skipped (list of IGNs already listed))
+    """
+    replica = get_masterlist_replica()
+    added = 0
+    skipped = []
+    try:
+        with replica.lock:
+            replica.ensure_synced()
+            new_rows = []
+            seen = set()
+            igns = [str(row[0]).strip() for row in rows]
+            for row, ign, row_number in zip(rows, igns, replica.resolve_rows(igns)):
+                if ign in seen or row_number is not None:
+                    skipped.append(ign)
+                    continue
+                seen.add(ign)
+                new_rows.append(row)
+
+            for start in range(0, len(new_rows), IMPORT_CHUNK_SIZE):
+                chunk = new_rows[start:start + IMPORT_CHUNK_SIZE]
+                commit_with_log(
+                    [append_change('Masterlist', chunk)],
+                    user_name,
+                    [f"Added player to Masterlist: {row[0]} (CSV import)" for row in chunk]
+                )
+                for row in chunk:
+                    replica.apply_append(row)
+                added += len(chunk)
+        return True, f"✅ Successfully imported {added} player(s) to Masterlist!", skipped
+    except Exception as e:
+        replica.invalidate()
+        return False, f"❌ Error importing players to Masterlist after {added} row(s): {str(e)}", skipped
+
 def remove_player_from_guild(player_id, user_name):
     """
     Removes a player from the Masterlist sheet by ID.
@@ -31,13 +101,18 @@ def remove_player_from_guild(player_id, user_name):
     Returns:
         tuple: (success (bool), message (str))
     """
-    sheet = get_sheet('Masterlist')
+    replica = get_masterlist_replica()
     try:
-        cell = sheet.find(player_id)
-        sheet.delete_rows(cell.row)
-        log_update(user_name, f"Removed player from Masterlist: {player_id}")
+        with replica.lock:
+            replica.ensure_synced()
+            row_number = replica.resolve_row(player_id)
+            if row_number is None:
+                return False, f"❌ Error removing player from Masterlist: {player_id} not found"
+            commit_with_log([delete_change('Masterlist', [row_number])], user_name, [f"Removed player from Masterlist: {player_id}"])
+            replica.apply_delete(row_number)
         return True, f"✅ Successfully removed {player_id} from Masterlist!"
     except Exception as e:
+        replica.invalidate()
         return False, f"❌ Error removing player from Masterlist: {str(e)}"
 
 def edit_player_in_guild(player_id, new_data, user_name):
@@ -46,34 +121,138 @@ def edit_player_in_guild(player_id, new_data, user_name):
     
     Args:
         player_id (str): ID of the player to edit
-        new_data (list): New player data
+        new_data (list): New player data; None keeps the cell's current value in the sheet
         user_name (str): Name of the user making the change
         
     Returns:
         tuple: (success (bool), message (str))
     """
-    sheet = get_sheet('Masterlist')
+    replica = get_masterlist_replica()
     try:
-        cell = sheet.find(player_id)
-        sheet.update(f'A{cell.row}:Z{cell.row}', [new_data])
-        log_update(user_name, f"Edited player in Masterlist: {player_id}")
+        with replica.lock:
+            replica.ensure_synced()
+            if None in new_data:
+                # Kept cells are read from the sheet, not the replica, so hand edits are not overwritten
+                found = replica.read_row(player_id)
+                row_number = found[0] if found else None
+            else:
+                row_number = replica.resolve_row(player_id)
+            if row_number is None:
+                return False, f"❌ Error editing player in Masterlist: {player_id} not found"
+            if None in new_data:
+                current = found[1] + [""] * (len(new_data) - len(found[1]))
+                new_data = [current[column] if value is None else value for column, value in enumerate(new_data)]
+            commit_with_log([update_change('Masterlist', row_number, new_data)], user_name, [f"Edited player in Masterlist: {player_id}"])
+            replica.apply_update(row_number, new_data)
         return True, f"✅ Successfully edited {player_id} in Masterlist!"
     except Exception as e:
+        replica.invalidate()
         return False, f"❌ Error editing player in Masterlist: {str(e)}"
 
+def bulk_remove_players_from_guild(player_ids, user_name):
+    """
+    Removes many players from the Masterlist sheet by ID.
+
+    All rows are resolved first, then deleted with a single commit
+    that runs bottom-up so the row numbers stay valid. The same
+    commit appends one Update Sheet entry per player.
+
+    Args:
+        player_ids (list): IDs of the players to remove
+        user_name (str): Name of the user making the change
+
+    Returns:
+        tuple: (success (bool), message (str), not_found (list of IDs))
+    """
+    replica = get_masterlist_replica()
+    not_found = []
+    try:
+        with replica.lock:
+            targets, not_found = resolve_targets(replica, player_ids)
+            if not targets:
+                return False, "❌ None of the players were found in Masterlist.", not_found
+
+            commit_with_log(
+                [delete_change('Masterlist', targets)],
+                user_name,
+                [f"Removed player from Masterlist: {player_id}" for player_id in targets.values()]
+            )
+            for row_number in sorted(targets, reverse=True):
+                replica.apply_delete(row_number)
+        return True, f"✅ Successfully removed {len(targets)} player(s) from Masterlist!", not_found
+    except Exception as e:
+        replica.invalidate()
+        return False, f"❌ Error removing players from Masterlist: {str(e)}", not_found
+
+def bulk_edit_players_in_guild(player_ids, user_name, rank=None, status=None):
+    """
+    Sets the rank and status of many players in the Masterlist sheet.
+
+    All rows are resolved first and every changed cell is written with a
+    single commit (one batch_update with Google Sheets) that also appends
+    one Update Sheet entry per player.
+
+    Args:
+        player_ids (list): IDs of the players to edit
+        user_name (str): Name of the user making the change
+        rank (str): New rank, or None to keep each player's rank
+        status (str): New status, or None to keep each player's status
+
+    Returns:
+        tuple: (success (bool), message (str), not_found (list of IDs))
+    """
+    # Rank is column C and Status is column D
+    changes = {2: rank, 3: status}
+    changes = {column: value for column, value in changes.items() if value is not None}
+    if not changes:
+        return False, "❌ Nothing to change.", []
+
+    replica = get_masterlist_replica()
+    not_found = []
+    try:
+        with replica.lock:
+            targets, not_found = resolve_targets(replica, player_ids)
+            if not targets:
+                return False, "❌ None of the players were found in Masterlist.", not_found
+
+            summary = ", ".join(str(value) for value in changes.values())
+            commit_with_log(
+                [
+                    update_change('Masterlist', row_number, [value], column)
+                    for row_number in targets
+                    for column, value in changes.items()
+                ],
+                user_name,
+                [f"Edited player in Masterlist: {player_id} ({summary})" for player_id in targets.values()]
+            )
+            for row_number in targets:
+                row = replica.get_row(row_number)
+                row += [""] * (max(changes) + 1 - len(row))
+                for column, value in changes.items():
+                    row[column] = value
+                replica.apply_update(row_number, row)
+        return True, f"✅ Successfully edited {len(targets)} player(s) in Masterlist!", not_found
+    except Exception as e:
+        replica.invalidate()
+        return False, f"❌ Error editing players in Masterlist: {str(e)}", not_found
+
 def get_all_players():
     """
     Retrieves all players from the Masterlist sheet.
+
+    Served from the local Masterlist replica, which is checked against the
+    sheet with a cheap freshness probe instead of a full download.
     
     Returns:
         list: All player data from the Masterlist sheet
     """
-    sheet = get_sheet('Masterlist')
-    return sheet.get_all_values()
+    return _fresh_replica().get_all_rows()
 
 def find_player(player_id):
     """
     Finds a specific player in the Masterlist sheet.
+
+    Served from the local Masterlist replica, so no API call is made once it is loaded.
     
     Args:
         player_id (str): ID of the player to find
@@ -81,10 +260,37 @@ def find_player(player_id):
     Returns:
         list or None: Player data if found, None if not found
     """
-    sheet = get_sheet('Masterlist')
     try:
-        cell = sheet.find(player_id)
-        row = sheet.row_values(cell.row)
-        return row
+        return _fresh_replica().find(player_id)
+    except:
+        return None
+
+def find_player_by_discord_id(discord_id):
+    """
+    Finds every Masterlist row whose Discord ID column matches exactly.
+
+    Args:
+        discord_id (str): Discord ID to look up
+
+    Returns:
+        list: Player data of each match, empty if not found
+    """
+    try:
+        return _fresh_replica().find_all(discord_id, 'discord_id')
+    except:
+        return []
+
+def find_player_by_alt(alt_name):
+    """
+    Finds every Masterlist row that lists the name in its Known Alts column.
+
+    Args:
+        alt_name (str): Alternate account name to look up
+
+    Returns:
+        list: Player data of each match, empty if not found
+    """
+    try:
+        return _fresh_replica().find_all(alt_name, 'alt')
     except:
-        return None 
+        return []
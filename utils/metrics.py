@@ -0,0 +1,263 @@
+import os
+import time
+import bisect
+import functools
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Port of the local Prometheus text endpoint; leave empty to disable it
+METRICS_PORT = os.getenv("METRICS_PORT", "")
+
+# Histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Spans recorded outside any interaction, such as background replica refreshes
+BACKGROUND = "background"
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram, so memory stays constant however many samples it holds.
+
+    Percentiles are estimated by linear interpolation inside the bucket they fall in.
+    """
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, milliseconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+
+    def percentile(self, q):
+        """
+        Estimates a latency percentile.
+
+        Args:
+            q (float): Percentile between 0 and 100
+
+        Returns:
+            float: Estimated latency in milliseconds, 0 if there are no samples
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = LATENCY_BUCKETS_MS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else LATENCY_BUCKETS_MS[-1] * 2
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return float(LATENCY_BUCKETS_MS[-1])
+
+class MetricsRegistry:
+    """
+    Latency histograms and error counts keyed by (interaction, stage).
+
+    The "total" stage covers a whole interaction handler; the other stages
+    are the spans inside it, such as "defer", "followup" or a Sheets call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._errors = Counter()
+
+    def observe(self, name, stage, seconds, error=False):
+        """
+        Records one span.
+
+        Args:
+            name (str): Interaction name
+            stage (str): Span name
+            seconds (float): Duration of the span
+            error (bool): Whether the span failed
+        """
+        with self._lock:
+            histogram = self._histograms.get((name, stage))
+            if histogram is None:
+                histogram = self._histograms[(name, stage)] = LatencyHistogram()
+            histogram.observe(seconds * 1000)
+            if error:
+                self._errors[(name, stage)] += 1
+
+    def snapshot(self):
+        """
+        Returns the current statistics.
+
+        Returns:
+            list: Dicts with name, stage, count, errors, p50, p95, p99 (ms), sorted by name then stage
+        """
+        with self._lock:
+            rows = []
+            for (name, stage), histogram in self._histograms.items():
+                rows.append({
+                    "name": name,
+                    "stage": stage,
+                    "count": histogram.count,
+                    "errors": self._errors[(name, stage)],
+                    "p50": histogram.percentile(50),
+                    "p95": histogram.percentile(95),
+                    "p99": histogram.percentile(99),
+                })
+        return sorted(rows, key=lambda row: (row["name"], row["stage"] != "total", row["stage"]))
+
+    def prometheus_text(self):
+        """
+        Renders the histograms and error counts in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics page
+        """
+        lines = [
+            "# HELP asbot_latency_milliseconds Interaction and span latency.",
+            "# TYPE asbot_latency_milliseconds histogram",
+        ]
+        with self._lock:
+            for (name, stage), histogram in sorted(self._histograms.items()):
+                labels = f'name="{_escape(name)}",stage="{_escape(stage)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS_MS, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'asbot_latency_milliseconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'asbot_latency_milliseconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'asbot_latency_milliseconds_sum{{{labels}}} {histogram.total}')
+                lines.append(f'asbot_latency_milliseconds_count{{{labels}}} {histogram.count}')
+            lines.append("# HELP asbot_errors_total Failed interactions and spans.")
+            lines.append("# TYPE asbot_errors_total counter")
+            for (name, stage), errors in sorted(self._errors.items()):
+                lines.append(f'asbot_errors_total{{name="{_escape(name)}",stage="{_escape(stage)}"}} {errors}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._errors = Counter()
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+_registry = MetricsRegistry()
+
+def get_registry():
+    """
+    Returns the process-wide metrics registry.
+
+    Returns:
+        MetricsRegistry: The registry every span is recorded in
+    """
+    return _registry
+
+class _InteractionRecord:
+    __slots__ = ("name", "error")
+
+    def __init__(self, name):
+        self.name = name
+        self.error = False
+
+_current = contextvars.ContextVar("metrics_interaction", default=None)
+
+@contextmanager
+def span(stage):
+    """
+    Times the block as a stage of the current interaction.
+
+    Works in both coroutines and Sheets worker threads, since run_blocking
+    carries the current interaction over. Outside an interaction the span
+    is recorded under "background".
+
+    Args:
+        stage (str): Span name, e.g. "defer" or "sheets.find_player"
+    """
+    record = _current.get()
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        name = record.name if record else BACKGROUND
+        _registry.observe(name, stage, time.perf_counter() - start, error)
+
+async def timed(stage, awaitable):
+    """
+    Awaits an awaitable inside a span, e.g. `await timed("defer", interaction.response.defer())`.
+
+    Args:
+        stage (str): Span name
+        awaitable: The coroutine to await
+
+    Returns:
+        The awaitable's result
+    """
+    with span(stage):
+        return await awaitable
+
+def mark_error():
+    """
+    Counts the current interaction as failed even though it did not raise,
+    e.g. when a Sheets operation returned success False.
+    """
+    record = _current.get()
+    if record is not None:
+        record.error = True
+
+def instrumented(func):
+    """
+    Decorator that times an interaction handler as its "total" stage.
+
+    The handler is named after its qualified name (e.g. "RemovePlayerModal.on_submit").
+    It counts as an error if it raises or calls mark_error().
+    """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        record = _InteractionRecord(name)
+        token = _current.set(record)
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except BaseException:
+            record.error = True
+            raise
+        finally:
+            _current.reset(token)
+            _registry.observe(name, "total", time.perf_counter() - start, record.error)
+    return wrapper
+
+async def start_metrics_server(port, host="127.0.0.1"):
+    """
+    Serves the metrics in Prometheus text format on http://host:port/metrics.
+
+    Args:
+        port (int): Port to listen on
+        host (str): Interface to bind, local only by default
+
+    Returns:
+        aiohttp.web.AppRunner: The running server, for cleanup
+    """
+    from aiohttp import web
+
+    async def metrics(request):
+        return web.Response(text=_registry.prometheus_text(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,270 @@
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from math import ceil
+
+from .masterlist_ops import get_masterlist_replica
+from .watchlist_ops import get_watchlist_replica
+
+# Sheets whose IGNs and Known Alts are searchable, with their replica getters
+SEARCH_SOURCES = {
+    'Masterlist': get_masterlist_replica,
+    'Watchlist': get_watchlist_replica,
+}
+
+# Lowest trigram similarity (Dice coefficient) a /lookup result may have
+LOOKUP_MIN_SCORE = 0.3
+
+class PrefixIndex:
+    """
+    Sorted array of names searched by case-insensitive prefix with bisect.
+
+    Each entry is (folded name, name, label), where the label says where
+    the name came from (e.g. 'Masterlist' or 'Watchlist alt').
+    """
+
+    def __init__(self, entries=()):
+        self._entries = sorted({(name.casefold(), name, label) for name, label in entries})
+        self._keys = [entry[0] for entry in self._entries]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def search(self, prefix, limit=25):
+        """
+        Finds the names starting with a prefix, ignoring case.
+
+        Args:
+            prefix (str): Text typed so far
+            limit (int): Maximum number of results (default: 25)
+
+        Returns:
+            list: (name, label) tuples in alphabetical order
+        """
+        prefix = prefix.strip().casefold()
+        results = []
+        for i in range(bisect_left(self._keys, prefix), len(self._keys)):
+            if len(results) >= limit or not self._keys[i].startswith(prefix):
+                break
+            results.append(self._entries[i][1:])
+        return results
+
+_indexes = {}
+_versions = {}
+_lock = threading.Lock()
+
+def _build(sheet_name, replica):
+    """
+    Rebuilds the prefix index of a sheet if its replica changed since the last build.
+
+    The replica is never loaded or waited on here: if a write holds its
+    lock the previous index is kept, so suggestions never wait on Sheets.
+    Indexes are kept per spreadsheet, like the replicas they are built from.
+    """
+    key = (replica.sheet_config.key, sheet_name)
+    version = replica.version
+    if _versions.get(key) == version:
+        return
+    igns = replica.index_keys('ign', blocking=False)
+    alts = replica.index_keys('alt', blocking=False)
+    if igns is None or alts is None:
+        return
+    entries = [(ign, sheet_name) for ign in igns] + [(alt, f"{sheet_name} alt") for alt in alts]
+    _indexes[key] = PrefixIndex(entries)
+    _versions[key] = version
+
+def suggest(prefix, sheets=None, limit=25):
+    """
+    Suggests IGNs and alts that start with the typed text.
+
+    Served entirely from memory, so it is safe to call from an autocomplete
+    callback. Sheets whose replica has not been loaded yet give no suggestions.
+
+    Args:
+        prefix (str): Text typed so far
+        sheets (list): Sheet names to search (default: every sheet in SEARCH_SOURCES)
+        limit (int): Maximum number of suggestions (default: 25)
+
+    Returns:
+        list: Unique (name, label) tuples in alphabetical order
+    """
+    results = []
+    seen = set()
+    with _lock:
+        for sheet_name in sheets or SEARCH_SOURCES:
+            replica = SEARCH_SOURCES[sheet_name]()
+            _build(sheet_name, replica)
+            index = _indexes.get((replica.sheet_config.key, sheet_name))
+            if index is not None:
+                results.extend(index.search(prefix, limit))
+    suggestions = []
+    for name, label in sorted(results, key=lambda result: result[0].casefold()):
+        if name not in seen:
+            seen.add(name)
+            suggestions.append((name, label))
+    return suggestions[:limit]
+
+def _trigrams(text):
+    """
+    Returns the set of case-folded trigrams of a name, padded so short names and prefixes count.
+    """
+    padded = f"  {text.casefold()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to names, for fuzzy matching.
+
+    Names are scored against a query by the Dice coefficient of their
+    trigram sets, so misspelled and partial names still match. The index
+    is updated by diffing name sets, so a change to the roster does not
+    rebuild it from scratch.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._sizes = []
+        self._free = []
+        self._postings = defaultdict(set)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def update(self, names):
+        """
+        Makes the index hold exactly the given names.
+
+        Args:
+            names (iterable): Every name that should be searchable
+        """
+        names = set(names)
+        for name in self._ids.keys() - names:
+            self._remove(name)
+        for name in names - self._ids.keys():
+            self._add(name)
+
+    def _add(self, name):
+        grams = _trigrams(name)
+        if self._free:
+            name_id = self._free.pop()
+            self._names[name_id] = name
+            self._sizes[name_id] = len(grams)
+        else:
+            name_id = len(self._names)
+            self._names.append(name)
+            self._sizes.append(len(grams))
+        self._ids[name] = name_id
+        for gram in grams:
+            self._postings[gram].add(name_id)
+
+    def _remove(self, name):
+        name_id = self._ids.pop(name)
+        for gram in _trigrams(name):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(name_id)
+                if not posting:
+                    del self._postings[gram]
+        self._names[name_id] = None
+        self._free.append(name_id)
+
+    def search(self, query, limit=10, min_score=LOOKUP_MIN_SCORE):
+        """
+        Finds the names most similar to the query.
+
+        A name needs a minimum number of shared trigrams to reach
+        min_score, so candidates are gathered from the rarest trigrams only
+        and the most common ones are just checked against those candidates.
+
+        Args:
+            query (str): Name to search for
+            limit (int): Maximum number of results (default: 10)
+            min_score (float): Lowest similarity to return, from 0 to 1
+
+        Returns:
+            list: (score (float), name (str)) tuples, best first
+        """
+        grams = _trigrams(query)
+        needed = max(1, ceil(min_score * (len(grams) + 1) / 2))
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        split = len(grams) - needed + 1
+
+        counts = Counter()
+        for posting in postings[:split]:
+            counts.update(posting)
+        for posting in postings[split:]:
+            for name_id in counts:
+                if name_id in posting:
+                    counts[name_id] += 1
+
+        results = []
+        for name_id, shared in counts.items():
+            score = 2 * shared / (len(grams) + self._sizes[name_id])
+            if score >= min_score:
+                results.append((score, self._names[name_id]))
+        results.sort(key=lambda result: (-result[0], len(result[1])))
+        return results[:limit]
+
+_trigram_indexes = {}
+_trigram_versions = {}
+_trigram_lock = threading.Lock()
+
+def refresh_lookup_indexes():
+    """
+    Brings the trigram indexes up to date with the replicas.
+
+    Loads and freshness-checks the replicas, so it must run in a worker
+    thread. Called by lookup(), and at startup so the first /lookup does
+    not pay for building the indexes.
+
+    Returns:
+        list: (label (str), replica (SheetReplica), index (str), TrigramIndex) for every searchable column
+    """
+    sources = []
+    with _trigram_lock:
+        for sheet_name, get_source in SEARCH_SOURCES.items():
+            replica = get_source()
+            replica.ensure_fresh()
+            version = replica.version
+            for index, label in (('ign', sheet_name), ('alt', f"{sheet_name} alt")):
+                key = (replica.sheet_config.key, sheet_name, index)
+                trigram_index = _trigram_indexes.setdefault(key, TrigramIndex())
+                if _trigram_versions.get(key) != version:
+                    trigram_index.update(replica.index_keys(index))
+                    _trigram_versions[key] = version
+                sources.append((label, replica, index, trigram_index))
+    return sources
+
+def lookup(query, limit=10, min_score=LOOKUP_MIN_SCORE):
+    """
+    Fuzzy search for a player across the Masterlist and Watchlist IGNs and Known Alts.
+
+    Exact and prefix matches rank first, then the rest by similarity.
+
+    Args:
+        query (str): Name to search for, possibly misspelled or partial
+        limit (int): Maximum number of results (default: 10)
+        min_score (float): Lowest similarity to return, from 0 to 1
+
+    Returns:
+        list: (score (float), name (str), label (str), rows (list)) tuples, best first,
+              where rows are the matching sheet rows (for an alt, the rows listing it)
+    """
+    folded = query.strip().casefold()
+    if not folded:
+        return []
+
+    candidates = []
+    for label, replica, index, trigram_index in refresh_lookup_indexes():
+        for score, name in trigram_index.search(folded, limit, min_score):
+            candidates.append((score, name, label, replica, index))
+
+    def rank(candidate):
+        score, name = candidate[0], candidate[1].casefold()
+        return (name != folded, not name.startswith(folded), -score, len(name))
+
+    results = []
+    for score, name, label, replica, index in sorted(candidates, key=rank)[:limit]:
+        results.append((score, name, label, replica.find_all(name, index)))
+    return results
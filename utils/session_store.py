@@ -0,0 +1,130 @@
+import os
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", "900"))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "1000"))
+
+# Multi-step flows that keep state between a modal and the next step
+FLOW_MASTERLIST_ADD = "masterlist_add"
+FLOW_MASTERLIST_EDIT = "masterlist_edit"
+FLOW_WATCHLIST_ADD = "watchlist_add"
+
+class ModalSession:
+    """
+    Fields entered in step 1 of a multi-step modal flow, kept until step 2 is submitted.
+    """
+
+    __slots__ = (
+        "player_ign", "discord_id", "known_alts", "house", "notes",
+        "selected_date", "selected_status", "selected_rank", "selected_reason",
+        "expires_at",
+    )
+
+    def __init__(self, player_ign="", discord_id="", known_alts="", house="", notes="",
+                 selected_date="", selected_status="", selected_rank="", selected_reason=""):
+        self.player_ign = player_ign
+        self.discord_id = discord_id
+        self.known_alts = known_alts
+        self.house = house
+        self.notes = notes
+        self.selected_date = selected_date
+        self.selected_status = selected_status
+        self.selected_rank = selected_rank
+        self.selected_reason = selected_reason
+        self.expires_at = 0.0
+
+class SessionStore:
+    """
+    Bounded store for multi-step modal state, keyed by (user ID, flow).
+
+    Each entry expires SESSION_TTL seconds after it was last stored or read,
+    and once SESSION_MAX_ENTRIES is reached the least recently used entry is
+    evicted. Entries are kept in last-use order, so expired ones are always
+    at the front and are purged on every write, keeping memory flat no
+    matter how many flows are abandoned.
+    """
+
+    def __init__(self, ttl=SESSION_TTL, max_entries=SESSION_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _touch(self, key, session):
+        session.expires_at = time.monotonic() + self.ttl
+        self._entries[key] = session
+        self._entries.move_to_end(key)
+
+    def purge_expired(self):
+        """
+        Drops every expired entry.
+
+        Returns:
+            int: Number of entries dropped
+        """
+        now = time.monotonic()
+        dropped = 0
+        while self._entries:
+            key, session = next(iter(self._entries.items()))
+            if session.expires_at > now:
+                break
+            del self._entries[key]
+            dropped += 1
+        return dropped
+
+    def put(self, user_id, flow, session):
+        """
+        Stores the state of a flow, replacing any earlier state of the same user and flow.
+
+        Args:
+            user_id (int): Discord user ID
+            flow (str): Flow name, one of the FLOW_* constants
+            session (ModalSession): The step 1 fields
+        """
+        self.purge_expired()
+        self._touch((user_id, flow), session)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, user_id, flow):
+        """
+        Returns the state of a flow and extends its lifetime.
+
+        Args:
+            user_id (int): Discord user ID
+            flow (str): Flow name, one of the FLOW_* constants
+
+        Returns:
+            ModalSession or None: The state, or None if there is none or it expired
+        """
+        key = (user_id, flow)
+        session = self._entries.get(key)
+        if session is None:
+            return None
+        if session.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._touch(key, session)
+        return session
+
+    def pop(self, user_id, flow):
+        """
+        Removes and returns the state of a flow.
+
+        Args:
+            user_id (int): Discord user ID
+            flow (str): Flow name, one of the FLOW_* constants
+
+        Returns:
+            ModalSession or None: The state, or None if there is none or it expired
+        """
+        session = self._entries.pop((user_id, flow), None)
+        if session is None or session.expires_at <= time.monotonic():
+            return None
+        return session
@@ -0,0 +1,548 @@
+import os
+import re
+import time
+import threading
+from bisect import insort
+from dotenv import load_dotenv
+
+from .google_sheet import request_priority, PRIORITY_BACKGROUND
+from .sqlite_mirror import get_mirror
+from .storage import get_backend, cell_text
+from .guild_registry import current_sheet_config, sheet_scope
+
+load_dotenv()
+
+# Seconds between freshness probes of a replica, and the longest a replica
+# is trusted before it is downloaded again in full
+SHEETS_FRESHNESS_INTERVAL = float(os.getenv("SHEETS_FRESHNESS_INTERVAL", "30"))
+SHEETS_MAX_STALENESS = float(os.getenv("SHEETS_MAX_STALENESS", "600"))
+
+# Default index set: the IGN in column A
+DEFAULT_INDEXES = {'ign': (0, False)}
+
+class SheetReplica:
+    """
+    In-memory copy of a worksheet with column-scoped dict indexes to row numbers.
+
+    The replica is loaded with a single scan of the storage backend and then kept in
+    step with every add, edit and delete made through the ops modules, so
+    lookups cost no API calls and a mutation costs only the write itself.
+
+    Each index is declared as name -> (column, split). A split column holds
+    a comma-separated list (such as Known Alts) and every entry is indexed
+    on its own. Keys are matched exactly after stripping whitespace.
+
+    Row numbers are 1-based sheet row numbers. Hold `lock` around a
+    lookup and the write that depends on it, so another thread cannot shift
+    the rows in between.
+
+    When the SQLite mirror is enabled, the first lookup is answered from the
+    mirror while a background thread reconciles it with the sheet.
+
+    Officers also edit the sheet by hand. Reads call ensure_fresh(), which
+    probes the IGN column only every SHEETS_FRESHNESS_INTERVAL seconds.
+    Writes call ensure_synced() and find their rows with resolve_row() or
+    resolve_rows(), which trust the replica within that interval and check
+    the target rows against the sheet after it. Edits to other columns are
+    picked up by a full reload every SHEETS_MAX_STALENESS seconds; writes
+    that keep existing cells must read them from the sheet (see read_row()).
+    """
+
+    def __init__(self, sheet_name, indexes=None, mirror=None):
+        self.sheet_name = sheet_name
+        self.index_columns = dict(indexes or DEFAULT_INDEXES)
+        self.mirror = mirror
+        self.sheet_config = current_sheet_config()
+        self.lock = threading.RLock()
+        self.synced = False
+        self._rows = None
+        self._indexes = {name: {} for name in self.index_columns}
+        self._version = 0
+        self._syncing = False
+        self._loaded_at = 0.0
+        self._probed_at = 0.0
+
+    @property
+    def loaded(self):
+        return self._rows is not None
+
+    @property
+    def version(self):
+        """
+        Counter bumped on every change to the replica, for caches derived from it.
+        """
+        return self._version
+
+    def index_keys(self, index='ign', blocking=True):
+        """
+        Returns every key of an index without loading the replica.
+
+        Args:
+            index (str): Name of the index (default: 'ign')
+            blocking (bool): Wait for the lock; if False and a write holds it, return None
+
+        Returns:
+            list or None: The index keys, empty if the replica is not loaded
+        """
+        if not self.lock.acquire(blocking=blocking):
+            return None
+        try:
+            return list(self._indexes[index])
+        finally:
+            self.lock.release()
+
+    @property
+    def _discord_id_column(self):
+        column = self.index_columns.get('discord_id')
+        return column[0] if column else None
+
+    def load(self):
+        """
+        Downloads the worksheet and rebuilds the index.
+        """
+        with self.lock:
+            self.replace(get_backend().scan(self.sheet_name))
+
+    def refresh(self):
+        """
+        Downloads the worksheet without holding the lock during the request.
+
+        If a write lands while the download is in flight the result is
+        discarded and the download retried, so a refresh never rolls back a
+        change made through the replica.
+
+        Returns:
+            list: All rows of the worksheet
+        """
+        for _ in range(3):
+            version = self._version
+            values = get_backend().scan(self.sheet_name)
+            with self.lock:
+                if self._version == version:
+                    self.replace(values)
+                    return self.get_all_rows()
+        with self.lock:
+            self.load()
+            return self.get_all_rows()
+
+    def ensure_loaded(self):
+        """
+        Loads the worksheet if it has not been loaded yet.
+
+        Rows are taken from the SQLite mirror when it has a copy, and a
+        background sync with the sheet is started; otherwise the sheet is downloaded.
+        """
+        with self.lock:
+            if self._rows is not None:
+                return
+            rows = self.mirror.load(self.sheet_name) if self.mirror else None
+            if rows is None:
+                self.load()
+                return
+            self._set_rows(rows)
+            self.synced = False
+            self._start_background_sync()
+
+    def ensure_synced(self):
+        """
+        Makes sure the replica's row numbers match the sheet before a write.
+
+        Downloads the worksheet if it was only loaded from the mirror or is
+        older than SHEETS_MAX_STALENESS. The target rows are checked when
+        they are resolved (see resolve_row()). Call this with `lock` held
+        before resolving rows for a write.
+        """
+        with self.lock:
+            if self._rows is None or not self.synced or time.monotonic() - self._loaded_at >= SHEETS_MAX_STALENESS:
+                self.load()
+
+    def _check_due(self):
+        # Local backends are only written through the replicas, so they never drift
+        return get_backend().remote and time.monotonic() - self._probed_at >= SHEETS_FRESHNESS_INTERVAL
+
+    def resolve_row(self, key):
+        """
+        Finds the row a write to one key should go to.
+
+        Within SHEETS_FRESHNESS_INTERVAL of the last load or probe the
+        replica is trusted as is. After that the row is read back and its
+        IGN checked (see read_row()), a single-row request instead of a read
+        of the whole IGN column. Call this with `lock` held, after ensure_synced().
+
+        Args:
+            key (str): IGN of the row
+
+        Returns:
+            int or None: Sheet row number if found, None if not found
+        """
+        with self.lock:
+            if not self._check_due():
+                return self.find_row(key)
+            found = self.read_row(key)
+            return found[0] if found else None
+
+    def resolve_rows(self, keys):
+        """
+        Finds the rows a write to many keys should go to.
+
+        Like resolve_row(), but once the interval has passed the IGN column
+        is probed once for all keys rather than reading each row. Call this
+        with `lock` held, after ensure_synced().
+
+        Args:
+            keys (list): IGNs of the rows
+
+        Returns:
+            list: Sheet row number of each key, None where not found
+        """
+        with self.lock:
+            if self._check_due():
+                self._probed_at = time.monotonic()
+                self.probe()
+            return [self.find_row(key) for key in keys]
+
+    def ensure_fresh(self):
+        """
+        Loads the replica and checks it against the sheet if a probe is due.
+
+        Call this once at the start of a read, not between the lookups of a
+        write, since a reload can renumber rows.
+        """
+        with self.lock:
+            self.ensure_loaded()
+            if self.synced:
+                self._check_freshness()
+
+    def _check_freshness(self):
+        now = time.monotonic()
+        if now - self._loaded_at >= SHEETS_MAX_STALENESS:
+            self.load()
+        elif now - self._probed_at >= SHEETS_FRESHNESS_INTERVAL:
+            self._probed_at = now
+            self.probe()
+
+    def probe(self):
+        """
+        Compares the IGN column of the sheet with the replica and reloads on a change.
+
+        The probe is a single read of column A. If rows were only added at
+        the bottom, just those rows are downloaded; any other change
+        triggers a full reload.
+
+        Returns:
+            bool: True if the replica was changed
+        """
+        with self.lock:
+            backend = get_backend()
+            remote = backend.read_column(self.sheet_name)
+            local = _key_column(self._rows)
+            if remote == local:
+                return False
+            if remote[:len(local)] != local or len(self._rows) > len(local):
+                self.load()
+                return True
+            first_row, last_row = len(self._rows) + 1, len(remote)
+            new_rows = backend.read_rows(self.sheet_name, first_row, last_row)
+            new_rows += [[] for _ in range(last_row - first_row + 1 - len(new_rows))]
+            width = max((len(row) for row in self._rows), default=0)
+            for row_number, row in enumerate(new_rows, start=first_row):
+                self._append_row(row_number, row + [""] * (width - len(row)))
+            return True
+
+    def _start_background_sync(self):
+        if self._syncing:
+            return
+        self._syncing = True
+        threading.Thread(target=self._background_sync, name=f"sync-{self.sheet_name}", daemon=True).start()
+
+    def _background_sync(self):
+        try:
+            with request_priority(PRIORITY_BACKGROUND), sheet_scope(self.sheet_config):
+                self.refresh()
+        except Exception as e:
+            print(f"Error syncing {self.sheet_name} from Google Sheets: {e}")
+        finally:
+            self._syncing = False
+
+    def replace(self, values):
+        """
+        Replaces the replica contents with freshly read sheet values.
+
+        The SQLite mirror is brought up to date with only the rows that changed.
+
+        Args:
+            values (list): All rows of the worksheet, as returned by StorageBackend.scan
+        """
+        with self.lock:
+            self._set_rows(values)
+            self.synced = True
+            self._loaded_at = self._probed_at = time.monotonic()
+            if self.mirror:
+                self.mirror.sync(self.sheet_name, self._rows, self._discord_id_column)
+
+    def _set_rows(self, values):
+        self._rows = [list(row) for row in values]
+        self._indexes = {name: {} for name in self.index_columns}
+        for row_number, row in enumerate(self._rows, start=1):
+            self._index_row(row_number, row)
+        self._version += 1
+
+    def invalidate(self):
+        """
+        Drops the replica so the next lookup reloads it from the sheet.
+        """
+        with self.lock:
+            self._rows = None
+            self.synced = False
+            self._indexes = {name: {} for name in self.index_columns}
+            self._version += 1
+
+    def _keys(self, row, column, split):
+        value = row[column] if len(row) > column else ""
+        if split:
+            return {part.strip() for part in value.split(",") if part.strip()}
+        value = value.strip()
+        return {value} if value else set()
+
+    def _index_row(self, row_number, row):
+        for name, (column, split) in self.index_columns.items():
+            index = self._indexes[name]
+            for key in self._keys(row, column, split):
+                insort(index.setdefault(key, []), row_number)
+
+    def _unindex_row(self, row_number, row):
+        for name, (column, split) in self.index_columns.items():
+            index = self._indexes[name]
+            for key in self._keys(row, column, split):
+                row_numbers = index.get(key)
+                if row_numbers and row_number in row_numbers:
+                    row_numbers.remove(row_number)
+                    if not row_numbers:
+                        del index[key]
+
+    def find_rows(self, key, index='ign'):
+        """
+        Finds every row whose indexed column exactly matches the key.
+
+        Args:
+            key (str): Value to look up
+            index (str): Name of the index to search (default: 'ign')
+
+        Returns:
+            list: Sheet row numbers in ascending order, empty if not found
+        """
+        with self.lock:
+            self.ensure_loaded()
+            return list(self._indexes[index].get(key.strip(), []))
+
+    def find_row(self, key, index='ign'):
+        """
+        Finds the first row whose indexed column exactly matches the key.
+
+        Args:
+            key (str): Value to look up
+            index (str): Name of the index to search (default: 'ign')
+
+        Returns:
+            int or None: Sheet row number if found, None if not found
+        """
+        row_numbers = self.find_rows(key, index)
+        return row_numbers[0] if row_numbers else None
+
+    def find(self, key, index='ign'):
+        """
+        Finds the first row whose indexed column exactly matches the key.
+
+        Args:
+            key (str): Value to look up
+            index (str): Name of the index to search (default: 'ign')
+
+        Returns:
+            list or None: Row data if found, None if not found
+        """
+        with self.lock:
+            row_number = self.find_row(key, index)
+            return self.get_row(row_number) if row_number else None
+
+    def find_all(self, key, index='ign'):
+        """
+        Finds every row whose indexed column exactly matches the key.
+
+        Args:
+            key (str): Value to look up
+            index (str): Name of the index to search (default: 'ign')
+
+        Returns:
+            list: Row data of each match, empty if not found
+        """
+        with self.lock:
+            return [self.get_row(row_number) for row_number in self.find_rows(key, index)]
+
+    def read_row(self, key):
+        """
+        Reads the current contents of a key's row from the sheet, for a write
+        that keeps some of its cells.
+
+        The row is resolved in the replica and its IGN checked against the
+        cells read back. If it no longer matches (the sheet changed since
+        ensure_synced()), the replica is reloaded and the row resolved again.
+        Call this with `lock` held.
+
+        Args:
+            key (str): IGN of the row
+
+        Returns:
+            tuple or None: (row number, row) if found, None if not found
+        """
+        with self.lock:
+            for _ in range(3):
+                row_number = self.find_row(key)
+                if row_number is None:
+                    return None
+                rows = get_backend().read_rows(self.sheet_name, row_number, row_number)
+                row = rows[0] if rows else []
+                if row and row[0].strip() == key.strip():
+                    return row_number, row
+                self.load()
+            raise RuntimeError(f"{key} keeps moving in {self.sheet_name}, try again")
+
+    def get_row(self, row_number):
+        """
+        Returns a copy of a row by its sheet row number.
+
+        Args:
+            row_number (int): 1-based sheet row number
+
+        Returns:
+            list: Row data
+        """
+        with self.lock:
+            self.ensure_loaded()
+            return list(self._rows[row_number - 1])
+
+    def get_all_rows(self):
+        """
+        Returns a copy of every row in the replica.
+
+        Returns:
+            list: All rows of the worksheet
+        """
+        with self.lock:
+            self.ensure_loaded()
+            return [list(row) for row in self._rows]
+
+    def apply_append(self, row_data, response=None):
+        """
+        Records a row appended to the sheet.
+
+        Args:
+            row_data (list): The appended row
+            response (dict): The append response, used to read the exact row the API wrote to
+        """
+        with self.lock:
+            if self._rows is None:
+                return
+            row_number = _updated_row(response) or len(self._rows) + 1
+            while len(self._rows) < row_number - 1:
+                self._rows.append([])
+            row = [cell_text(value) for value in row_data]
+            if row_number <= len(self._rows):
+                self.apply_update(row_number, row)
+                return
+            self._append_row(row_number, row)
+
+    def _append_row(self, row_number, row):
+        self._rows.append(row)
+        self._index_row(row_number, row)
+        self._version += 1
+        if self.mirror:
+            self.mirror.append_rows(self.sheet_name, row_number, [row], self._discord_id_column)
+
+    def apply_update(self, row_number, row_data):
+        """
+        Records a row overwritten from column A onwards.
+
+        Cells past the end of row_data keep their previous values, matching
+        a range update that only covers the written cells.
+
+        Args:
+            row_number (int): 1-based sheet row number
+            row_data (list): The new leading cells of the row
+        """
+        with self.lock:
+            if self._rows is None:
+                return
+            old_row = self._rows[row_number - 1]
+            new_row = [cell_text(value) for value in row_data] + old_row[len(row_data):]
+            self._unindex_row(row_number, old_row)
+            self._rows[row_number - 1] = new_row
+            self._index_row(row_number, new_row)
+            self._version += 1
+            if self.mirror:
+                self.mirror.update_row(self.sheet_name, row_number, new_row, self._discord_id_column)
+
+    def apply_delete(self, row_number):
+        """
+        Records a deleted row and shifts the row numbers below it up by one.
+
+        Args:
+            row_number (int): 1-based sheet row number
+        """
+        with self.lock:
+            if self._rows is None:
+                return
+            self._unindex_row(row_number, self._rows.pop(row_number - 1))
+            for index in self._indexes.values():
+                for row_numbers in index.values():
+                    for i in range(len(row_numbers) - 1, -1, -1):
+                        if row_numbers[i] <= row_number:
+                            break
+                        row_numbers[i] -= 1
+            self._version += 1
+            if self.mirror:
+                self.mirror.delete_row(self.sheet_name, row_number)
+
+_replicas = {}
+_replicas_lock = threading.Lock()
+
+def get_replica(sheet_name, indexes=None):
+    """
+    Returns the replica of a worksheet of the current guild's spreadsheet, creating it on first use.
+
+    The replica is not loaded until the first lookup. With the Google Sheets
+    storage backend it is backed by the SQLite mirror unless SHEETS_MIRROR_PATH is empty.
+
+    Args:
+        sheet_name (str): Name of the worksheet
+        indexes (dict): Index declarations (name -> (column, split)) used when the replica is created
+
+    Returns:
+        SheetReplica: The worksheet replica
+    """
+    key = (current_sheet_config().key, sheet_name)
+    with _replicas_lock:
+        replica = _replicas.get(key)
+        if replica is None:
+            mirror = get_mirror() if get_backend().remote else None
+            replica = _replicas[key] = SheetReplica(sheet_name, indexes, mirror)
+        return replica
+
+def _key_column(rows):
+    """
+    Returns the column A values of the rows, without trailing blanks.
+    """
+    keys = [row[0] if row else "" for row in rows]
+    while keys and not keys[-1]:
+        keys.pop()
+    return keys
+
+def _updated_row(response):
+    """
+    Reads the row number out of an append response's updatedRange (e.g. 'Masterlist!A12:I12').
+    """
+    try:
+        updated_range = response["updates"]["updatedRange"]
+    except (KeyError, TypeError):
+        return None
+    match = re.search(r"![A-Z]+(\d+)", updated_range)
+    return int(match.group(1)) if match else None
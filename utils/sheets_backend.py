@@ -0,0 +1,205 @@
+from gspread.utils import rowcol_to_a1
+
+from .google_sheet import get_sheet, get_spreadsheet
+from .guild_registry import current_sheet_config
+from .storage_base import StorageBackend
+
+def _cell(value):
+    """
+    Converts a Python value to CellData, entered as-is like a RAW values write.
+    """
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    return {"userEnteredValue": {"stringValue": "" if value is None else str(value)}}
+
+def _row_data(rows):
+    return [{"values": [_cell(value) for value in row]} for row in rows]
+
+def append_rows_request(sheet_id, rows):
+    """
+    Builds a request that appends rows after the last row with data.
+
+    Args:
+        sheet_id (int): ID of the target tab
+        rows (list): Rows to append
+
+    Returns:
+        dict: An appendCells request
+    """
+    return {
+        "appendCells": {
+            "sheetId": sheet_id,
+            "rows": _row_data(rows),
+            "fields": "userEnteredValue",
+        }
+    }
+
+def update_row_request(sheet_id, row_number, row, first_column=0):
+    """
+    Builds a request that overwrites a row from column A (or first_column) onwards.
+
+    Only the cells covered by the row are written.
+
+    Args:
+        sheet_id (int): ID of the target tab
+        row_number (int): 1-based sheet row number
+        row (list): New cells of the row, left to right
+        first_column (int): 0-based index of the first column written (default: 0)
+
+    Returns:
+        dict: An updateCells request
+    """
+    return {
+        "updateCells": {
+            "start": {"sheetId": sheet_id, "rowIndex": row_number - 1, "columnIndex": first_column},
+            "rows": _row_data([row]),
+            "fields": "userEnteredValue",
+        }
+    }
+
+def delete_rows_request(sheet_id, start_row, end_row=None):
+    """
+    Builds a request that deletes a block of rows.
+
+    Args:
+        sheet_id (int): ID of the target tab
+        start_row (int): First 1-based sheet row to delete
+        end_row (int): Last 1-based sheet row to delete, inclusive (default: start_row)
+
+    Returns:
+        dict: A deleteDimension request
+    """
+    return {
+        "deleteDimension": {
+            "range": {
+                "sheetId": sheet_id,
+                "dimension": "ROWS",
+                "startIndex": start_row - 1,
+                "endIndex": end_row or start_row,
+            }
+        }
+    }
+
+def delete_rows_requests(sheet_id, row_numbers):
+    """
+    Builds the requests that delete a set of rows in one batch.
+
+    Neighbouring rows are merged into one range, and the ranges are ordered
+    bottom-up so each deletion leaves the row numbers of the next one valid.
+
+    Args:
+        sheet_id (int): ID of the target tab
+        row_numbers (list): 1-based sheet row numbers to delete
+
+    Returns:
+        list: deleteDimension requests
+    """
+    ranges = []
+    for row_number in sorted(set(row_numbers), reverse=True):
+        if ranges and ranges[-1][0] == row_number + 1:
+            ranges[-1][0] = row_number
+        else:
+            ranges.append([row_number, row_number])
+    return [delete_rows_request(sheet_id, start_row, end_row) for start_row, end_row in ranges]
+
+def change_requests(change):
+    """
+    Translates a storage change (see utils/storage.py) into batch_update requests.
+
+    Args:
+        change (dict): A change built with append_change, update_change or delete_change
+
+    Returns:
+        list: The requests
+    """
+    sheet_id = get_sheet(change["sheet"]).id
+    if change["type"] == "append":
+        return [append_rows_request(sheet_id, change["rows"])]
+    if change["type"] == "update":
+        return [update_row_request(sheet_id, change["row_number"], change["values"], change["first_column"])]
+    return delete_rows_requests(sheet_id, change["row_numbers"])
+
+def _a1_range(sheet_name, first_row, last_row, columns):
+    sheet = get_sheet(sheet_name)
+    if columns is None and last_row is not None:
+        return f"'{sheet.title}'!{first_row}:{last_row}"
+    last_column = rowcol_to_a1(1, columns or sheet.col_count)[:-1]
+    return f"'{sheet.title}'!A{first_row}:{last_column}{last_row or ''}"
+
+class SheetsBackend(StorageBackend):
+    """
+    Stores the rows in the Google Sheets tabs of the current guild's spreadsheet.
+
+    Every commit is one batch_update, so a change and its Update Sheet
+    entry cost a single API request.
+    """
+
+    remote = True
+
+    def scan(self, sheet_name):
+        return get_sheet(sheet_name).get_all_values()
+
+    def read_rows(self, sheet_name, first_row, last_row=None, columns=None):
+        return get_spreadsheet().values_get(_a1_range(sheet_name, first_row, last_row, columns)).get('values', [])
+
+    def read_column(self, sheet_name, column=0):
+        letter = rowcol_to_a1(1, column + 1)[:-1]
+        values = get_spreadsheet().values_get(f"'{get_sheet(sheet_name).title}'!{letter}:{letter}").get('values', [])
+        values = [row[0] if row else "" for row in values]
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def __init__(self):
+        # Last row with data per (spreadsheet key, tab), as far as this process knows
+        self._last_rows = {}
+
+    def _last_row_key(self, sheet_name):
+        return current_sheet_config().key, sheet_name
+
+    def tail(self, sheet_name, limit, columns=None):
+        """
+        Reads only the last rows with a single bounded range read.
+
+        The last row with data is tracked from this backend's own commits.
+        The read reaches `limit` rows past it, so rows appended by hand show
+        up too; if the tab ended earlier or may run on further than that,
+        column A is read once to find the real last row.
+        """
+        if limit <= 0:
+            return []
+        key = self._last_row_key(sheet_name)
+        last_row = self._last_rows.get(key)
+        if last_row is not None:
+            start = max(1, last_row - limit + 1)
+            values = self.read_rows(sheet_name, start, last_row + limit, columns)
+            # The API drops trailing blank rows, so the reply ends at the last row with data
+            end = start + len(values) - 1
+            if last_row <= end < last_row + limit:
+                self._last_rows[key] = end
+                return values[-limit:]
+        last_row = len(self.read_column(sheet_name))
+        self._last_rows[key] = last_row
+        if last_row == 0:
+            return []
+        return self.read_rows(sheet_name, max(1, last_row - limit + 1), last_row, columns)[-limit:]
+
+    def _track_last_rows(self, changes):
+        for change in changes:
+            key = self._last_row_key(change["sheet"])
+            last_row = self._last_rows.get(key)
+            if last_row is None:
+                continue
+            if change["type"] == "append":
+                self._last_rows[key] = last_row + len(change["rows"])
+            elif change["type"] == "delete":
+                self._last_rows[key] = last_row - sum(1 for row in change["row_numbers"] if row <= last_row)
+
+    def commit(self, changes):
+        requests = [request for change in changes for request in change_requests(change)]
+        if requests:
+            response = get_spreadsheet().batch_update({"requests": requests})
+            self._track_last_rows(changes)
+            return response
@@ -0,0 +1,506 @@
+import os
+import sys
+import zlib
+import pickle
+import asyncio
+import inspect
+import itertools
+import threading
+import subprocess
+from multiprocessing.connection import Listener, Client
+from dotenv import load_dotenv
+
+from .google_sheet import request_priority, current_priority, get_scheduler, set_scheduler_factory
+from .google_sheet import RequestScheduler, PRIORITY_INTERACTIVE
+from .guild_registry import current_sheet_config, current_guild_id, guild_scope, sheet_scope, DEFAULT_KEY
+
+load_dotenv()
+
+# Number of Sheets worker processes (0 runs Sheets calls on threads of the bot process)
+SHEETS_WORKER_PROCESSES = int(os.getenv("SHEETS_WORKER_PROCESSES", "0"))
+# Seconds a call waits for its worker's reply
+SHEETS_WORKER_TIMEOUT = float(os.getenv("SHEETS_WORKER_TIMEOUT", "300"))
+# Seconds a worker may take to start and connect
+SHEETS_WORKER_START_TIMEOUT = float(os.getenv("SHEETS_WORKER_START_TIMEOUT", "30"))
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Environment variable handing the connection key to the workers
+_AUTHKEY_ENV = "SHEETS_WORKER_AUTHKEY"
+
+class WorkerError(Exception):
+    """
+    A Sheets worker process died, did not reply in time or sent a reply that could not be read.
+    """
+
+class _Worker:
+    __slots__ = ("index", "process", "conn", "send_lock")
+
+    def __init__(self, index, process, conn):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.send_lock = threading.Lock()
+
+def _settle(future, ok, value):
+    if future.done():
+        return
+    if ok:
+        future.set_result(value)
+    else:
+        future.set_exception(value)
+
+class SheetsWorkerPool:
+    """
+    Runs Sheets operations in separate worker processes.
+
+    The bot process pickles each call with the current spreadsheet, guild
+    and request priority and sends it over a local socket. A reader thread
+    per worker matches the replies to the waiting coroutines by correlation
+    ID, so gspread requests, JSON parsing and replica updates never run
+    under the bot process's GIL.
+
+    Each spreadsheet is pinned to one worker, which holds its replicas,
+    mirror, storage backend and Update Sheet queue; workers share nothing.
+    The quota is paced here: before each request a worker asks for a token
+    from this process's RequestScheduler of its credentials, so requests
+    are queued by priority and fairly across spreadsheets whichever worker
+    they come from. A worker that dies fails its pending calls with
+    WorkerError and is restarted.
+
+    Args:
+        processes (int): Number of worker processes
+        timeout (float): Seconds a call waits for its reply
+    """
+
+    def __init__(self, processes=SHEETS_WORKER_PROCESSES, timeout=SHEETS_WORKER_TIMEOUT):
+        self.processes = max(1, processes)
+        self.timeout = timeout
+        self._authkey = os.urandom(32)
+        self._listener = None
+        self._accept_lock = threading.Lock()
+        self._workers = [None] * self.processes
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._stopping = False
+
+    def start(self):
+        """
+        Starts the workers and waits until every one has connected.
+
+        Raises:
+            WorkerError: If a worker does not connect within SHEETS_WORKER_START_TIMEOUT
+        """
+        self._listener = Listener(authkey=self._authkey)
+        with self._accept_lock:
+            processes = [self._spawn(index) for index in range(self.processes)]
+            try:
+                connections = self._accept(processes)
+            except WorkerError:
+                self._listener.close()
+                raise
+        for index, process in enumerate(processes):
+            self._workers[index] = _Worker(index, process, connections[index])
+            threading.Thread(target=self._read, args=(index,), name=f"sheets-worker-{index}", daemon=True).start()
+
+    def _spawn(self, index):
+        env = dict(os.environ, **{_AUTHKEY_ENV: self._authkey.hex()})
+        command = f"from utils.sheets_worker import serve; serve({self._listener.address!r}, {index})"
+        return subprocess.Popen([sys.executable, "-c", command], cwd=_REPO_DIR, env=env)
+
+    def _accept(self, processes):
+        connections = {}
+
+        def accept():
+            for _ in processes:
+                conn = self._listener.accept()
+                connections[conn.recv()] = conn
+
+        thread = threading.Thread(target=accept, name="sheets-worker-accept", daemon=True)
+        thread.start()
+        thread.join(SHEETS_WORKER_START_TIMEOUT)
+        if thread.is_alive():
+            for process in processes:
+                process.kill()
+            raise WorkerError(f"Sheets workers did not connect within {SHEETS_WORKER_START_TIMEOUT:.0f}s")
+        return connections
+
+    def _read(self, index):
+        while True:
+            worker = self._workers[index]
+            try:
+                data = worker.conn.recv_bytes()
+            except (EOFError, OSError):
+                self._fail_pending(index, WorkerError(f"Sheets worker {index} exited"))
+                if self._stopping or not self._restart(index):
+                    return
+                continue
+            message = pickle.loads(data)
+            if message[0] == "acquire":
+                # Waits for quota, so it must not hold up this worker's replies
+                threading.Thread(target=self._grant, args=(worker, *message[1:]), daemon=True).start()
+                continue
+            if message[0] == "throttle":
+                get_scheduler(message[1]).throttle()
+                continue
+            if message[0] == "stopped":
+                self._send(worker, ("exit",))
+                continue
+            _, correlation_id, ok, payload = message
+            with self._pending_lock:
+                entry = self._pending.pop(correlation_id, None)
+            if entry is None:
+                # The caller already timed out
+                continue
+            loop, future, _ = entry
+            try:
+                value = pickle.loads(payload)
+            except Exception as e:
+                ok, value = False, WorkerError(f"Unreadable reply from Sheets worker {index}: {e}")
+            loop.call_soon_threadsafe(_settle, future, ok, value)
+
+    def _restart(self, index):
+        print(f"❌ Sheets worker {index} exited with code {self._workers[index].process.wait()}, restarting it")
+        try:
+            with self._accept_lock:
+                process = self._spawn(index)
+                conn = self._accept([process])[index]
+        except Exception as e:
+            print(f"❌ Error restarting Sheets worker {index}: {e}")
+            self._workers[index] = None
+            return False
+        self._workers[index] = _Worker(index, process, conn)
+        return True
+
+    def _send(self, worker, message):
+        with worker.send_lock:
+            worker.conn.send_bytes(pickle.dumps(message))
+
+    def _grant(self, worker, token_id, credentials, priority, tenant):
+        get_scheduler(credentials).acquire(priority, tenant)
+        try:
+            self._send(worker, ("grant", token_id))
+        except OSError:
+            # The worker exited; its restarted successor asks again
+            pass
+
+    def _fail_pending(self, index, error):
+        with self._pending_lock:
+            failed = [cid for cid, (_, _, worker_index) in self._pending.items() if worker_index == index]
+            entries = [self._pending.pop(cid) for cid in failed]
+        for loop, future, _ in entries:
+            loop.call_soon_threadsafe(_settle, future, False, error)
+
+    def worker_index(self, key):
+        """
+        Returns:
+            int: Index of the worker a spreadsheet key is pinned to
+        """
+        return zlib.crc32(key.encode()) % self.processes
+
+    async def call(self, func, *args, **kwargs):
+        """
+        Runs a function in the worker of the current spreadsheet and waits for its result.
+
+        The function is sent by reference, so it must be defined at module
+        level; its arguments and result must be picklable. Blocking functions
+        run on the worker's Sheets thread pool of the spreadsheet; coroutine
+        functions run on their own event loop.
+
+        Args:
+            func (callable): The function to run
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The function's return value
+
+        Raises:
+            WorkerError: If the worker is not running, exits or does not reply within the timeout
+        """
+        return await self._call("call", func, args, kwargs)
+
+    async def call_state(self, func, *args, **kwargs):
+        """
+        Runs a quick, non-blocking function over the Sheets state held by the
+        worker of the current spreadsheet, such as an autocomplete lookup.
+
+        It runs on the worker's state thread, so it does not wait behind
+        Sheets calls queued for quota.
+
+        Args:
+            func (callable): The function to run
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The function's return value
+
+        Raises:
+            WorkerError: If the worker is not running, exits or does not reply within the timeout
+        """
+        return await self._call("state", func, args, kwargs)
+
+    async def _call(self, kind, func, args, kwargs):
+        config = current_sheet_config()
+        index = self.worker_index(config.key)
+        worker = self._workers[index]
+        if worker is None:
+            raise WorkerError(f"Sheets worker {index} is not running")
+        body = pickle.dumps((func, args, kwargs, config, current_guild_id(), current_priority()))
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        correlation_id = next(self._ids)
+        with self._pending_lock:
+            self._pending[correlation_id] = (loop, future, index)
+        try:
+            try:
+                self._send(worker, (kind, correlation_id, body))
+            except OSError as e:
+                raise WorkerError(f"Sheets worker {index} is not reachable: {e}")
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                raise WorkerError(f"Sheets worker {index} did not reply within {self.timeout:.0f}s")
+        finally:
+            with self._pending_lock:
+                self._pending.pop(correlation_id, None)
+
+    def stop(self):
+        """
+        Lets every worker finish its calls and flush its queues, then stops it.
+        """
+        self._stopping = True
+        for worker in self._workers:
+            if worker is None:
+                continue
+            try:
+                self._send(worker, None)
+            except OSError:
+                pass
+        for worker in self._workers:
+            if worker is None:
+                continue
+            try:
+                worker.process.wait(timeout=SHEETS_WORKER_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                print(f"❌ Sheets worker {worker.index} did not stop, killing it")
+                worker.process.kill()
+            worker.conn.close()
+        if self._listener is not None:
+            self._listener.close()
+
+class _RemoteScheduler:
+    """
+    Stands in for a RequestScheduler in a worker: each request waits for a
+    token granted by the bot process's scheduler of the same credentials.
+    """
+
+    def __init__(self, credentials, send, grants):
+        self.credentials = credentials
+        self._send = send
+        self._grants = grants
+        # Paces the requests still made after the bot process is gone
+        self._fallback = RequestScheduler()
+
+    @property
+    def queue_depth(self):
+        return self._grants.waiting(self.credentials)
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE, tenant=DEFAULT_KEY):
+        token_id, granted = self._grants.open(self.credentials)
+        try:
+            if not self._grants.failed:
+                self._send(("acquire", token_id, self.credentials, priority, tenant))
+                granted.wait()
+        except OSError:
+            pass
+        finally:
+            self._grants.close(token_id)
+        if self._grants.failed:
+            self._fallback.acquire(priority, tenant)
+
+    def throttle(self):
+        self._fallback.throttle()
+        try:
+            self._send(("throttle", self.credentials))
+        except OSError:
+            pass
+
+class _Grants:
+    """
+    Quota tokens a worker is waiting for, by token ID.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._waiting = {}
+        self.failed = False
+
+    def open(self, credentials):
+        granted = threading.Event()
+        with self._lock:
+            token_id = next(self._ids)
+            self._waiting[token_id] = (credentials, granted)
+            if self.failed:
+                granted.set()
+        return token_id, granted
+
+    def close(self, token_id):
+        with self._lock:
+            self._waiting.pop(token_id, None)
+
+    def grant(self, token_id):
+        with self._lock:
+            entry = self._waiting.get(token_id)
+        if entry is not None:
+            entry[1].set()
+
+    def fail(self):
+        with self._lock:
+            self.failed = True
+            entries = list(self._waiting.values())
+        for _, granted in entries:
+            granted.set()
+
+    def waiting(self, credentials):
+        with self._lock:
+            return sum(1 for entry_credentials, _ in self._waiting.values() if entry_credentials == credentials)
+
+def serve(address, index):
+    """
+    Entry point of a worker process: runs the calls received from the bot until told to stop.
+
+    Calls run on the Sheets thread pool of their spreadsheet, and state
+    reads on a thread of their own, inside the caller's spreadsheet, guild
+    and priority. Every Sheets request waits for a quota token from the
+    bot. On stop, the queued calls finish and the Update Sheet queue and
+    storage backends are flushed.
+
+    Args:
+        address: Address of the bot's listener
+        index (int): Worker index, sent back so the bot can tell workers apart
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from . import async_ops, storage
+
+    conn = Client(address, authkey=bytes.fromhex(os.environ[_AUTHKEY_ENV]))
+    conn.send(index)
+    send_lock = threading.Lock()
+    grants = _Grants()
+    state_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheets-state")
+
+    def send(message):
+        with send_lock:
+            conn.send_bytes(pickle.dumps(message))
+
+    set_scheduler_factory(lambda credentials: _RemoteScheduler(credentials, send, grants))
+
+    def reply(correlation_id, ok, value):
+        try:
+            payload = pickle.dumps(value)
+        except Exception as e:
+            ok, payload = False, pickle.dumps(WorkerError(f"{type(value).__name__} result could not be sent: {e}"))
+        send(("reply", correlation_id, ok, payload))
+
+    def handle(correlation_id, func, args, kwargs, config, guild_id, priority):
+        try:
+            with sheet_scope(config), guild_scope(guild_id), request_priority(priority):
+                result = func(*args, **kwargs)
+                if inspect.iscoroutine(result):
+                    result = asyncio.run(result)
+        except Exception as e:
+            try:
+                pickle.loads(pickle.dumps(e))
+            except Exception:
+                e = WorkerError(f"{type(e).__name__}: {e}")
+            reply(correlation_id, False, e)
+            return
+        reply(correlation_id, True, result)
+
+    def shut_down():
+        state_executor.shutdown(wait=True)
+        async_ops.shutdown()
+        storage.shutdown_backend()
+        try:
+            send(("stopped",))
+        except OSError:
+            pass
+
+    stopper = None
+    while True:
+        try:
+            data = conn.recv_bytes()
+        except (EOFError, OSError):
+            # The bot is gone: the remaining requests are paced in this process
+            grants.fail()
+            break
+        message = pickle.loads(data)
+        if message is None:
+            # Queued calls still need quota grants, so this loop keeps reading meanwhile
+            stopper = threading.Thread(target=shut_down, name="sheets-worker-stop", daemon=True)
+            stopper.start()
+            continue
+        if message[0] == "exit":
+            break
+        if message[0] == "grant":
+            grants.grant(message[1])
+            continue
+        kind, correlation_id, body = message
+        try:
+            func, args, kwargs, config, guild_id, priority = pickle.loads(body)
+        except Exception as e:
+            reply(correlation_id, False, WorkerError(f"Call could not be read by the Sheets worker: {e}"))
+            continue
+        request = (correlation_id, func, args, kwargs, config, guild_id, priority)
+        if kind == "state":
+            state_executor.submit(handle, *request)
+        elif inspect.iscoroutinefunction(func):
+            # Awaits its own Sheets calls on the pool, so it must not take a pool thread
+            threading.Thread(target=handle, args=request, daemon=True).start()
+        else:
+            async_ops.get_executor(config.key).submit(handle, *request)
+
+    if stopper is None:
+        shut_down()
+    else:
+        stopper.join()
+    conn.close()
+
+_pool = None
+
+def start_worker_pool(processes=SHEETS_WORKER_PROCESSES):
+    """
+    Starts the process-wide Sheets worker pool.
+
+    Args:
+        processes (int): Number of worker processes
+
+    Returns:
+        SheetsWorkerPool: The running pool
+    """
+    global _pool
+    if _pool is None:
+        pool = SheetsWorkerPool(processes)
+        pool.start()
+        _pool = pool
+    return _pool
+
+def get_worker_pool():
+    """
+    Returns the running Sheets worker pool.
+
+    Returns:
+        SheetsWorkerPool or None: The pool, or None if Sheets calls run in this process
+    """
+    return _pool
+
+def stop_worker_pool():
+    """
+    Stops the Sheets worker pool, if it is running.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
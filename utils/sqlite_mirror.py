@@ -0,0 +1,282 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+from .guild_registry import current_sheet_key, scoped_path
+
+load_dotenv()
+
+# Set SHEETS_MIRROR_PATH to an empty value to turn the mirror off
+SHEETS_MIRROR_PATH = os.getenv("SHEETS_MIRROR_PATH", "sheets_mirror.db")
+
+class SheetMirror:
+    """
+    Durable local copy of the worksheets, stored in SQLite.
+
+    Each row is stored under its sheet name and 1-based row number, with the
+    IGN and Discord ID pulled out into indexed columns. Replicas load from
+    the mirror at startup so the bot can answer lookups straight away, and
+    write every change through to it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sheet_rows (
+                    sheet TEXT NOT NULL,
+                    row_number INTEGER NOT NULL,
+                    ign TEXT,
+                    discord_id TEXT,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (sheet, row_number)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sheet_rows_ign ON sheet_rows (sheet, ign)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sheet_rows_discord_id ON sheet_rows (sheet, discord_id)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sheet_state (
+                    sheet TEXT PRIMARY KEY,
+                    synced_at REAL NOT NULL
+                )
+            """)
+
+    def _record(self, sheet_name, row_number, row, discord_id_column):
+        ign = row[0] if row else ""
+        discord_id = row[discord_id_column] if discord_id_column is not None and len(row) > discord_id_column else ""
+        return (sheet_name, row_number, ign.strip(), discord_id.strip(), json.dumps(row))
+
+    def load(self, sheet_name):
+        """
+        Reads every mirrored row of a sheet.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+
+        Returns:
+            list or None: The rows in sheet order, or None if the sheet was never synced
+        """
+        with self._lock:
+            synced = self._conn.execute("SELECT 1 FROM sheet_state WHERE sheet = ?", (sheet_name,)).fetchone()
+            if synced is None:
+                return None
+            cursor = self._conn.execute(
+                "SELECT row_number, data FROM sheet_rows WHERE sheet = ? ORDER BY row_number", (sheet_name,)
+            )
+            rows = []
+            for row_number, data in cursor:
+                while len(rows) < row_number - 1:
+                    rows.append([])
+                rows.append(json.loads(data))
+            return rows
+
+    def row_count(self, sheet_name):
+        """
+        Returns the highest mirrored row number of a sheet.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+
+        Returns:
+            int: Number of mirrored rows, 0 if none
+        """
+        with self._lock:
+            count = self._conn.execute(
+                "SELECT MAX(row_number) FROM sheet_rows WHERE sheet = ?", (sheet_name,)
+            ).fetchone()[0]
+            return count or 0
+
+    def sync(self, sheet_name, rows, discord_id_column=None):
+        """
+        Reconciles the mirror of a sheet with freshly read rows.
+
+        Only rows that differ from the mirror are written.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+            rows (list): Every row of the worksheet
+            discord_id_column (int): 0-based Discord ID column, or None
+
+        Returns:
+            int: Number of rows written or removed
+        """
+        with self._lock, self._conn:
+            existing = dict(self._conn.execute(
+                "SELECT row_number, data FROM sheet_rows WHERE sheet = ?", (sheet_name,)
+            ))
+            changed = []
+            for row_number, row in enumerate(rows, start=1):
+                record = self._record(sheet_name, row_number, row, discord_id_column)
+                if existing.get(row_number) != record[4]:
+                    changed.append(record)
+            self._conn.executemany("INSERT OR REPLACE INTO sheet_rows VALUES (?, ?, ?, ?, ?)", changed)
+            removed = self._conn.execute(
+                "DELETE FROM sheet_rows WHERE sheet = ? AND row_number > ?", (sheet_name, len(rows))
+            ).rowcount
+            self._mark_synced(sheet_name)
+            return len(changed) + removed
+
+    def append_rows(self, sheet_name, first_row, rows, discord_id_column=None):
+        """
+        Writes rows appended to the sheet, starting at first_row.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+            first_row (int): 1-based row number of the first row
+            rows (list): The appended rows
+            discord_id_column (int): 0-based Discord ID column, or None
+        """
+        with self._lock, self._conn:
+            self._write_rows(sheet_name, first_row, rows, discord_id_column)
+            self._mark_synced(sheet_name)
+
+    def _write_rows(self, sheet_name, first_row, rows, discord_id_column=None):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO sheet_rows VALUES (?, ?, ?, ?, ?)",
+            [self._record(sheet_name, first_row + i, row, discord_id_column) for i, row in enumerate(rows)]
+        )
+
+    def update_row(self, sheet_name, row_number, row, discord_id_column=None):
+        """
+        Writes one changed row.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+            row_number (int): 1-based sheet row number
+            row (list): The full row
+            discord_id_column (int): 0-based Discord ID column, or None
+        """
+        self.append_rows(sheet_name, row_number, [row], discord_id_column)
+
+    def delete_row(self, sheet_name, row_number):
+        """
+        Removes a row and shifts the row numbers below it up by one.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+            row_number (int): 1-based sheet row number
+        """
+        with self._lock, self._conn:
+            self._delete_row(sheet_name, row_number)
+
+    def _delete_row(self, sheet_name, row_number):
+        self._conn.execute("DELETE FROM sheet_rows WHERE sheet = ? AND row_number = ?", (sheet_name, row_number))
+        # Shift through negative numbers so no step collides with the primary key
+        self._conn.execute(
+            "UPDATE sheet_rows SET row_number = -(row_number - 1) WHERE sheet = ? AND row_number > ?",
+            (sheet_name, row_number)
+        )
+        self._conn.execute(
+            "UPDATE sheet_rows SET row_number = -row_number WHERE sheet = ? AND row_number < 0", (sheet_name,)
+        )
+
+    def has_sheet(self, sheet_name):
+        """
+        Returns:
+            bool: True if the sheet was ever synced or written to
+        """
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM sheet_state WHERE sheet = ?", (sheet_name,)).fetchone() is not None
+
+    def read_range(self, sheet_name, first_row, last_row=None):
+        """
+        Reads a block of rows, with missing rows returned as empty lists.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+            first_row (int): First 1-based row number
+            last_row (int): Last 1-based row number, inclusive, or None for every row below first_row
+
+        Returns:
+            list: The rows in sheet order, without trailing missing rows
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT row_number, data FROM sheet_rows WHERE sheet = ? AND row_number >= ? AND row_number <= ? "
+                "ORDER BY row_number",
+                (sheet_name, first_row, last_row if last_row is not None else 2 ** 62)
+            )
+            rows = []
+            for row_number, data in cursor:
+                while len(rows) < row_number - first_row:
+                    rows.append([])
+                rows.append(json.loads(data))
+            return rows
+
+    def find_rows(self, sheet_name, ign):
+        """
+        Finds the rows whose IGN matches exactly, using the IGN index.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+            ign (str): IGN to look up
+
+        Returns:
+            list: 1-based row numbers in ascending order
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT row_number FROM sheet_rows WHERE sheet = ? AND ign = ? ORDER BY row_number",
+                (sheet_name, ign.strip())
+            )
+            return [row_number for (row_number,) in cursor]
+
+    def apply_changes(self, changes):
+        """
+        Applies storage changes (see utils/storage.py) in one transaction.
+
+        Args:
+            changes (list): Changes built with append_change, update_change and delete_change
+        """
+        with self._lock, self._conn:
+            for change in changes:
+                sheet_name = change["sheet"]
+                if change["type"] == "append":
+                    last_row = self._conn.execute(
+                        "SELECT MAX(row_number) FROM sheet_rows WHERE sheet = ? AND data != '[]'", (sheet_name,)
+                    ).fetchone()[0] or 0
+                    self._write_rows(sheet_name, last_row + 1, change["rows"])
+                elif change["type"] == "update":
+                    existing = self._conn.execute(
+                        "SELECT data FROM sheet_rows WHERE sheet = ? AND row_number = ?", (sheet_name, change["row_number"])
+                    ).fetchone()
+                    row = json.loads(existing[0]) if existing else []
+                    first_column, values = change["first_column"], change["values"]
+                    row += [""] * (first_column + len(values) - len(row))
+                    row[first_column:first_column + len(values)] = values
+                    self._write_rows(sheet_name, change["row_number"], [row])
+                else:
+                    for row_number in sorted(change["row_numbers"], reverse=True):
+                        self._delete_row(sheet_name, row_number)
+                self._mark_synced(sheet_name)
+
+    def _mark_synced(self, sheet_name):
+        self._conn.execute("INSERT OR REPLACE INTO sheet_state VALUES (?, ?)", (sheet_name, time.time()))
+
+_mirrors = {}
+_mirror_lock = threading.Lock()
+
+def get_mirror():
+    """
+    Returns the SQLite mirror of the current guild's spreadsheet, opening it on first use.
+
+    The SPREADSHEET_ID spreadsheet is mirrored to SHEETS_MIRROR_PATH, other
+    spreadsheets to a file named after their key next to it.
+
+    Returns:
+        SheetMirror or None: The mirror, or None if SHEETS_MIRROR_PATH is empty
+    """
+    if not SHEETS_MIRROR_PATH:
+        return None
+    key = current_sheet_key()
+    with _mirror_lock:
+        mirror = _mirrors.get(key)
+        if mirror is None:
+            mirror = _mirrors[key] = SheetMirror(scoped_path(SHEETS_MIRROR_PATH, key))
+        return mirror
@@ -0,0 +1,312 @@
+import os
+import atexit
+import threading
+from dotenv import load_dotenv
+
+from .google_sheet import request_priority, PRIORITY_BACKGROUND
+from .sqlite_mirror import SheetMirror
+from .guild_registry import current_sheet_config, sheet_scope, scoped_path
+from .storage_base import StorageBackend, cell_text, append_change, update_change, delete_change, apply_change
+from .storage_base import _trim, _data_row_count, _as_text
+from .sheets_backend import SheetsBackend
+
+load_dotenv()
+
+# Where sheet rows are stored: "sheets" (Google Sheets), "sqlite" or "memory"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sheets").strip().lower()
+# Database file of the sqlite backend
+STORAGE_SQLITE_PATH = os.getenv("STORAGE_SQLITE_PATH", "asbot.db")
+# Copy every change made to a local backend to Google Sheets in the background
+STORAGE_EXPORT_TO_SHEETS = os.getenv("STORAGE_EXPORT_TO_SHEETS", "").strip().lower() in ("1", "true", "yes")
+# Seconds between export attempts, and the most changes sent in one export request
+STORAGE_EXPORT_INTERVAL = float(os.getenv("STORAGE_EXPORT_INTERVAL", "2"))
+STORAGE_EXPORT_BATCH_SIZE = int(os.getenv("STORAGE_EXPORT_BATCH_SIZE", "200"))
+
+class MemoryBackend(StorageBackend):
+    """
+    Keeps every tab in process memory. Nothing survives a restart, so this
+    is meant for tests, benchmarks and trying the bot out offline.
+    """
+
+    def __init__(self, sheets=None):
+        self._lock = threading.Lock()
+        self._sheets = {name: [[cell_text(value) for value in row] for row in rows] for name, rows in (sheets or {}).items()}
+
+    def has_sheet(self, sheet_name):
+        return sheet_name in self._sheets
+
+    def replace_rows(self, sheet_name, rows):
+        with self._lock:
+            self._sheets[sheet_name] = [list(row) for row in rows]
+
+    def scan(self, sheet_name):
+        with self._lock:
+            rows = self._sheets.get(sheet_name, [])
+            width = max((len(row) for row in rows), default=0)
+            return [row + [""] * (width - len(row)) for row in rows]
+
+    def read_rows(self, sheet_name, first_row, last_row=None, columns=None):
+        with self._lock:
+            return _trim(row[:columns] for row in self._sheets.get(sheet_name, [])[first_row - 1:last_row])
+
+    def read_column(self, sheet_name, column=0):
+        with self._lock:
+            values = [row[column] if len(row) > column else "" for row in self._sheets.get(sheet_name, [])]
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def tail(self, sheet_name, limit, columns=None):
+        if limit <= 0:
+            return []
+        with self._lock:
+            rows = self._sheets.get(sheet_name, [])
+            end = _data_row_count(rows)
+            return _trim(row[:columns] for row in rows[max(0, end - limit):end])
+
+    def commit(self, changes):
+        with self._lock:
+            for change in changes:
+                apply_change(self._sheets.setdefault(change["sheet"], []), change)
+
+class SqliteBackend(StorageBackend):
+    """
+    Stores every tab in a local SQLite database, in the same layout as the
+    SQLite mirror. IGN lookups and tail reads use the database indexes.
+    """
+
+    def __init__(self, path=STORAGE_SQLITE_PATH):
+        self.store = SheetMirror(path)
+
+    def has_sheet(self, sheet_name):
+        return self.store.has_sheet(sheet_name)
+
+    def replace_rows(self, sheet_name, rows):
+        self.store.sync(sheet_name, rows)
+
+    def scan(self, sheet_name):
+        rows = self.store.load(sheet_name) or []
+        width = max((len(row) for row in rows), default=0)
+        return [row + [""] * (width - len(row)) for row in rows]
+
+    def read_rows(self, sheet_name, first_row, last_row=None, columns=None):
+        return _trim(row[:columns] for row in self.store.read_range(sheet_name, first_row, last_row))
+
+    def find(self, sheet_name, key, column=0):
+        if column == 0:
+            return self.store.find_rows(sheet_name, key)
+        return super().find(sheet_name, key, column)
+
+    def tail(self, sheet_name, limit, columns=None):
+        last_row = self.store.row_count(sheet_name)
+        rows = []
+        window = limit
+        while last_row >= 1 and len(_trim(rows)) < limit:
+            first_row = max(1, last_row - window + 1)
+            block = self.store.read_range(sheet_name, first_row, last_row)
+            rows = block + [[] for _ in range(last_row - first_row + 1 - len(block))] + rows
+            last_row = first_row - 1
+            window *= 2
+        rows = _trim(row[:columns] for row in rows)
+        return rows[-limit:] if limit > 0 else []
+
+    def commit(self, changes):
+        self.store.apply_changes([_as_text(change) for change in changes])
+
+class ExportingBackend(StorageBackend):
+    """
+    Local primary backend whose changes are copied to another backend
+    (normally Google Sheets) by a background thread.
+
+    Reads and commits are served by the primary only. Committed changes are
+    queued and replayed on the export backend in order, several commits per
+    request, and retried until they succeed. A tab the primary has never
+    seen is first copied from the export backend, so switching an existing
+    deployment over keeps its data.
+
+    The export is one-way: edits made directly in the export target are not
+    read back and may be overwritten by row-numbered changes.
+
+    Exports run against the spreadsheet that was current when the backend
+    was created, whichever thread sends them.
+    """
+
+    def __init__(self, primary, export, interval=STORAGE_EXPORT_INTERVAL, batch_size=STORAGE_EXPORT_BATCH_SIZE):
+        self.primary = primary
+        self.export = export
+        self.sheet_config = current_sheet_config()
+        self.interval = interval
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopped = False
+        self.exported = 0
+        self.failed_exports = 0
+
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    def _seeded(self, sheet_name):
+        if self.primary.has_sheet(sheet_name):
+            return
+        with self._seed_lock:
+            if not self.primary.has_sheet(sheet_name):
+                self.primary.replace_rows(sheet_name, self.export.scan(sheet_name))
+
+    def scan(self, sheet_name):
+        self._seeded(sheet_name)
+        return self.primary.scan(sheet_name)
+
+    def read_rows(self, sheet_name, first_row, last_row=None, columns=None):
+        self._seeded(sheet_name)
+        return self.primary.read_rows(sheet_name, first_row, last_row, columns)
+
+    def read_column(self, sheet_name, column=0):
+        self._seeded(sheet_name)
+        return self.primary.read_column(sheet_name, column)
+
+    def find(self, sheet_name, key, column=0):
+        self._seeded(sheet_name)
+        return self.primary.find(sheet_name, key, column)
+
+    def tail(self, sheet_name, limit, columns=None):
+        self._seeded(sheet_name)
+        return self.primary.tail(sheet_name, limit, columns)
+
+    def commit(self, changes):
+        for sheet_name in {change["sheet"] for change in changes}:
+            self._seeded(sheet_name)
+        self.primary.commit(changes)
+        with self._lock:
+            self._pending.extend(changes)
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, name="storage-export", daemon=True)
+                self._thread.start()
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                with request_priority(PRIORITY_BACKGROUND):
+                    self.flush()
+            except Exception as e:
+                print(f"Error exporting changes: {e}")
+
+    def flush(self):
+        """
+        Sends every queued change to the export backend, batch_size changes per commit.
+
+        Changes that fail stay at the front of the queue for the next attempt.
+        """
+        with self._export_lock, sheet_scope(self.sheet_config):
+            while True:
+                with self._lock:
+                    changes = self._pending[:self.batch_size]
+                if not changes:
+                    return
+                try:
+                    self.export.commit(changes)
+                except Exception:
+                    self.failed_exports += 1
+                    raise
+                with self._lock:
+                    del self._pending[:len(changes)]
+                self.exported += len(changes)
+
+    def shutdown(self):
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+        self.flush()
+        self.primary.shutdown()
+
+def create_backend(name=STORAGE_BACKEND, export_to_sheets=STORAGE_EXPORT_TO_SHEETS, sqlite_path=STORAGE_SQLITE_PATH):
+    """
+    Builds a backend from its configured name.
+
+    Args:
+        name (str): "sheets", "sqlite" or "memory"
+        export_to_sheets (bool): Copy the changes of a local backend to Google Sheets
+        sqlite_path (str): Database file of the sqlite backend
+
+    Returns:
+        StorageBackend: The backend
+
+    Raises:
+        ValueError: If the name is not a known backend
+    """
+    if name == "sheets":
+        return SheetsBackend()
+    if name == "sqlite":
+        backend = SqliteBackend(sqlite_path)
+    elif name == "memory":
+        backend = MemoryBackend()
+    else:
+        raise ValueError(f"STORAGE_BACKEND must be sheets, sqlite or memory, not {name!r}")
+    if export_to_sheets:
+        backend = ExportingBackend(backend, SheetsBackend())
+    return backend
+
+_backends = {}
+_backend_lock = threading.Lock()
+
+def get_backend():
+    """
+    Returns the storage backend of the current guild's spreadsheet, created from STORAGE_BACKEND on first use.
+
+    Each spreadsheet has its own backend. The sqlite backend of the
+    SPREADSHEET_ID spreadsheet uses STORAGE_SQLITE_PATH, other spreadsheets
+    a file named after their key next to it.
+
+    Returns:
+        StorageBackend: The backend the ops modules read and write through
+    """
+    key = current_sheet_config().key
+    backend = _backends.get(key)
+    if backend is None:
+        with _backend_lock:
+            backend = _backends.get(key)
+            if backend is None:
+                backend = _backends[key] = create_backend(sqlite_path=scoped_path(STORAGE_SQLITE_PATH, key))
+    return backend
+
+def set_backend(backend):
+    """
+    Replaces the current spreadsheet's storage backend, e.g. with a MemoryBackend in tests.
+
+    Local replicas are not reset; clear them if they were loaded from the previous backend.
+
+    Args:
+        backend (StorageBackend): The new backend, or None to create one from the configuration on next use
+
+    Returns:
+        StorageBackend: The previous backend, or None
+    """
+    key = current_sheet_config().key
+    with _backend_lock:
+        previous = _backends.pop(key, None)
+        if backend is not None:
+            _backends[key] = backend
+    return previous
+
+def shutdown_backend():
+    """
+    Lets every storage backend finish pending background work, such as a Sheets export.
+    """
+    for backend in list(_backends.values()):
+        try:
+            backend.shutdown()
+        except Exception as e:
+            print(f"Error shutting down storage backend: {e}")
+
+atexit.register(shutdown_backend)
@@ -0,0 +1,231 @@
+from abc import ABC, abstractmethod
+
+def cell_text(value):
+    """
+    Converts a written value to the text get_all_values would read back.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+def append_change(sheet_name, rows):
+    """
+    Builds a change that appends rows after the last row with data.
+
+    Args:
+        sheet_name (str): Name of the target tab
+        rows (list): Rows to append
+
+    Returns:
+        dict: The change
+    """
+    return {"type": "append", "sheet": sheet_name, "rows": [list(row) for row in rows]}
+
+def update_change(sheet_name, row_number, values, first_column=0):
+    """
+    Builds a change that overwrites consecutive cells of one row.
+
+    Cells outside the written range keep their values.
+
+    Args:
+        sheet_name (str): Name of the target tab
+        row_number (int): 1-based sheet row number
+        values (list): Cell values, left to right
+        first_column (int): 0-based index of the first column written (default: 0)
+
+    Returns:
+        dict: The change
+    """
+    return {"type": "update", "sheet": sheet_name, "row_number": row_number, "first_column": first_column, "values": list(values)}
+
+def delete_change(sheet_name, row_numbers):
+    """
+    Builds a change that deletes rows; the rows below move up.
+
+    Args:
+        sheet_name (str): Name of the target tab
+        row_numbers (list): 1-based sheet row numbers to delete
+
+    Returns:
+        dict: The change
+    """
+    return {"type": "delete", "sheet": sheet_name, "row_numbers": sorted(set(row_numbers))}
+
+def _trim(rows):
+    """
+    Drops trailing blank cells and rows, as the values API does.
+    """
+    trimmed = []
+    for row in rows:
+        row = list(row)
+        while row and row[-1] == "":
+            row.pop()
+        trimmed.append(row)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+def _data_row_count(rows):
+    count = len(rows)
+    while count and not any(rows[count - 1]):
+        count -= 1
+    return count
+
+def _as_text(change):
+    """
+    Returns a copy of a change with its values converted to cell text.
+    """
+    if change["type"] == "append":
+        return dict(change, rows=[[cell_text(value) for value in row] for row in change["rows"]])
+    if change["type"] == "update":
+        return dict(change, values=[cell_text(value) for value in change["values"]])
+    return change
+
+def apply_change(rows, change):
+    """
+    Applies a change to a list of rows in place.
+
+    Args:
+        rows (list): The rows of the change's tab
+        change (dict): A change built with append_change, update_change or delete_change
+    """
+    change = _as_text(change)
+    if change["type"] == "append":
+        del rows[_data_row_count(rows):]
+        rows.extend(change["rows"])
+    elif change["type"] == "update":
+        while len(rows) < change["row_number"]:
+            rows.append([])
+        row = rows[change["row_number"] - 1]
+        first_column, values = change["first_column"], change["values"]
+        row += [""] * (first_column + len(values) - len(row))
+        row[first_column:first_column + len(values)] = values
+    else:
+        for row_number in reversed(change["row_numbers"]):
+            if row_number <= len(rows):
+                del rows[row_number - 1]
+
+class StorageBackend(ABC):
+    """
+    Where the Masterlist, Watchlist and Update Sheet rows are stored.
+
+    Rows are lists of strings addressed by 1-based row number, like a
+    worksheet. Every write is a change built with append_change,
+    update_change or delete_change, and commit() applies a list of them as
+    one unit: one request for Google Sheets, one transaction for SQLite.
+
+    Subclasses must implement scan() and commit(); the other reads fall
+    back to scan() and can be overridden with cheaper versions.
+    """
+
+    # True if the rows live in a service other people edit too, so local
+    # copies need the SQLite mirror and freshness probes
+    remote = False
+
+    @abstractmethod
+    def scan(self, sheet_name):
+        """
+        Reads every row of a tab.
+
+        Args:
+            sheet_name (str): Name of the tab
+
+        Returns:
+            list: All rows, padded to the same width
+        """
+
+    @abstractmethod
+    def commit(self, changes):
+        """
+        Applies changes in order, as one unit.
+
+        Args:
+            changes (list): Changes built with append_change, update_change or delete_change
+        """
+
+    def read_rows(self, sheet_name, first_row, last_row=None, columns=None):
+        """
+        Reads a block of rows.
+
+        Args:
+            sheet_name (str): Name of the tab
+            first_row (int): First 1-based row number
+            last_row (int): Last 1-based row number, inclusive, or None to read to the end
+            columns (int): Number of leading columns to read, or None for all
+
+        Returns:
+            list: The rows without trailing blank cells, and without trailing blank rows
+        """
+        rows = self.scan(sheet_name)[first_row - 1:last_row]
+        return _trim(row[:columns] for row in rows)
+
+    def read_column(self, sheet_name, column=0):
+        """
+        Reads one column of a tab.
+
+        Args:
+            sheet_name (str): Name of the tab
+            column (int): 0-based column index (default: 0)
+
+        Returns:
+            list: The cell values from row 1 down, without trailing blanks
+        """
+        values = [row[column] if len(row) > column else "" for row in self.scan(sheet_name)]
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def find(self, sheet_name, key, column=0):
+        """
+        Finds the rows whose cell in a column matches the key exactly, ignoring surrounding whitespace.
+
+        Args:
+            sheet_name (str): Name of the tab
+            key (str): Value to look up
+            column (int): 0-based column index (default: 0)
+
+        Returns:
+            list: 1-based row numbers in ascending order
+        """
+        key = key.strip()
+        return [row_number for row_number, value in enumerate(self.read_column(sheet_name, column), start=1) if value.strip() == key]
+
+    def tail(self, sheet_name, limit, columns=None):
+        """
+        Reads the last rows with data.
+
+        Args:
+            sheet_name (str): Name of the tab
+            limit (int): Number of rows to return
+            columns (int): Number of leading columns to read, or None for all
+
+        Returns:
+            list: Up to `limit` rows, oldest first
+        """
+        rows = _trim(row[:columns] for row in self.scan(sheet_name))
+        return rows[-limit:] if limit > 0 else []
+
+    def append_rows(self, sheet_name, rows):
+        """
+        Appends rows after the last row with data.
+        """
+        return self.commit([append_change(sheet_name, rows)])
+
+    def update_row(self, sheet_name, row_number, values, first_column=0):
+        """
+        Overwrites consecutive cells of one row.
+        """
+        return self.commit([update_change(sheet_name, row_number, values, first_column)])
+
+    def delete_rows(self, sheet_name, row_numbers):
+        """
+        Deletes rows; the rows below move up.
+        """
+        return self.commit([delete_change(sheet_name, row_numbers)])
+
+    def shutdown(self):
+        """
+        Finishes pending background work. Called once when the bot stops.
+        """
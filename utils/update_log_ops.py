@@ -1,14 +1,18 @@
 from datetime import datetime
 
-from .google_sheet import get_sheet
+from .sqlite_mirror import get_mirror
+from .storage import get_backend
 
-def log_update(user_name, change_description):
+def build_update_row(user_name, change_description):
     """
-    Logs an update to the Update Sheet with timestamp and user information.
-    
+    Builds an Update Sheet row with timestamp and user information.
+
     Args:
         user_name (str): Name of the user who made the change
         change_description (str): Description of the change made
+
+    Returns:
+        list: The [date, user, description] row
     """
 
     #HardCoded admin names
@@ -42,13 +46,15 @@ def log_update(user_name, change_description):
     if user_name == 'voyagerloaf':
         user_name = 'Lof'
 
-    sheet = get_sheet('Update Sheet')
     date_str = datetime.now().strftime('%Y/%m/%d')
-    sheet.append_row([date_str, user_name, change_description])
+    return [date_str, user_name, change_description]
 
 def get_recent_updates(limit=10):
     """
     Retrieves recent updates from the Update Sheet.
+
+    Only the last rows are read (see StorageBackend.tail), so with the
+    Google Sheets backend the cost does not grow with the length of the log.
     
     Args:
         limit (int): Number of recent updates to retrieve (default: 10)
@@ -56,6 +62,24 @@ def get_recent_updates(limit=10):
     Returns:
         list: List of recent update rows from the sheet
     """
-    sheet = get_sheet('Update Sheet')
-    all_values = sheet.get_all_values()
-    return all_values[-limit:] if len(all_values) > limit else all_values 
+    rows = get_backend().tail('Update Sheet', limit, columns=3)
+    return [row + [''] * (3 - len(row)) for row in rows]
+
+def sync_update_log_mirror():
+    """
+    Copies Update Sheet rows added since the last sync into the SQLite mirror.
+
+    The log is append-only, so only the rows below the last mirrored row
+    are read, with one range request.
+
+    Returns:
+        int: Number of rows added to the mirror
+    """
+    backend = get_backend()
+    mirror = get_mirror()
+    if mirror is None or not backend.remote:
+        return 0
+    start = mirror.row_count('Update Sheet') + 1
+    values = backend.read_rows('Update Sheet', start, columns=3)
+    mirror.append_rows('Update Sheet', start, values)
+    return len(values)
@@ -1,5 +1,50 @@
-from .google_sheet import get_sheet
-from .update_log_ops import log_update
+from .sheet_cache import get_replica
+from .storage import append_change, update_change, delete_change
+from .batch_ops import commit_with_log, resolve_targets
+
+# Column-scoped replica indexes: IGN (A), Known Alts (I, comma-separated), Discord ID (J)
+WATCHLIST_INDEXES = {'ign': (0, False), 'alt': (8, True), 'discord_id': (9, False)}
+
+# Rows per commit when importing players in bulk
+IMPORT_CHUNK_SIZE = 500
+
+# Discord usernames of the admins and the name recorded in the Action By column
+ACTION_BY_NAMES = {'kahzukie': 'Kahz',
+                   '.onlyman': 'Beaako',
+                   'gds_': 'Gds',
+                   'wpmz': 'Exdel',
+                   'skar_8685': 'Skar',
+                   'reginaphalange9799': 'Luna',
+                   'kitsuneblaze0592': 'Kitsu',
+                   'night.flower': 'Nyx',
+                   'kyzeyy': 'Kyzey',
+                   'voyagerloaf': 'Lof'}
+
+def is_admin(user_name):
+    """
+    Checks whether a Discord user may change the sheets.
+
+    Args:
+        user_name (str): Discord username
+
+    Returns:
+        bool: True if the user is listed in ACTION_BY_NAMES
+    """
+    return user_name in ACTION_BY_NAMES
+
+def get_watchlist_replica():
+    """
+    Returns the local Watchlist replica that lookups are served from.
+
+    Returns:
+        SheetReplica: The Watchlist replica
+    """
+    return get_replica('Watchlist', WATCHLIST_INDEXES)
+
+def _fresh_replica():
+    replica = get_watchlist_replica()
+    replica.ensure_fresh()
+    return replica
 
 def add_player_to_banlist(row_data, user_name):
     """
@@ -12,28 +57,69 @@ def add_player_to_banlist(row_data, user_name):
     Returns:
         tuple: (success (bool), message (str))
     """
+    replica = get_watchlist_replica()
     try:
-        sheet = get_sheet('Watchlist')
+        row_data[5] = ACTION_BY_NAMES[user_name]
+
+        with replica.lock:
+            replica.ensure_synced()
+            commit_with_log([append_change('Watchlist', [row_data])], user_name, [f"Added player to Watchlist: {row_data[0]}"])
+            replica.apply_append(row_data)
+        return True, f"✅ Successfully added {row_data[0]} to Watchlist!"
+    except Exception as e:
+        replica.invalidate()
+        return False, f"❌ Failed to add player to Watchlist: {str(e)}"
 
-        user = {'kahzukie': 'Kahz',
-                '.onlyman': 'Beaako',
-                'gds_': 'Gds',
-                'wpmz': 'Exdel',
-                'skar_8685': 'Skar',
-                'reginaphalange9799': 'Luna',
-                'kitsuneblaze0592': 'Kitsu',
-                'night.flower': 'Nyx',
-                'kyzeyy': 'Kyzey',
-                'voyagerloaf': 'Lof'}
+def bulk_add_players_to_banlist(rows, user_name):
+    """
+    Adds many players to the Watchlist, skipping IGNs that are already listed.
 
-        row_data[5] = user[user_name]
+    Duplicate IGNs within the rows are skipped too. Like a single add, only
+    admins listed in ACTION_BY_NAMES may import; an empty Action By cell is
+    filled in from the importing admin. The rest are written in chunks of
+    IMPORT_CHUNK_SIZE; each chunk is one commit that also appends one
+    Update Sheet entry per player.
 
-        sheet.append_row(row_data)
+    Args:
+        rows (list): Player rows to add, in Watchlist column order
+        user_name (str): Name of the user making the change
 
-        log_update(user_name, f"Added player to Watchlist: {row_data[0]}")
-        return True, f"✅ Successfully added {row_data[0]} to Watchlist!"
+    Returns:
+        tuple: (success (bool), message (str), skipped (list of IGNs already listed))
+    """
+    replica = get_watchlist_replica()
+    added = 0
+    skipped = []
+    try:
+        action_by = ACTION_BY_NAMES[user_name]
+
+        with replica.lock:
+            replica.ensure_synced()
+            new_rows = []
+            seen = set()
+            igns = [str(row[0]).strip() for row in rows]
+            for row, ign, row_number in zip(rows, igns, replica.resolve_rows(igns)):
+                if ign in seen or row_number is not None:
+                    skipped.append(ign)
+                    continue
+                seen.add(ign)
+                row[5] = row[5] or action_by
+                new_rows.append(row)
+
+            for start in range(0, len(new_rows), IMPORT_CHUNK_SIZE):
+                chunk = new_rows[start:start + IMPORT_CHUNK_SIZE]
+                commit_with_log(
+                    [append_change('Watchlist', chunk)],
+                    user_name,
+                    [f"Added player to Watchlist: {row[0]} (CSV import)" for row in chunk]
+                )
+                for row in chunk:
+                    replica.apply_append(row)
+                added += len(chunk)
+        return True, f"✅ Successfully imported {added} player(s) to Watchlist!", skipped
     except Exception as e:
-        return False, f"❌ Failed to add player to Watchlist: {str(e)}"
+        replica.invalidate()
+        return False, f"❌ Error importing players to Watchlist after {added} row(s): {str(e)}", skipped
 
 def remove_player_from_banlist(player_id, user_name):
     """
@@ -46,13 +132,18 @@ def remove_player_from_banlist(player_id, user_name):
     Returns:
         tuple: (success (bool), message (str))
     """
-    sheet = get_sheet('Watchlist')
+    replica = get_watchlist_replica()
     try:
-        cell = sheet.find(player_id)
-        sheet.delete_rows(cell.row)
-        log_update(user_name, f"Removed player from Watchlist: {player_id}")
+        with replica.lock:
+            replica.ensure_synced()
+            row_number = replica.resolve_row(player_id)
+            if row_number is None:
+                return False, f"❌ Error removing player from Watchlist: {player_id} not found"
+            commit_with_log([delete_change('Watchlist', [row_number])], user_name, [f"Removed player from Watchlist: {player_id}"])
+            replica.apply_delete(row_number)
         return True, f"✅ Successfully removed {player_id} from Watchlist!"
     except Exception as e:
+        replica.invalidate()
         return False, f"❌ Error removing player from Watchlist: {str(e)}"
 
 def edit_player_in_banlist(player_id, new_data, user_name):
@@ -61,34 +152,137 @@ def edit_player_in_banlist(player_id, new_data, user_name):
     
     Args:
         player_id (str): ID of the player to edit
-        new_data (list): New player data
+        new_data (list): New player data; None keeps the cell's current value in the sheet
         user_name (str): Name of the user making the change
         
     Returns:
         tuple: (success (bool), message (str))
     """
-    sheet = get_sheet('Watchlist')
+    replica = get_watchlist_replica()
     try:
-        cell = sheet.find(player_id)
-        sheet.update(f'A{cell.row}:Z{cell.row}', [new_data])
-        log_update(user_name, f"Edited player in Watchlist: {player_id}")
+        with replica.lock:
+            replica.ensure_synced()
+            if None in new_data:
+                # Kept cells are read from the sheet, not the replica, so hand edits are not overwritten
+                found = replica.read_row(player_id)
+                row_number = found[0] if found else None
+            else:
+                row_number = replica.resolve_row(player_id)
+            if row_number is None:
+                return False, f"❌ Error editing player in Watchlist: {player_id} not found"
+            if None in new_data:
+                current = found[1] + [""] * (len(new_data) - len(found[1]))
+                new_data = [current[column] if value is None else value for column, value in enumerate(new_data)]
+            commit_with_log([update_change('Watchlist', row_number, new_data)], user_name, [f"Edited player in Watchlist: {player_id}"])
+            replica.apply_update(row_number, new_data)
         return True, f"✅ Successfully edited {player_id} in Watchlist!"
     except Exception as e:
+        replica.invalidate()
         return False, f"❌ Error editing player in Watchlist: {str(e)}"
 
+def bulk_remove_players_from_banlist(player_ids, user_name):
+    """
+    Removes many players from the Watchlist sheet by ID.
+
+    All rows are resolved first, then deleted with a single commit
+    that runs bottom-up so the row numbers stay valid. The same
+    commit appends one Update Sheet entry per player.
+
+    Args:
+        player_ids (list): IDs of the players to remove
+        user_name (str): Name of the user making the change
+
+    Returns:
+        tuple: (success (bool), message (str), not_found (list of IDs))
+    """
+    replica = get_watchlist_replica()
+    not_found = []
+    try:
+        with replica.lock:
+            targets, not_found = resolve_targets(replica, player_ids)
+            if not targets:
+                return False, "❌ None of the players were found in Watchlist.", not_found
+
+            commit_with_log(
+                [delete_change('Watchlist', targets)],
+                user_name,
+                [f"Removed player from Watchlist: {player_id}" for player_id in targets.values()]
+            )
+            for row_number in sorted(targets, reverse=True):
+                replica.apply_delete(row_number)
+        return True, f"✅ Successfully removed {len(targets)} player(s) from Watchlist!", not_found
+    except Exception as e:
+        replica.invalidate()
+        return False, f"❌ Error removing players from Watchlist: {str(e)}", not_found
+
+def bulk_edit_players_in_banlist(player_ids, user_name, status=None):
+    """
+    Sets the status of many players in the Watchlist sheet.
+
+    All rows are resolved first and every changed cell is written with a
+    single commit (one batch_update with Google Sheets) that also appends
+    one Update Sheet entry per player.
+
+    Args:
+        player_ids (list): IDs of the players to edit
+        user_name (str): Name of the user making the change
+        status (str): New status, or None to keep each player's status
+
+    Returns:
+        tuple: (success (bool), message (str), not_found (list of IDs))
+    """
+    # Status is column B
+    changes = {1: status}
+    changes = {column: value for column, value in changes.items() if value is not None}
+    if not changes:
+        return False, "❌ Nothing to change.", []
+
+    replica = get_watchlist_replica()
+    not_found = []
+    try:
+        with replica.lock:
+            targets, not_found = resolve_targets(replica, player_ids)
+            if not targets:
+                return False, "❌ None of the players were found in Watchlist.", not_found
+
+            summary = ", ".join(str(value) for value in changes.values())
+            commit_with_log(
+                [
+                    update_change('Watchlist', row_number, [value], column)
+                    for row_number in targets
+                    for column, value in changes.items()
+                ],
+                user_name,
+                [f"Edited player in Watchlist: {player_id} ({summary})" for player_id in targets.values()]
+            )
+            for row_number in targets:
+                row = replica.get_row(row_number)
+                row += [""] * (max(changes) + 1 - len(row))
+                for column, value in changes.items():
+                    row[column] = value
+                replica.apply_update(row_number, row)
+        return True, f"✅ Successfully edited {len(targets)} player(s) in Watchlist!", not_found
+    except Exception as e:
+        replica.invalidate()
+        return False, f"❌ Error editing players in Watchlist: {str(e)}", not_found
+
 def get_all_banned_players():
     """
     Retrieves all players from the Watchlist sheet.
+
+    Served from the local Watchlist replica, which is checked against the
+    sheet with a cheap freshness probe instead of a full download.
     
     Returns:
         list: All player data from the Watchlist sheet
     """
-    sheet = get_sheet('Watchlist')
-    return sheet.get_all_values()
+    return _fresh_replica().get_all_rows()
 
 def find_banned_player(player_id):
     """
     Finds a specific player in the Watchlist sheet.
+
+    Matches the IGN column only and is served from the local Watchlist replica.
     
     Args:
         player_id (str): ID of the player to find
@@ -96,14 +290,41 @@ def find_banned_player(player_id):
     Returns:
         list or None: Player data if found, None if not found
     """
-    sheet = get_sheet('Watchlist')
     try:
-        cell = sheet.find(player_id)
-        row = sheet.row_values(cell.row)
-        return row
+        return _fresh_replica().find(player_id)
     except:
         return None
 
+def find_banned_player_by_discord_id(discord_id):
+    """
+    Finds every Watchlist row whose Discord ID column matches exactly.
+
+    Args:
+        discord_id (str): Discord ID to look up
+
+    Returns:
+        list: Player data of each match, empty if not found
+    """
+    try:
+        return _fresh_replica().find_all(discord_id, 'discord_id')
+    except:
+        return []
+
+def find_banned_player_by_alt(alt_name):
+    """
+    Finds every Watchlist row that lists the name in its Known Alts column.
+
+    Args:
+        alt_name (str): Alternate account name to look up
+
+    Returns:
+        list: Player data of each match, empty if not found
+    """
+    try:
+        return _fresh_replica().find_all(alt_name, 'alt')
+    except:
+        return []
+
 def is_player_banned(player_id):
     """
     Checks if a player is in the Watchlist.